@@ -3,28 +3,41 @@ from langchain_community.llms import Ollama
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import HuggingFaceEmbeddings
 import chromadb
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+import aiohttp
+import asyncio
 import os
+import requests
+from requests.adapters import HTTPAdapter
+
+LLM_TEMPERATURE = 0.3
+LLM_TIMEOUT = 300
+LLM_POOL_SIZE = 32
 
 class BaseAgent(ABC):
     """Base class for all agents"""
     
+    # Keep-alive HTTP pool to the Ollama server, shared by every agent
+    _http: Optional[requests.Session] = None
+    
     def __init__(self, agent_name: str, model_name: str = "llama3.2"):
         self.agent_name = agent_name
         self.model_name = model_name
         
         # Initialize LLM
         try:
-            self.llm = Ollama(model=model_name, temperature=0.3)
+            self.llm = Ollama(model=model_name, temperature=LLM_TEMPERATURE)
             print(f"✓ {agent_name}: LLM initialized with {model_name}")
         except Exception as e:
             print(f"✗ {agent_name}: Failed to initialize LLM - {e}")
             print("  Make sure Ollama is running: ollama serve")
             raise
         
-        # Initialize embeddings
+        # Initialize embeddings; add_texts hands the whole document list to
+        # embed_documents, which encodes it in batches of 64
         self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+            model_name="sentence-transformers/all-MiniLM-L6-v2",
+            encode_kwargs={"batch_size": 64, "normalize_embeddings": True}
         )
         
         # Setup vector store directory
@@ -68,15 +81,118 @@ class BaseAgent(ABC):
             print(f"✗ {self.agent_name}: Failed to retrieve context - {e}")
             return []
     
+    def retrieve_context_batch(self, queries: List[str], k: int = 5) -> List[List[Dict]]:
+        """Retrieve documents for several queries with one embedding call and one index query"""
+        if not queries:
+            return []
+        
+        try:
+            query_embeddings = self.embeddings.embed_documents(queries)
+            results = self.vectorstore._collection.query(
+                query_embeddings=query_embeddings,
+                n_results=k,
+                include=["documents", "metadatas"]
+            )
+            return [
+                [{"content": content, "metadata": metadata or {}} for content, metadata in zip(docs, metadatas)]
+                for docs, metadatas in zip(results["documents"], results["metadatas"])
+            ]
+        except Exception:
+            # Vector store without batched queries: one search per query
+            return [self.retrieve_context(query, k=k) for query in queries]
+    
+    @classmethod
+    def _http_session(cls) -> requests.Session:
+        """Shared requests session, created on first use"""
+        if BaseAgent._http is None:
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=LLM_POOL_SIZE))
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=LLM_POOL_SIZE))
+            BaseAgent._http = session
+        return BaseAgent._http
+    
+    def _generate_payload(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"temperature": LLM_TEMPERATURE}
+        }
+    
+    def _ollama_generate(self, prompt: str) -> str:
+        """One /api/generate call over the shared keep-alive session"""
+        response = self._http_session().post(
+            f"{self.llm.base_url}/api/generate",
+            json=self._generate_payload(prompt),
+            timeout=LLM_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()["response"]
+    
+    async def _aollama_generate(self, prompt: str, session: aiohttp.ClientSession) -> str:
+        """Async /api/generate call on the caller's connection pool"""
+        async with session.post(
+            f"{self.llm.base_url}/api/generate",
+            json=self._generate_payload(prompt),
+            timeout=aiohttp.ClientTimeout(total=LLM_TIMEOUT)
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["response"]
+    
     def generate_response(self, prompt: str) -> str:
         """Generate response using LLM"""
         try:
-            response = self.llm.invoke(prompt)
+            response = self._ollama_generate(prompt)
             return response
         except Exception as e:
             print(f"✗ {self.agent_name}: Failed to generate response - {e}")
             return f"Error: {str(e)}"
     
+    async def agenerate_response(self, prompt: str, retries: int = 0,
+                                 session: Optional[aiohttp.ClientSession] = None) -> str:
+        """Generate response using LLM without blocking the event loop, retrying with 1s, 2s, 4s... backoff"""
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.agenerate_response(prompt, retries, own_session)
+        
+        for attempt in range(retries + 1):
+            try:
+                response = await self._aollama_generate(prompt, session)
+                return response
+            except Exception as e:
+                if attempt < retries:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                print(f"✗ {self.agent_name}: Failed to generate response - {e}")
+                return f"Error: {str(e)}"
+    
+    def generate_responses(self, prompts: List[str], max_concurrency: int = 8,
+                           retries: int = 3) -> List[str]:
+        """Generate responses for several prompts concurrently, in prompt order"""
+        if not prompts:
+            return []
+        
+        async def _gather():
+            # Bounded so a large batch does not flood the LLM server; the
+            # connector keeps one keep-alive pool for the whole batch
+            semaphore = asyncio.Semaphore(max_concurrency)
+            connector = aiohttp.TCPConnector(limit=max_concurrency)
+            
+            async with aiohttp.ClientSession(connector=connector) as session:
+                async def _one(prompt):
+                    async with semaphore:
+                        return await self.agenerate_response(prompt, retries, session)
+                
+                return await asyncio.gather(*(_one(p) for p in prompts))
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return list(asyncio.run(_gather()))
+        
+        # Already inside a running event loop (e.g. a notebook): fall back to sequential calls
+        return [self.generate_response(p) for p in prompts]
+    
     @abstractmethod
     def analyze(self, query: str, **kwargs) -> Dict[str, Any]:
         """Main analysis method - must be implemented by subclasses"""
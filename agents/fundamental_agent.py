@@ -2,7 +2,65 @@ from agents.base_agent import BaseAgent
 from typing import Dict, List, Any, Optional
 import pandas as pd
 import numpy as np
+import aiohttp
+import bisect
+import copy
+import sys
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from utils._njit import njit
+
+# Document types stored in the vector store metadata
+QUARTERLY_DOC_TYPE = sys.intern("quarterly_results")
+ANNUAL_DOC_TYPE = sys.intern("annual_results")
+
+# Most analyze() results kept; older days and stocks fall out first
+ANALYZE_CACHE_SIZE = 256
+
+# Recommendation buckets: lower score edges and a shared result template per bucket
+_FUND_THRESHOLDS = (30, 45, 60, 75)
+_FUND_TEMPLATES = (
+    {"action": "Strong Sell", "rationale": "Poor fundamentals, avoid or exit", "confidence": 0.8},
+    {"action": "Sell", "rationale": "Below average fundamentals, consider exiting", "confidence": 0.65},
+    {"action": "Hold", "rationale": "Average fundamentals, monitor for changes", "confidence": 0.5},
+    {"action": "Buy", "rationale": "Good fundamentals with room for improvement", "confidence": 0.7},
+    {"action": "Strong Buy", "rationale": "Excellent fundamentals across all parameters", "confidence": 0.85}
+)
+
+
+@njit(cache=True)
+def _cagr_nb(y):
+    """CAGR (%) from first to last value; NaN when undefined"""
+    n = y.shape[0]
+    if n < 2 or y[0] <= 0:
+        return np.nan
+    return ((y[n - 1] / y[0]) ** (1.0 / (n - 1)) - 1.0) * 100.0
+
+
+@njit(cache=True)
+def _trend_slope_nb(y):
+    """Closed-form OLS slope of y against 0..n-1"""
+    n = y.shape[0]
+    x_mean = (n - 1) / 2.0
+    # The x deviations sum to zero, so y needs no centering, and
+    # sum((x - x_mean)**2) over 0..n-1 is n(n^2 - 1)/12
+    num = 0.0
+    for i in range(n):
+        num += (i - x_mean) * y[i]
+    return num / (n * (n * n - 1) / 12.0)
+
+
+@njit(cache=True)
+def _mean_std_nb(y):
+    """Mean and sample standard deviation in one Welford pass"""
+    mean = 0.0
+    m2 = 0.0
+    for i in range(y.shape[0]):
+        delta = y[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (y[i] - mean)
+    return mean, np.sqrt(m2 / (y.shape[0] - 1))
+
 
 class FundamentalAgent(BaseAgent):
     """
@@ -11,6 +69,65 @@ class FundamentalAgent(BaseAgent):
     including income statements, balance sheets, cash flows, and key ratios
     """
     
+    # Metrics where higher is better
+    _HIGHER_BETTER = frozenset({
+        'roe', 'roce', 'roa', 'net_margin', 'operating_margin',
+        'current_ratio', 'quick_ratio', 'interest_coverage', 'asset_turnover'
+    })
+    
+    # Metrics where lower is better
+    _LOWER_BETTER = frozenset({'debt_to_equity', 'debt_to_assets'})
+    
+    # Ratio categories reported by _analyze_ratios
+    _RATIO_GROUPS = {
+        "profitability": ('roe', 'roce', 'roa', 'net_margin', 'operating_margin', 'ebitda_margin'),
+        "liquidity": ('current_ratio', 'quick_ratio', 'cash_ratio'),
+        "leverage": ('debt_to_equity', 'debt_to_assets', 'interest_coverage'),
+        "efficiency": ('asset_turnover', 'inventory_turnover', 'receivables_turnover')
+    }
+    
+    # Ratio rating codes: 0=Concerning .. 4=Excellent, -1=N/A (last label)
+    _RATIO_RATING_LABELS = np.array(
+        ['Concerning', 'Below Average', 'Average', 'Good', 'Excellent', 'N/A'], dtype=object
+    )
+    
+    # Rating codes indexed by the number of thresholds crossed
+    _CODES_HIGHER = np.array([1, 2, 3, 4], dtype=np.int8)
+    _CODES_LOWER = np.array([4, 3, 2, 0], dtype=np.int8)
+    
+    # Score per rating code, N/A scores neutral
+    _RATING_CODE_SCORES = np.array([10, 25, 50, 75, 100, 50], dtype=np.int16)
+    _RATING_CODE_SCORES_INVERSE = np.array([25, 75, 50, 75, 100, 50], dtype=np.int16)  # For leverage, lower is better
+    
+    # Benchmark assessment: pct-difference edges and labels per bucket
+    _BENCH_EDGES = np.array([-20.0, -5.0, 5.0, 20.0])
+    _BENCH_LABELS_HIGHER = np.array([
+        "Significantly Below Benchmark", "Below Benchmark", "In Line with Benchmark",
+        "Above Benchmark", "Significantly Above Benchmark"
+    ], dtype=object)
+    _BENCH_LABELS_LOWER = np.array([
+        "Significantly Better than Benchmark", "Better than Benchmark", "In Line with Benchmark",
+        "Worse than Benchmark", "Significantly Worse than Benchmark"
+    ], dtype=object)
+    
+    # Fields reported by get_quick_analysis
+    _QUICK_METRICS = ('revenue', 'net_profit', 'roe', 'debt_to_equity', 'eps')
+    
+    # Component weights for the overall fundamental score
+    _SCORE_WEIGHTS = {
+        "profitability": 0.3,
+        "growth": 0.25,
+        "leverage": 0.2,
+        "quality": 0.15,
+        "liquidity": 0.1
+    }
+    _WEIGHT_KEYS = tuple(_SCORE_WEIGHTS)
+    _WEIGHT_VEC = np.array(list(_SCORE_WEIGHTS.values()))
+    
+    # Overall score rating: lower edges of each bucket above "Poor"
+    _RATING_EDGES = (35, 50, 65, 80)
+    _RATING_LABELS = ('Poor', 'Below Average', 'Average', 'Good', 'Excellent')
+    
     def __init__(self, model_name: str = "llama3.2"):
         super().__init__("Fundamental Agent", model_name)
         
@@ -79,11 +196,34 @@ class FundamentalAgent(BaseAgent):
             'dividend_payout': 'Dividend Payout Ratio (%)'
         }
         
-        # Store financial data
+        # Intern the labels so every summary and result shares one copy of each
+        for labels in (self.income_statement_metrics, self.balance_sheet_metrics,
+                       self.cash_flow_metrics, self.financial_ratios):
+            for metric, label in labels.items():
+                labels[metric] = sys.intern(label)
+        
+        # Store financial data: one long frame per period plus per-company views
         self.quarterly_data = {}
         self.annual_data = {}
+        self._q_frame = pd.DataFrame()
+        self._a_frame = pd.DataFrame()
+        self._q_by_company = {}
+        self._a_by_company = {}
+        
+        # Latest quick-analysis fields per company, filled on load
+        self._quick_q = {}
+        self._quick_a = {}
         self.company_profiles = {}
         
+        # (company, quarter, year, type) keys already added to the vector store
+        self._doc_keys = set()
+        
+        # LRU of analysis results, invalidated by bumping the data versions on every load
+        self._analyze_cache = OrderedDict()
+        self._q_version = 0
+        self._a_version = 0
+        self._profile_version = 0
+        
         # Sector benchmarks
         self.sector_benchmarks = {
             "IT": {
@@ -124,6 +264,20 @@ class FundamentalAgent(BaseAgent):
             }
         }
         
+        # Rating thresholds (0.8x, 1x, 1.2x benchmark) keyed by (sector, metric)
+        self._thr_flat = {
+            (sector, metric): np.array([benchmark * 0.8, benchmark, benchmark * 1.2])
+            for sector, benchmarks in self.sector_benchmarks.items()
+            for metric, benchmark in benchmarks.items()
+            if metric in self._HIGHER_BETTER or metric in self._LOWER_BETTER
+        }
+        self._thr_default = {
+            metric: thr for (sector, metric), thr in self._thr_flat.items() if sector == "Default"
+        }
+        
+        # Benchmarks as a sector x metric frame (NaN where a sector has no benchmark)
+        self._benchmarks_df = pd.DataFrame.from_dict(self.sector_benchmarks, orient='index')
+        
         print("✓ Fundamental Analysis Agent initialized")
     
     def load_quarterly_data(self, data: Dict[str, pd.DataFrame]):
@@ -134,28 +288,44 @@ class FundamentalAgent(BaseAgent):
             data: Dict with company names as keys and DataFrames as values
                   DataFrame should have columns for various financial metrics
         """
-        self.quarterly_data = data
+        self._q_frame, self._q_by_company = self._index_by_company(data)
+        self.quarterly_data = self._q_by_company
+        self._quick_q = self._latest_quick_fields(self._q_frame)
+        self._q_version += 1
+        self._analyze_cache.clear()
         
         texts = []
         metadatas = []
         
-        for company, df in data.items():
-            if df.empty:
-                continue
+        summary_metrics = ['revenue', 'net_profit', 'eps', 'roe']
+        summary_labels = [
+            self.income_statement_metrics.get(m, self.financial_ratios.get(m, m))
+            for m in summary_metrics
+        ]
+        
+        for company, df in self._q_by_company.items():
+            company = sys.intern(company)
+            
+            # Pull the needed columns once; missing columns come back as NaN
+            periods = df.reindex(columns=['quarter', 'year']).to_numpy(dtype=object)
+            values = df.reindex(columns=summary_metrics).to_numpy(dtype=object)
             
-            for _, row in df.iterrows():
-                quarter = row.get('quarter', 'Unknown')
-                year = row.get('year', 'Unknown')
+            for (quarter, year), row in zip(periods, values):
+                quarter = quarter if quarter == quarter else 'Unknown'
+                year = year if year == year else 'Unknown'
+                
+                # Skip periods that are already indexed
+                key = (company, str(quarter), str(year), QUARTERLY_DOC_TYPE)
+                if key in self._doc_keys:
+                    continue
+                self._doc_keys.add(key)
                 
                 # Create summary text
                 summary_parts = [f"{company} Q{quarter} {year}:"]
                 
-                for metric in ['revenue', 'net_profit', 'eps', 'roe']:
-                    if metric in row and pd.notna(row[metric]):
-                        metric_name = self.income_statement_metrics.get(
-                            metric, self.financial_ratios.get(metric, metric)
-                        )
-                        summary_parts.append(f"{metric_name}: {row[metric]}")
+                for metric_name, value in zip(summary_labels, row):
+                    if value is not None and value == value:
+                        summary_parts.append(f"{metric_name}: {value}")
                 
                 text = " ".join(summary_parts)
                 texts.append(text)
@@ -164,7 +334,7 @@ class FundamentalAgent(BaseAgent):
                     "company": company,
                     "quarter": str(quarter),
                     "year": str(year),
-                    "type": "quarterly_results"
+                    "type": QUARTERLY_DOC_TYPE
                 })
         
         if texts:
@@ -178,27 +348,40 @@ class FundamentalAgent(BaseAgent):
         Args:
             data: Dict with company names as keys and DataFrames as values
         """
-        self.annual_data = data
+        self._a_frame, self._a_by_company = self._index_by_company(data)
+        self.annual_data = self._a_by_company
+        self._quick_a = self._latest_quick_fields(self._a_frame)
+        self._a_version += 1
+        self._analyze_cache.clear()
         
         texts = []
         metadatas = []
         
-        for company, df in data.items():
-            if df.empty:
-                continue
+        key_metrics = ['revenue', 'net_profit', 'roe', 'roce', 'debt_to_equity']
+        key_labels = [
+            self.income_statement_metrics.get(m, self.financial_ratios.get(m, m))
+            for m in key_metrics
+        ]
+        
+        for company, df in self._a_by_company.items():
+            company = sys.intern(company)
             
-            for _, row in df.iterrows():
-                year = row.get('year', 'Unknown')
+            years = df.reindex(columns=['year']).to_numpy(dtype=object)[:, 0]
+            values = df.reindex(columns=key_metrics).to_numpy(dtype=object)
+            
+            for year, row in zip(years, values):
+                year = year if year == year else 'Unknown'
+                
+                key = (company, None, str(year), ANNUAL_DOC_TYPE)
+                if key in self._doc_keys:
+                    continue
+                self._doc_keys.add(key)
                 
                 summary_parts = [f"{company} Annual {year}:"]
                 
-                key_metrics = ['revenue', 'net_profit', 'roe', 'roce', 'debt_to_equity']
-                for metric in key_metrics:
-                    if metric in row and pd.notna(row[metric]):
-                        metric_name = self.income_statement_metrics.get(
-                            metric, self.financial_ratios.get(metric, metric)
-                        )
-                        summary_parts.append(f"{metric_name}: {row[metric]}")
+                for metric_name, value in zip(key_labels, row):
+                    if value is not None and value == value:
+                        summary_parts.append(f"{metric_name}: {value}")
                 
                 text = " ".join(summary_parts)
                 texts.append(text)
@@ -206,16 +389,54 @@ class FundamentalAgent(BaseAgent):
                 metadatas.append({
                     "company": company,
                     "year": str(year),
-                    "type": "annual_results"
+                    "type": ANNUAL_DOC_TYPE
                 })
         
         if texts:
             self.add_documents(texts, metadatas)
             print(f"✓ Loaded annual data for {len(data)} companies")
     
+    @staticmethod
+    def _index_by_company(data: Dict[str, pd.DataFrame]):
+        """
+        Concatenate per-company frames into one long frame and split it once
+        
+        Returns:
+            (long frame with a 'company' column, dict of company -> DataFrame)
+        """
+        frames = [df.assign(company=company) for company, df in data.items() if not df.empty]
+        if not frames:
+            return pd.DataFrame(), {}
+        
+        frame = pd.concat(frames, ignore_index=True)
+        by_company = {
+            # Drop the key column and any columns only other companies had
+            company: group.drop(columns='company').dropna(axis=1, how='all').reset_index(drop=True)
+            for company, group in frame.groupby('company', sort=False)
+        }
+        return frame, by_company
+    
+    def _latest_quick_fields(self, frame: pd.DataFrame) -> Dict[str, Dict[str, Optional[float]]]:
+        """Latest revenue, profit, ROE, D/E and EPS per company, NaN as None"""
+        if frame.empty:
+            return {}
+        
+        latest = frame.groupby('company', sort=False).tail(1)
+        values = latest.reindex(columns=list(self._QUICK_METRICS)).to_numpy(dtype=np.float64)
+        
+        return {
+            company: {
+                metric: None if np.isnan(value) else float(value)
+                for metric, value in zip(self._QUICK_METRICS, row)
+            }
+            for company, row in zip(latest['company'], values)
+        }
+    
     def load_company_profile(self, company: str, profile: Dict[str, Any]):
         """Load company profile information"""
         self.company_profiles[company] = profile
+        self._profile_version += 1
+        self._analyze_cache.clear()
         
         # Add to vector store
         text = f"{company} Profile: Sector {profile.get('sector', 'Unknown')}, " \
@@ -236,204 +457,332 @@ class FundamentalAgent(BaseAgent):
         Returns:
             Dict containing fundamental analysis
         """
+        result, prompt, cache_key = self._prepare_analysis(stock_name, period)
+        if prompt is None:
+            return result
+        return self._finish_analysis(result, self.generate_response(prompt), cache_key)
+    
+    async def analyze_async(self, stock_name: str, period: str = "quarterly",
+                            session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """analyze() awaiting the LLM instead of blocking on it"""
+        result, prompt, cache_key = self._prepare_analysis(stock_name, period)
+        if prompt is None:
+            return result
+        return self._finish_analysis(result, await self.agenerate_response(prompt, session=session), cache_key)
+    
+    def _prepare_analysis(self, stock_name: str, period: str):
+        """
+        Run every analysis step except the LLM call; returns (result, insight
+        prompt, cache key), with no prompt when the result is already final
+        """
         print(f"\n📊 Analyzing fundamentals for {stock_name}...")
         
+        analysis_date = datetime.now().strftime("%Y-%m-%d")
+        data_version = self._q_version if period == "quarterly" else self._a_version
+        cache_key = (stock_name, period, data_version, self._profile_version, analysis_date)
+        
+        # Repeat calls on unchanged data are served from the cache; the copy
+        # keeps callers from mutating the cached result
+        cached = self._analyze_cache.get(cache_key)
+        if cached is not None:
+            self._analyze_cache.move_to_end(cache_key)
+            return copy.deepcopy(cached), None, None
+        
         result = {
             "stock": stock_name,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+            "analysis_date": analysis_date,
             "period": period
         }
         
         # Get relevant data
         if period == "quarterly":
-            data = self.quarterly_data.get(stock_name)
+            data = self._q_by_company.get(stock_name)
         else:
-            data = self.annual_data.get(stock_name)
+            data = self._a_by_company.get(stock_name)
         
         if data is None or data.empty:
             return {
                 "stock": stock_name,
                 "error": f"No {period} data available for {stock_name}",
                 "recommendation": "Unable to analyze"
-            }
+            }, None, None
+        
+        # Convert the frame once and share it across the sub-analyses
+        ctx = self._build_context(data)
         
         # Financial Performance Analysis
-        performance = self._analyze_financial_performance(stock_name, data)
+        performance = self._analyze_financial_performance(stock_name, ctx)
         result["financial_performance"] = performance
         
         # Ratio Analysis
-        ratios = self._analyze_ratios(stock_name, data)
+        ratios = self._analyze_ratios(stock_name, ctx)
         result["ratio_analysis"] = ratios
         
         # Growth Analysis
-        growth = self._analyze_growth_trends(stock_name, data)
+        growth = self._analyze_growth_trends(stock_name, ctx)
         result["growth_analysis"] = growth
         
         # Quality Assessment
-        quality = self._assess_earnings_quality(stock_name, data)
+        quality = self._assess_earnings_quality(stock_name, ctx)
         result["quality_assessment"] = quality
         
         # Peer Comparison
-        peer_comparison = self._compare_with_peers(stock_name, data)
+        peer_comparison = self._compare_with_peers(stock_name, ctx)
         result["peer_comparison"] = peer_comparison
         
         # Generate Fundamental Score
         fundamental_score = self._calculate_fundamental_score(result)
         result["fundamental_score"] = fundamental_score
         
+        return result, self._build_fundamental_prompt(stock_name, result), cache_key
+    
+    def _finish_analysis(self, result: Dict[str, Any], ai_insight: str, cache_key: tuple) -> Dict[str, Any]:
+        """Attach the AI insight and recommendation, then cache the result unless the LLM call failed"""
         # AI Insights
-        ai_insight = self._generate_fundamental_insights(stock_name, result)
         result["ai_insight"] = ai_insight
         
         # Recommendation
-        result["recommendation"] = self._get_fundamental_recommendation(fundamental_score)
+        result["recommendation"] = self._get_fundamental_recommendation(result["fundamental_score"])
         
-        return result
+        if not ai_insight.startswith("Error:"):
+            self._analyze_cache[cache_key] = result
+            while len(self._analyze_cache) > ANALYZE_CACHE_SIZE:
+                self._analyze_cache.popitem(last=False)
+        return copy.deepcopy(result)
     
-    def _analyze_financial_performance(self, stock_name: str, data: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze key financial performance metrics"""
-        latest = data.iloc[-1] if not data.empty else {}
+    def analyze_batch(self, stock_names: List[str], period: str = "quarterly") -> Dict[str, Dict[str, Any]]:
+        """
+        Screen several companies at once
+        
+        Latest ratios with ratings and revenue/profit/EPS CAGR are computed for
+        all companies together from the long frame; no AI insight is generated.
+        
+        Args:
+            stock_names: Names of the companies
+            period: "quarterly" or "annual"
+            
+        Returns:
+            Dict mapping each company to its screening result
+        """
+        frame = self._q_frame if period == "quarterly" else self._a_frame
+        results = {
+            stock: {
+                "stock": stock,
+                "error": f"No {period} data available for {stock}",
+                "recommendation": "Unable to analyze"
+            }
+            for stock in stock_names
+        }
+        
+        if frame.empty:
+            return results
+        
+        big = frame[frame['company'].isin(stock_names)]
+        if big.empty:
+            return results
+        
+        grouped = big.groupby('company', sort=False)
+        latest = grouped.tail(1).set_index('company')
+        companies = list(latest.index)
+        
+        # Latest ratios rated per metric, vectorized over companies
+        ratio_metrics = [
+            metric for group in self._RATIO_GROUPS.values()
+            for metric in group if metric in big.columns
+        ]
+        ratio_vals = latest[ratio_metrics].to_numpy(dtype=np.float64)
+        codes = np.full(ratio_vals.shape, -1, dtype=np.int8)
+        for j, metric in enumerate(ratio_metrics):
+            thr = self._thresholds_for("Default", metric)
+            if thr is None:
+                continue
+            col = ratio_vals[:, j]
+            if metric in self._HIGHER_BETTER:
+                codes[:, j] = self._CODES_HIGHER[(col[:, None] >= thr).sum(axis=1)]
+            else:
+                codes[:, j] = self._CODES_LOWER[(col[:, None] > thr).sum(axis=1)]
+        ratings = self._RATIO_RATING_LABELS[codes]
+        
+        # CAGR from the first and last non-NaN value of each company
+        growth_cols = [m for m in ('revenue', 'net_profit', 'eps') if m in big.columns]
+        first = grouped[growth_cols].first().loc[companies].to_numpy(dtype=np.float64)
+        last = grouped[growth_cols].last().loc[companies].to_numpy(dtype=np.float64)
+        count = grouped[growth_cols].count().loc[companies].to_numpy(dtype=np.float64)
+        rows = grouped.size().loc[companies].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cagr = ((last / first) ** (1.0 / (count - 1)) - 1.0) * 100.0
+        valid = (count >= 2) & (first > 0) & (rows[:, None] >= 4)
+        cagr = np.where(valid, cagr, np.nan)
+        
+        cagr_keys = {'revenue': 'revenue_cagr', 'net_profit': 'profit_cagr', 'eps': 'eps_cagr'}
+        for i, company in enumerate(companies):
+            ratios = {
+                metric: {
+                    "value": float(ratio_vals[i, j]),
+                    "label": self.financial_ratios.get(metric, metric),
+                    "rating": ratings[i, j]
+                }
+                for j, metric in enumerate(ratio_metrics)
+                if not np.isnan(ratio_vals[i, j])
+            }
+            growth = {
+                cagr_keys[metric]: None if np.isnan(cagr[i, j]) else float(cagr[i, j])
+                for j, metric in enumerate(growth_cols)
+            }
+            results[company] = {
+                "stock": company,
+                "period": period,
+                "ratios": ratios,
+                "growth": growth
+            }
+        
+        return results
+    
+    def _build_context(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Convert the numeric columns of a company frame to a float matrix once
+        
+        Returns:
+            Dict with the matrix, column lookup and the latest / year-ago rows
+        """
+        numeric = data.select_dtypes(include='number')
+        arr = numeric.to_numpy(dtype=np.float64)
+        n_rows = len(arr)
         
+        return {
+            "arr": arr,
+            "cols": list(numeric.columns),
+            "col_idx": {name: i for i, name in enumerate(numeric.columns)},
+            "n_rows": n_rows,
+            "latest": arr[-1],
+            "prev": arr[-5] if n_rows >= 5 else arr[0]
+        }
+    
+    def _column(self, ctx: Dict[str, Any], metric: str) -> Optional[np.ndarray]:
+        """Non-NaN history of a metric from the shared context"""
+        i = ctx["col_idx"].get(metric)
+        if i is None:
+            return None
+        values = ctx["arr"][:, i]
+        return values[~np.isnan(values)]
+    
+    def _analyze_financial_performance(self, stock_name: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze key financial performance metrics"""
         performance = {
             "latest_period": {},
             "yoy_comparison": {},
             "trends": {}
         }
-        
-        # Latest period metrics
+
+        # Pick the key metric columns out of the shared rows
         key_metrics = ['revenue', 'operating_profit', 'net_profit', 'ebitda', 'eps']
-        for metric in key_metrics:
-            if metric in data.columns:
-                value = latest.get(metric)
-                if pd.notna(value):
-                    performance["latest_period"][metric] = {
-                        "value": float(value),
-                        "label": self.income_statement_metrics.get(metric, metric)
-                    }
-        
+        col_idx = ctx["col_idx"]
+        cols = [m for m in key_metrics if m in col_idx]
+        idx = [col_idx[m] for m in cols]
+        latest_vals = ctx["latest"][idx]
+
+        # Latest period metrics
+        for metric, value in zip(cols, latest_vals):
+            if not np.isnan(value):
+                performance["latest_period"][metric] = {
+                    "value": float(value),
+                    "label": self.income_statement_metrics.get(metric, metric)
+                }
+
         # YoY Comparison (if enough data)
-        if len(data) >= 4:
-            yoy_data = data.iloc[-5] if len(data) >= 5 else data.iloc[0]
-            for metric in key_metrics:
-                if metric in data.columns:
-                    current = latest.get(metric, 0)
-                    previous = yoy_data.get(metric, 0)
-                    if previous and previous != 0:
-                        growth = ((current - previous) / abs(previous)) * 100
-                        performance["yoy_comparison"][metric] = {
-                            "current": float(current) if pd.notna(current) else None,
-                            "previous": float(previous) if pd.notna(previous) else None,
-                            "growth": float(growth) if pd.notna(growth) else None
-                        }
+        if ctx["n_rows"] >= 4:
+            prev_vals = ctx["prev"][idx]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                growth_vals = (latest_vals - prev_vals) / np.abs(prev_vals) * 100
+
+            for metric, current, previous, growth in zip(cols, latest_vals, prev_vals, growth_vals):
+                if previous != 0:
+                    performance["yoy_comparison"][metric] = {
+                        "current": float(current) if not np.isnan(current) else None,
+                        "previous": float(previous) if not np.isnan(previous) else None,
+                        "growth": float(growth) if not np.isnan(growth) else None
+                    }
         
         # Calculate trends
         for metric in ['revenue', 'net_profit', 'eps']:
-            if metric in data.columns:
-                values = data[metric].dropna()
+            values = self._column(ctx, metric)
+            if values is not None:
                 if len(values) >= 3:
                     trend = self._calculate_trend(values)
                     performance["trends"][metric] = trend
         
         return performance
     
-    def _analyze_ratios(self, stock_name: str, data: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_ratios(self, stock_name: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze financial ratios"""
-        latest = data.iloc[-1] if not data.empty else {}
-        
-        ratios = {
-            "profitability": {},
-            "liquidity": {},
-            "leverage": {},
-            "efficiency": {}
+        # Take the latest value of every reported ratio in one gather
+        col_idx = ctx["col_idx"]
+        present = [
+            metric for group in self._RATIO_GROUPS.values()
+            for metric in group if metric in col_idx
+        ]
+        values = ctx["latest"][[col_idx[m] for m in present]]
+        
+        mask = ~np.isnan(values)
+        metrics = [metric for metric, ok in zip(present, mask) if ok]
+        values = values[mask]
+        codes = self._rate_ratios(metrics, values)
+        ratings = self._RATIO_RATING_LABELS[codes]
+        
+        rated = {
+            metric: {
+                "value": float(value),
+                "label": self.financial_ratios.get(metric, metric),
+                "rating": rating,
+                "rating_code": int(code)
+            }
+            for metric, value, rating, code in zip(metrics, values, ratings, codes)
         }
         
-        # Profitability ratios
-        profitability_metrics = ['roe', 'roce', 'roa', 'net_margin', 'operating_margin', 'ebitda_margin']
-        for metric in profitability_metrics:
-            if metric in data.columns:
-                value = latest.get(metric)
-                if pd.notna(value):
-                    ratios["profitability"][metric] = {
-                        "value": float(value),
-                        "label": self.financial_ratios.get(metric, metric),
-                        "rating": self._rate_ratio(metric, value)
-                    }
-        
-        # Liquidity ratios
-        liquidity_metrics = ['current_ratio', 'quick_ratio', 'cash_ratio']
-        for metric in liquidity_metrics:
-            if metric in data.columns:
-                value = latest.get(metric)
-                if pd.notna(value):
-                    ratios["liquidity"][metric] = {
-                        "value": float(value),
-                        "label": self.financial_ratios.get(metric, metric),
-                        "rating": self._rate_ratio(metric, value)
-                    }
-        
-        # Leverage ratios
-        leverage_metrics = ['debt_to_equity', 'debt_to_assets', 'interest_coverage']
-        for metric in leverage_metrics:
-            if metric in data.columns:
-                value = latest.get(metric)
-                if pd.notna(value):
-                    ratios["leverage"][metric] = {
-                        "value": float(value),
-                        "label": self.financial_ratios.get(metric, metric),
-                        "rating": self._rate_ratio(metric, value)
-                    }
-        
-        # Efficiency ratios
-        efficiency_metrics = ['asset_turnover', 'inventory_turnover', 'receivables_turnover']
-        for metric in efficiency_metrics:
-            if metric in data.columns:
-                value = latest.get(metric)
-                if pd.notna(value):
-                    ratios["efficiency"][metric] = {
-                        "value": float(value),
-                        "label": self.financial_ratios.get(metric, metric),
-                        "rating": self._rate_ratio(metric, value)
-                    }
-        
-        return ratios
+        return {
+            group: {metric: rated[metric] for metric in members if metric in rated}
+            for group, members in self._RATIO_GROUPS.items()
+        }
+    
+    def _rate_ratios(self, metrics: List[str], values: np.ndarray,
+                     sector: str = "Default") -> np.ndarray:
+        """Rate several ratios at once against the sector benchmarks, returning rating codes"""
+        thresholds = [self._thresholds_for(sector, m) for m in metrics]
+        codes = np.full(len(metrics), -1, dtype=np.int8)
+        
+        higher = [i for i, m in enumerate(metrics) if thresholds[i] is not None and m in self._HIGHER_BETTER]
+        if higher:
+            thr = np.stack([thresholds[i] for i in higher])
+            codes[higher] = self._CODES_HIGHER[(values[higher, None] >= thr).sum(axis=1)]
+        
+        lower = [i for i, m in enumerate(metrics) if thresholds[i] is not None and m in self._LOWER_BETTER]
+        if lower:
+            thr = np.stack([thresholds[i] for i in lower])
+            codes[lower] = self._CODES_LOWER[(values[lower, None] > thr).sum(axis=1)]
+        
+        # Missing values are unrated
+        codes[np.isnan(values)] = -1
+        return codes
+    
+    def _thresholds_for(self, sector: str, metric: str) -> Optional[np.ndarray]:
+        """Rating thresholds for a metric, falling back to the Default sector"""
+        thr = self._thr_flat.get((sector, metric))
+        return thr if thr is not None else self._thr_default.get(metric)
     
     def _rate_ratio(self, metric: str, value: float, sector: str = "Default") -> str:
         """Rate a ratio as Good, Average, or Poor"""
-        benchmarks = self.sector_benchmarks.get(sector, self.sector_benchmarks["Default"])
-        benchmark = benchmarks.get(metric)
-        
-        if benchmark is None:
+        thr = self._thresholds_for(sector, metric)
+        if thr is None or value != value:
             return "N/A"
         
-        # Metrics where higher is better
-        higher_better = ['roe', 'roce', 'roa', 'net_margin', 'operating_margin', 
-                        'current_ratio', 'quick_ratio', 'interest_coverage', 'asset_turnover']
-        
-        # Metrics where lower is better
-        lower_better = ['debt_to_equity', 'debt_to_assets']
-        
-        if metric in higher_better:
-            if value >= benchmark * 1.2:
-                return "Excellent"
-            elif value >= benchmark:
-                return "Good"
-            elif value >= benchmark * 0.8:
-                return "Average"
-            else:
-                return "Below Average"
-        elif metric in lower_better:
-            if value <= benchmark * 0.8:
-                return "Excellent"
-            elif value <= benchmark:
-                return "Good"
-            elif value <= benchmark * 1.2:
-                return "Average"
-            else:
-                return "Concerning"
+        # A value equal to a threshold counts as reaching it when higher is better
+        if metric in self._HIGHER_BETTER:
+            code = self._CODES_HIGHER[np.searchsorted(thr, value, side='right')]
         else:
-            return "N/A"
+            code = self._CODES_LOWER[np.searchsorted(thr, value, side='left')]
+        return self._RATIO_RATING_LABELS[code]
     
-    def _analyze_growth_trends(self, stock_name: str, data: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_growth_trends(self, stock_name: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze growth trends"""
         growth = {
             "revenue_cagr": None,
@@ -444,60 +793,48 @@ class FundamentalAgent(BaseAgent):
         }
         
         # Calculate CAGR for key metrics
-        if 'revenue' in data.columns and len(data) >= 4:
-            revenue_cagr = self._calculate_cagr(data['revenue'])
+        if 'revenue' in ctx["col_idx"] and ctx["n_rows"] >= 4:
+            revenue_cagr = self._calculate_cagr(self._column(ctx, 'revenue'))
             if revenue_cagr is not None:
                 growth["revenue_cagr"] = float(revenue_cagr)
         
-        if 'net_profit' in data.columns and len(data) >= 4:
-            profit_cagr = self._calculate_cagr(data['net_profit'])
+        if 'net_profit' in ctx["col_idx"] and ctx["n_rows"] >= 4:
+            profit_cagr = self._calculate_cagr(self._column(ctx, 'net_profit'))
             if profit_cagr is not None:
                 growth["profit_cagr"] = float(profit_cagr)
         
-        if 'eps' in data.columns and len(data) >= 4:
-            eps_cagr = self._calculate_cagr(data['eps'])
+        if 'eps' in ctx["col_idx"] and ctx["n_rows"] >= 4:
+            eps_cagr = self._calculate_cagr(self._column(ctx, 'eps'))
             if eps_cagr is not None:
                 growth["eps_cagr"] = float(eps_cagr)
         
         # Trend analysis
         for metric in ['revenue', 'net_profit', 'operating_margin']:
-            if metric in data.columns:
-                values = data[metric].dropna()
+            values = self._column(ctx, metric)
+            if values is not None:
                 if len(values) >= 3:
                     growth["trend_analysis"][metric] = self._calculate_trend(values)
         
         # Growth consistency
-        growth["growth_consistency"] = self._assess_growth_consistency(data)
+        growth["growth_consistency"] = self._assess_growth_consistency(ctx)
         
         return growth
     
-    def _calculate_cagr(self, series: pd.Series) -> Optional[float]:
+    def _calculate_cagr(self, values: np.ndarray) -> Optional[float]:
         """Calculate Compound Annual Growth Rate"""
-        clean_series = series.dropna()
-        if len(clean_series) < 2:
-            return None
-        
-        start_value = clean_series.iloc[0]
-        end_value = clean_series.iloc[-1]
-        periods = len(clean_series) - 1
-        
-        if start_value <= 0 or periods == 0:
-            return None
-        
-        cagr = ((end_value / start_value) ** (1 / periods) - 1) * 100
-        return cagr
+        arr = np.asarray(values, dtype=np.float64)
+        cagr = _cagr_nb(arr[~np.isnan(arr)])
+        return None if np.isnan(cagr) else cagr
     
-    def _calculate_trend(self, series: pd.Series) -> str:
+    def _calculate_trend(self, values: np.ndarray) -> str:
         """Calculate trend direction"""
-        if len(series) < 3:
+        if len(values) < 3:
             return "Insufficient Data"
         
         # Simple linear regression trend
-        x = np.arange(len(series))
-        y = series.values
-        
-        slope = np.polyfit(x, y, 1)[0]
-        mean_val = np.mean(y)
+        y = np.asarray(values, dtype=np.float64)
+        slope = _trend_slope_nb(y)
+        mean_val = y.mean()
         
         if mean_val == 0:
             return "Flat"
@@ -515,19 +852,17 @@ class FundamentalAgent(BaseAgent):
         else:
             return "Strong Downtrend"
     
-    def _assess_growth_consistency(self, data: pd.DataFrame) -> str:
+    def _assess_growth_consistency(self, ctx: Dict[str, Any]) -> str:
         """Assess consistency of growth"""
-        if 'revenue_growth' not in data.columns:
+        growth_values = self._column(ctx, 'revenue_growth')
+        if growth_values is None:
             return "Unable to assess"
-        
-        growth_values = data['revenue_growth'].dropna()
+
         if len(growth_values) < 4:
             return "Insufficient data"
         
-        positive_growth = sum(1 for g in growth_values if g > 0)
-        total = len(growth_values)
-        
-        ratio = positive_growth / total
+        # Share of periods with positive growth
+        ratio = (growth_values > 0).mean()
         
         if ratio >= 0.9:
             return "Highly Consistent"
@@ -538,7 +873,7 @@ class FundamentalAgent(BaseAgent):
         else:
             return "Inconsistent"
     
-    def _assess_earnings_quality(self, stock_name: str, data: pd.DataFrame) -> Dict[str, Any]:
+    def _assess_earnings_quality(self, stock_name: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Assess earnings quality"""
         quality = {
             "cash_conversion": None,
@@ -548,11 +883,12 @@ class FundamentalAgent(BaseAgent):
             "flags": []
         }
         
-        latest = data.iloc[-1] if not data.empty else {}
+        latest = ctx["latest"]
+        col_idx = ctx["col_idx"]
         
         # Cash conversion (OCF / Net Profit)
-        ocf = latest.get('operating_cash_flow', 0)
-        net_profit = latest.get('net_profit', 0)
+        ocf = latest[col_idx['operating_cash_flow']] if 'operating_cash_flow' in col_idx else 0
+        net_profit = latest[col_idx['net_profit']] if 'net_profit' in col_idx else 0
         
         if net_profit and net_profit > 0:
             cash_conversion = (ocf / net_profit) * 100
@@ -564,12 +900,11 @@ class FundamentalAgent(BaseAgent):
                 quality["flags"].append("High cash conversion - strong earnings quality")
         
         # Earnings persistence (correlation of earnings over time)
-        if 'net_profit' in data.columns and len(data) >= 4:
-            profits = data['net_profit'].dropna()
+        if 'net_profit' in col_idx and ctx["n_rows"] >= 4:
+            profits = self._column(ctx, 'net_profit')
             if len(profits) >= 4:
                 # Check if earnings are stable/growing
-                std_dev = profits.std()
-                mean_val = profits.mean()
+                mean_val, std_dev = _mean_std_nb(profits)
                 if mean_val != 0:
                     cv = std_dev / abs(mean_val)  # Coefficient of variation
                     if cv < 0.3:
@@ -600,15 +935,17 @@ class FundamentalAgent(BaseAgent):
         
         return quality
     
-    def _compare_with_peers(self, stock_name: str, data: pd.DataFrame) -> Dict[str, Any]:
+    def _compare_with_peers(self, stock_name: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Compare with sector peers"""
         # Get sector
         profile = self.company_profiles.get(stock_name, {})
         sector = profile.get('sector', 'Default')
         
-        benchmarks = self.sector_benchmarks.get(sector, self.sector_benchmarks["Default"])
+        sector_key = sector if sector in self._benchmarks_df.index else "Default"
+        bench = self._benchmarks_df.loc[sector_key].dropna()
         
-        latest = data.iloc[-1] if not data.empty else {}
+        latest = ctx["latest"]
+        col_idx = ctx["col_idx"]
         
         comparison = {
             "sector": sector,
@@ -616,63 +953,65 @@ class FundamentalAgent(BaseAgent):
             "vs_benchmark": {}
         }
         
-        for metric, benchmark in benchmarks.items():
-            if metric in data.columns:
-                value = latest.get(metric)
-                if pd.notna(value):
-                    diff = value - benchmark
-                    pct_diff = (diff / benchmark) * 100 if benchmark != 0 else 0
-                    
-                    comparison["metrics_comparison"][metric] = {
-                        "company_value": float(value),
-                        "sector_benchmark": float(benchmark),
-                        "difference": float(diff),
-                        "pct_difference": float(pct_diff),
-                        "assessment": self._assess_vs_benchmark(metric, pct_diff)
-                    }
+        # Latest company values aligned with the benchmark metrics
+        metrics = [m for m in bench.index if m in col_idx]
+        values = latest[[col_idx[m] for m in metrics]]
+        benchmarks = bench.loc[metrics].to_numpy(dtype=np.float64)
+        
+        mask = ~np.isnan(values)
+        metrics = [m for m, ok in zip(metrics, mask) if ok]
+        values = values[mask]
+        benchmarks = benchmarks[mask]
+        
+        diff = values - benchmarks
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct_diff = np.where(benchmarks != 0, (diff / benchmarks) * 100, 0.0)
+        assessments = self._assess_vs_benchmarks(metrics, pct_diff)
+        
+        for metric, value, benchmark, d, pct, assessment in zip(
+                metrics, values, benchmarks, diff, pct_diff, assessments):
+            comparison["metrics_comparison"][metric] = {
+                "company_value": float(value),
+                "sector_benchmark": float(benchmark),
+                "difference": float(d),
+                "pct_difference": float(pct),
+                "assessment": assessment
+            }
         
         return comparison
     
+    def _assess_vs_benchmarks(self, metrics: List[str], pct_diffs: np.ndarray) -> np.ndarray:
+        """Assess several metrics vs benchmark at once"""
+        assessments = np.full(len(metrics), "N/A", dtype=object)
+        
+        higher = [i for i, m in enumerate(metrics) if m in self._HIGHER_BETTER]
+        if higher:
+            assessments[higher] = self._BENCH_LABELS_HIGHER[
+                np.searchsorted(self._BENCH_EDGES, pct_diffs[higher], side='left')
+            ]
+        
+        lower = [i for i, m in enumerate(metrics) if m in self._LOWER_BETTER]
+        if lower:
+            assessments[lower] = self._BENCH_LABELS_LOWER[
+                np.searchsorted(self._BENCH_EDGES, pct_diffs[lower], side='right')
+            ]
+        
+        return assessments
+    
     def _assess_vs_benchmark(self, metric: str, pct_diff: float) -> str:
         """Assess performance vs benchmark"""
-        higher_better = ['roe', 'roce', 'net_margin', 'current_ratio']
-        lower_better = ['debt_to_equity']
-        
-        if metric in higher_better:
-            if pct_diff > 20:
-                return "Significantly Above Benchmark"
-            elif pct_diff > 5:
-                return "Above Benchmark"
-            elif pct_diff > -5:
-                return "In Line with Benchmark"
-            elif pct_diff > -20:
-                return "Below Benchmark"
-            else:
-                return "Significantly Below Benchmark"
-        elif metric in lower_better:
-            if pct_diff < -20:
-                return "Significantly Better than Benchmark"
-            elif pct_diff < -5:
-                return "Better than Benchmark"
-            elif pct_diff < 5:
-                return "In Line with Benchmark"
-            elif pct_diff < 20:
-                return "Worse than Benchmark"
-            else:
-                return "Significantly Worse than Benchmark"
+        # Bucket boundaries fall on the worse side: exactly +20% is "Above", exactly -20% is "Better"
+        if metric in self._HIGHER_BETTER:
+            return self._BENCH_LABELS_HIGHER[np.searchsorted(self._BENCH_EDGES, pct_diff, side='left')]
+        elif metric in self._LOWER_BETTER:
+            return self._BENCH_LABELS_LOWER[np.searchsorted(self._BENCH_EDGES, pct_diff, side='right')]
         else:
             return "N/A"
     
     def _calculate_fundamental_score(self, result: Dict) -> Dict[str, Any]:
         """Calculate overall fundamental score"""
         scores = {}
-        weights = {
-            "profitability": 0.3,
-            "growth": 0.25,
-            "leverage": 0.2,
-            "quality": 0.15,
-            "liquidity": 0.1
-        }
+        weights = self._SCORE_WEIGHTS
         
         # Profitability score
         prof_ratios = result.get("ratio_analysis", {}).get("profitability", {})
@@ -717,28 +1056,17 @@ class FundamentalAgent(BaseAgent):
         scores["liquidity"] = liq_score
         
         # Calculate weighted total
-        total_score = sum(
-            scores.get(cat, 50) * weight 
-            for cat, weight in weights.items()
-        )
+        score_vec = np.array([scores.get(cat, 50) for cat in self._WEIGHT_KEYS], dtype=np.float64)
+        total_score = float(score_vec @ self._WEIGHT_VEC)
         
         # Determine rating
-        if total_score >= 80:
-            rating = "Excellent"
-        elif total_score >= 65:
-            rating = "Good"
-        elif total_score >= 50:
-            rating = "Average"
-        elif total_score >= 35:
-            rating = "Below Average"
-        else:
-            rating = "Poor"
+        rating = self._RATING_LABELS[bisect.bisect_right(self._RATING_EDGES, total_score)]
         
         return {
             "overall_score": float(total_score),
             "rating": rating,
             "component_scores": scores,
-            "weights": weights
+            "weights": dict(weights)
         }
     
     def _score_ratios(self, ratios: Dict, inverse: bool = False) -> float:
@@ -746,34 +1074,22 @@ class FundamentalAgent(BaseAgent):
         if not ratios:
             return 50  # Neutral
         
-        rating_scores = {
-            "Excellent": 100,
-            "Good": 75,
-            "Average": 50,
-            "Below Average": 25,
-            "Concerning": 10
-        }
-        
-        if inverse:
-            rating_scores = {
-                "Excellent": 100,
-                "Good": 75,
-                "Average": 50,
-                "Below Average": 75,  # For leverage, lower is better
-                "Concerning": 25
-            }
+        table = self._RATING_CODE_SCORES_INVERSE if inverse else self._RATING_CODE_SCORES
         
-        scores = []
-        for metric, data in ratios.items():
-            rating = data.get("rating", "Average")
-            score = rating_scores.get(rating, 50)
-            scores.append(score)
+        # Unrated entries default to Average (code 2)
+        codes = np.fromiter(
+            (data.get("rating_code", 2) for data in ratios.values()),
+            dtype=np.int8, count=len(ratios)
+        )
         
-        return np.mean(scores) if scores else 50
+        return table[codes].mean()
     
     def _generate_fundamental_insights(self, stock_name: str, result: Dict) -> str:
         """Generate AI-powered fundamental insights"""
-        
+        return self.generate_response(self._build_fundamental_prompt(stock_name, result))
+    
+    def _build_fundamental_prompt(self, stock_name: str, result: Dict) -> str:
+        """Build the LLM prompt for fundamental insights"""
         context_parts = [f"Company: {stock_name}"]
         
         # Add key metrics
@@ -814,56 +1130,24 @@ Provide insights including:
 
 Keep response under 200 words and focus on actionable insights."""
 
-        return self.generate_response(prompt)
+        return prompt
     
     def _get_fundamental_recommendation(self, score: Dict) -> Dict[str, Any]:
         """Get recommendation based on fundamental analysis"""
         overall = score.get("overall_score", 50)
         rating = score.get("rating", "Average")
         
-        if overall >= 75:
-            action = "Strong Buy"
-            rationale = "Excellent fundamentals across all parameters"
-            confidence = 0.85
-        elif overall >= 60:
-            action = "Buy"
-            rationale = "Good fundamentals with room for improvement"
-            confidence = 0.7
-        elif overall >= 45:
-            action = "Hold"
-            rationale = "Average fundamentals, monitor for changes"
-            confidence = 0.5
-        elif overall >= 30:
-            action = "Sell"
-            rationale = "Below average fundamentals, consider exiting"
-            confidence = 0.65
-        else:
-            action = "Strong Sell"
-            rationale = "Poor fundamentals, avoid or exit"
-            confidence = 0.8
+        template = _FUND_TEMPLATES[bisect.bisect_right(_FUND_THRESHOLDS, overall)]
         
-        return {
-            "action": action,
-            "rationale": rationale,
-            "confidence": confidence,
-            "fundamental_rating": rating,
-            "score": float(overall)
-        }
+        return {**template, "fundamental_rating": rating, "score": float(overall)}
     
     def get_quick_analysis(self, stock_name: str) -> Dict[str, Any]:
         """Get quick fundamental overview"""
-        data = self.quarterly_data.get(stock_name) or self.annual_data.get(stock_name)
+        quick = self._quick_q.get(stock_name)
+        if quick is None:
+            quick = self._quick_a.get(stock_name)
         
-        if data is None or data.empty:
+        if quick is None:
             return {"error": f"No data available for {stock_name}"}
         
-        latest = data.iloc[-1]
-        
-        return {
-            "stock": stock_name,
-            "revenue": float(latest.get('revenue', 0)) if pd.notna(latest.get('revenue')) else None,
-            "net_profit": float(latest.get('net_profit', 0)) if pd.notna(latest.get('net_profit')) else None,
-            "roe": float(latest.get('roe', 0)) if pd.notna(latest.get('roe')) else None,
-            "debt_to_equity": float(latest.get('debt_to_equity', 0)) if pd.notna(latest.get('debt_to_equity')) else None,
-            "eps": float(latest.get('eps', 0)) if pd.notna(latest.get('eps')) else None
-        }
\ No newline at end of file
+        return {"stock": stock_name, **quick}
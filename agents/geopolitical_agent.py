@@ -1,9 +1,239 @@
 from agents.base_agent import BaseAgent
-from typing import Dict, List, Any, Optional
-import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
-from datetime import datetime, timedelta
-import json
+import aiohttp
+from datetime import datetime
+import bisect
+import heapq
+import logging
+from itertools import islice
+from utils._njit import njit
+
+logger = logging.getLogger(__name__)
+
+# Categories of geopolitical events
+EVENT_CATEGORIES = {
+    "tariffs": "Trade Tariffs & Duties",
+    "trade_agreements": "Trade Agreements",
+    "g20": "G20 Meetings & Summits",
+    "policy_changes": "Government Policy Changes",
+    "monetary_policy": "Central Bank Policies",
+    "conflicts": "Wars & Conflicts",
+    "sanctions": "Economic Sanctions",
+    "pandemics": "Pandemics & Health Crises",
+    "natural_disasters": "Natural Disasters",
+    "elections": "Elections & Political Changes",
+    "diplomatic": "Diplomatic Relations",
+    "supply_chain": "Supply Chain Disruptions"
+}
+
+# Sector impact mapping
+SECTOR_IMPACT = {
+    "IT": ["tariffs", "trade_agreements", "policy_changes", "sanctions"],
+    "Banking": ["monetary_policy", "policy_changes", "elections", "sanctions"],
+    "Oil & Gas": ["conflicts", "sanctions", "tariffs", "natural_disasters"],
+    "Pharma": ["pandemics", "trade_agreements", "policy_changes", "tariffs"],
+    "Auto": ["tariffs", "supply_chain", "trade_agreements", "policy_changes"],
+    "Metals": ["tariffs", "conflicts", "sanctions", "trade_agreements"],
+    "FMCG": ["pandemics", "natural_disasters", "supply_chain", "policy_changes"],
+    "Infrastructure": ["policy_changes", "elections", "natural_disasters"],
+    "Telecom": ["policy_changes", "sanctions", "trade_agreements"],
+    "Airlines": ["conflicts", "pandemics", "natural_disasters", "oil_prices"]
+}
+
+# Stock to sector mapping (NSE 50 stocks)
+STOCK_SECTORS = {
+    "Reliance Industries Ltd.": "Oil & Gas",
+    "Tata Consultancy Services Ltd. (TCS)": "IT",
+    "HDFC Bank Ltd.": "Banking",
+    "Infosys Ltd.": "IT",
+    "ICICI Bank Ltd.": "Banking",
+    "Hindustan Unilever Ltd.": "FMCG",
+    "State Bank of India (SBI)": "Banking",
+    "Bharti Airtel Ltd.": "Telecom",
+    "ITC Ltd.": "FMCG",
+    "Kotak Mahindra Bank Ltd.": "Banking",
+    "Larsen & Toubro Ltd.": "Infrastructure",
+    "Axis Bank Ltd.": "Banking",
+    "Asian Paints Ltd.": "FMCG",
+    "Bajaj Finance Ltd.": "Banking",
+    "Maruti Suzuki India Ltd.": "Auto",
+    "Titan Company Ltd.": "FMCG",
+    "Sun Pharmaceutical Industries Ltd.": "Pharma",
+    "Wipro Ltd.": "IT",
+    "Tech Mahindra Ltd.": "IT",
+    "Tata Motors Ltd.": "Auto",
+    "HCL Technologies Ltd.": "IT",
+    "NTPC Ltd.": "Infrastructure",
+    "Tata Steel Ltd.": "Metals",
+    "Power Grid Corporation of India Ltd.": "Infrastructure",
+    "Oil & Natural Gas Corporation Ltd. (ONGC)": "Oil & Gas",
+    "JSW Steel Ltd.": "Metals",
+    "Cipla Ltd.": "Pharma",
+    "Dr. Reddy's Laboratories Ltd.": "Pharma",
+    "Bajaj Finserv Ltd.": "Banking",
+    "Adani Enterprises Ltd.": "Infrastructure",
+    "Nestle India Ltd.": "FMCG",
+    "Coal India Ltd.": "Metals",
+    "Hindalco Industries Ltd.": "Metals",
+    "Grasim Industries Ltd.": "Infrastructure",
+    "UltraTech Cement Ltd.": "Infrastructure",
+    "Adani Ports and Special Economic Zone Ltd.": "Infrastructure",
+    "Eicher Motors Ltd.": "Auto",
+    "Bajaj Auto Ltd.": "Auto",
+    "Tata Consumer Products Ltd.": "FMCG",
+    "Apollo Hospitals Enterprise Ltd.": "Pharma",
+    "Bharat Electronics Ltd.": "Infrastructure",
+    "HDFC Life Insurance Co. Ltd.": "Banking",
+    "SBI Life Insurance Company Ltd.": "Banking",
+    "InterGlobe Aviation Ltd. (IndiGo)": "Airlines",
+    "Shriram Finance Ltd.": "Banking",
+    "Trent Ltd.": "FMCG",
+    "Zomato Ltd.": "FMCG",
+    "Max Healthcare Institute Ltd.": "Pharma",
+    "Jio Financial Services Ltd.": "Banking"
+}
+
+# Sector-specific risk factors (read-only)
+SECTOR_RISKS = {
+    "IT": (
+        "US immigration policy changes affecting H1B visas",
+        "Data localization requirements in major markets"
+    ),
+    "Banking": (
+        "Changes in foreign investment limits",
+        "Cross-border payment regulations"
+    ),
+    "Oil & Gas": (
+        "OPEC+ production decisions",
+        "Middle East tensions affecting oil prices"
+    ),
+    "Pharma": (
+        "Drug pricing regulations in export markets",
+        "API supply chain dependencies on China"
+    ),
+    "Auto": (
+        "EV policy changes and incentives",
+        "Semiconductor supply chain disruptions"
+    ),
+    "Metals": (
+        "Anti-dumping duties and trade barriers",
+        "China's steel production policies"
+    ),
+    "FMCG": (
+        "Commodity price volatility",
+        "Agricultural policy changes"
+    ),
+    "Infrastructure": (
+        "Government capex and infrastructure spending",
+        "Environmental clearance regulations"
+    ),
+    "Airlines": (
+        "Fuel price volatility",
+        "International travel restrictions"
+    )
+}
+
+# Key areas to monitor per sector
+MONITORING_AREAS = {
+    "IT": ("US tech policy", "Currency movements", "Global IT spending"),
+    "Banking": ("RBI policies", "NPA regulations", "Credit growth"),
+    "Oil & Gas": ("OPEC decisions", "US sanctions", "Demand outlook"),
+    "Pharma": ("USFDA approvals", "Drug pricing", "API regulations"),
+    "Auto": ("EV policies", "Chip supply", "Demand recovery"),
+    "Metals": ("China demand", "Trade duties", "Green transition"),
+    "FMCG": ("Rural demand", "Input costs", "GST changes"),
+    "Infrastructure": ("Government spending", "Interest rates", "Project awards"),
+    "Airlines": ("ATF prices", "Travel recovery", "Competition")
+}
+
+# Historical geopolitical impact per sector
+HISTORICAL_IMPACT = {
+    "IT": {
+        "2008 Crisis": "Revenue growth slowdown",
+        "COVID-2020": "Work-from-home demand surge",
+        "US Recession Fears": "Deal deferrals"
+    },
+    "Banking": {
+        "Demonetization 2016": "Deposit surge, loan growth hit",
+        "IL&FS Crisis 2018": "NBFC liquidity crunch",
+        "COVID-2020": "NPA concerns, moratorium"
+    },
+    "Oil & Gas": {
+        "2014 Oil Crash": "Margin pressure",
+        "2022 Russia-Ukraine": "Inventory gains",
+        "OPEC Cuts": "Price volatility"
+    }
+}
+
+# Key risk message reported when a category has events, in report order
+_RISK_RULES = (
+    ("conflicts", "Ongoing geopolitical conflicts may cause market volatility"),
+    ("tariffs", "Trade tariff changes affecting export-oriented sectors"),
+    ("sanctions", "Economic sanctions impacting international trade"),
+    ("pandemics", "Health crisis concerns affecting market sentiment"),
+    ("natural_disasters", "Natural disasters disrupting supply chains"),
+    ("policy_changes", "Government policy changes creating regulatory uncertainty"),
+    ("monetary_policy", "Central bank policy shifts affecting liquidity")
+)
+
+# Integer ids for the event histogram; the extra last id collects unknown categories
+_CAT_NAMES = tuple(EVENT_CATEGORIES)
+_CAT2ID = {name: i for i, name in enumerate(_CAT_NAMES)}
+
+_CAT_BITS = np.left_shift(1, np.arange(len(_CAT_NAMES), dtype=np.int64))
+
+# Relevant categories per sector: ids in the sector's listed order, and the same set
+# as a bitmap over the ids (names that are not event categories are ignored)
+_SECTOR_CAT_IDS = {
+    sector: tuple(_CAT2ID[cat] for cat in cats if cat in _CAT2ID)
+    for sector, cats in SECTOR_IMPACT.items()
+}
+_SECTOR_MASK = {
+    sector: sum(1 << i for i in ids) for sector, ids in _SECTOR_CAT_IDS.items()
+}
+
+# Impact levels in histogram column order
+_IMPACT_LEVELS = ("high", "medium", "low")
+_IMPACT2ID = {level: i for i, level in enumerate(_IMPACT_LEVELS)}
+
+# Risk score edges and the recommendation / allocation for each bucket (lowest risk first)
+_RISK_EDGES = (30, 50, 70)
+_RISK_TEMPLATES = (
+    {"action": "Favorable", "strategy": "Supportive environment for equity investments", "confidence": 0.7},
+    {"action": "Neutral", "strategy": "Continue normal investment approach", "confidence": 0.5},
+    {"action": "Cautious", "strategy": "Maintain positions, avoid aggressive buying", "confidence": 0.6},
+    {"action": "Reduce Exposure", "strategy": "Defensive positioning, increase cash allocation", "confidence": 0.7}
+)
+_PORTFOLIO_SUGGESTIONS = (
+    "Consider 70% equity, 25% debt, 5% alternatives",
+    "Consider 60% equity, 30% debt, 10% alternatives",
+    "Consider 50% equity, 35% debt, 15% alternatives",
+    "Consider 40% equity, 40% debt, 20% gold/cash"
+)
+
+
+# Below this many events the per-sector index beats an embedding search in analyze
+_SECTOR_INDEX_MAX_EVENTS = 5000
+
+# Explicit signatures compile the kernels once at import and cache=True keeps the
+# machine code on disk, so only the first process on a fresh install pays for it
+
+@njit("int32[:, :](int8[:], int8[:], int64)", cache=True)
+def _bucket_counts(cat_ids, impact_ids, n_cats):
+    """Count events per (category, impact level); column 3 collects unknown impact levels"""
+    out = np.zeros((n_cats, 4), np.int32)
+    for i in range(cat_ids.size):
+        j = impact_ids[i] if impact_ids[i] >= 0 else 3
+        out[cat_ids[i], j] += 1
+    return out
+
+
+@njit("int64(int32[:])", cache=True)
+def _weighted_risk_score(impact_dist):
+    """Risk points for a (high, medium, low) event count vector"""
+    return 30 * impact_dist[0] + 15 * impact_dist[1] + 5 * impact_dist[2]
+
 
 class GeopoliticalAgent(BaseAgent):
     """
@@ -15,94 +245,25 @@ class GeopoliticalAgent(BaseAgent):
     def __init__(self, model_name: str = "llama3.2"):
         super().__init__("Geopolitical Agent", model_name)
         
-        # Categories of geopolitical events
-        self.event_categories = {
-            "tariffs": "Trade Tariffs & Duties",
-            "trade_agreements": "Trade Agreements",
-            "g20": "G20 Meetings & Summits",
-            "policy_changes": "Government Policy Changes",
-            "monetary_policy": "Central Bank Policies",
-            "conflicts": "Wars & Conflicts",
-            "sanctions": "Economic Sanctions",
-            "pandemics": "Pandemics & Health Crises",
-            "natural_disasters": "Natural Disasters",
-            "elections": "Elections & Political Changes",
-            "diplomatic": "Diplomatic Relations",
-            "supply_chain": "Supply Chain Disruptions"
-        }
-        
-        # Sector impact mapping
-        self.sector_impact = {
-            "IT": ["tariffs", "trade_agreements", "policy_changes", "sanctions"],
-            "Banking": ["monetary_policy", "policy_changes", "elections", "sanctions"],
-            "Oil & Gas": ["conflicts", "sanctions", "tariffs", "natural_disasters"],
-            "Pharma": ["pandemics", "trade_agreements", "policy_changes", "tariffs"],
-            "Auto": ["tariffs", "supply_chain", "trade_agreements", "policy_changes"],
-            "Metals": ["tariffs", "conflicts", "sanctions", "trade_agreements"],
-            "FMCG": ["pandemics", "natural_disasters", "supply_chain", "policy_changes"],
-            "Infrastructure": ["policy_changes", "elections", "natural_disasters"],
-            "Telecom": ["policy_changes", "sanctions", "trade_agreements"],
-            "Airlines": ["conflicts", "pandemics", "natural_disasters", "oil_prices"]
-        }
-        
-        # Stock to sector mapping (NSE 50 stocks)
-        self.stock_sectors = {
-            "Reliance Industries Ltd.": "Oil & Gas",
-            "Tata Consultancy Services Ltd. (TCS)": "IT",
-            "HDFC Bank Ltd.": "Banking",
-            "Infosys Ltd.": "IT",
-            "ICICI Bank Ltd.": "Banking",
-            "Hindustan Unilever Ltd.": "FMCG",
-            "State Bank of India (SBI)": "Banking",
-            "Bharti Airtel Ltd.": "Telecom",
-            "ITC Ltd.": "FMCG",
-            "Kotak Mahindra Bank Ltd.": "Banking",
-            "Larsen & Toubro Ltd.": "Infrastructure",
-            "Axis Bank Ltd.": "Banking",
-            "Asian Paints Ltd.": "FMCG",
-            "Bajaj Finance Ltd.": "Banking",
-            "Maruti Suzuki India Ltd.": "Auto",
-            "Titan Company Ltd.": "FMCG",
-            "Sun Pharmaceutical Industries Ltd.": "Pharma",
-            "Wipro Ltd.": "IT",
-            "Tech Mahindra Ltd.": "IT",
-            "Tata Motors Ltd.": "Auto",
-            "HCL Technologies Ltd.": "IT",
-            "NTPC Ltd.": "Infrastructure",
-            "Tata Steel Ltd.": "Metals",
-            "Power Grid Corporation of India Ltd.": "Infrastructure",
-            "Oil & Natural Gas Corporation Ltd. (ONGC)": "Oil & Gas",
-            "JSW Steel Ltd.": "Metals",
-            "Cipla Ltd.": "Pharma",
-            "Dr. Reddy's Laboratories Ltd.": "Pharma",
-            "Bajaj Finserv Ltd.": "Banking",
-            "Adani Enterprises Ltd.": "Infrastructure",
-            "Nestle India Ltd.": "FMCG",
-            "Coal India Ltd.": "Metals",
-            "Hindalco Industries Ltd.": "Metals",
-            "Grasim Industries Ltd.": "Infrastructure",
-            "UltraTech Cement Ltd.": "Infrastructure",
-            "Adani Ports and Special Economic Zone Ltd.": "Infrastructure",
-            "Eicher Motors Ltd.": "Auto",
-            "Bajaj Auto Ltd.": "Auto",
-            "Tata Consumer Products Ltd.": "FMCG",
-            "Apollo Hospitals Enterprise Ltd.": "Pharma",
-            "Bharat Electronics Ltd.": "Infrastructure",
-            "HDFC Life Insurance Co. Ltd.": "Banking",
-            "SBI Life Insurance Company Ltd.": "Banking",
-            "InterGlobe Aviation Ltd. (IndiGo)": "Airlines",
-            "Shriram Finance Ltd.": "Banking",
-            "Trent Ltd.": "FMCG",
-            "Zomato Ltd.": "FMCG",
-            "Max Healthcare Institute Ltd.": "Pharma",
-            "Jio Financial Services Ltd.": "Banking"
-        }
+        # Shared module-level tables
+        self.event_categories = EVENT_CATEGORIES
+        self.sector_impact = SECTOR_IMPACT
+        self.stock_sectors = STOCK_SECTORS
         
         # Geopolitical events storage
         self.events_data = []
         self.impact_scores = {}
         
-        print("✓ Geopolitical Agent initialized")
+        # Event indexes rebuilt on every load
+        self._categories_covered = set()
+        self._events_by_category = {}
+        self._events_by_sector = {}
+        self._event_docs = []
+        
+        # Retrieved events per (query, k); the set of distinct queries is ~one per sector
+        self._retrieval_cache = {}
+        
+        logger.info("✓ Geopolitical Agent initialized")
     
     def load_geopolitical_events(self, events: List[Dict[str, Any]]):
         """
@@ -120,27 +281,45 @@ class GeopoliticalAgent(BaseAgent):
                    - source: News source
         """
         self.events_data = events
+        self._retrieval_cache.clear()
+        self._events_by_category = {}
+        self._events_by_sector = {}
         
         texts = []
         metadatas = []
         
-        for event in events:
-            text = f"{event.get('title', '')} - {event.get('description', '')} " \
-                   f"Category: {event.get('category', 'unknown')} " \
-                   f"Impact: {event.get('impact_level', 'medium')}"
+        by_category = self._events_by_category
+        by_sector = self._events_by_sector
+        
+        for i, event in enumerate(events):
+            g = event.get
+            category = g('category', 'unknown')
+            impact = g('impact_level', 'medium')
+            sectors = g('sectors_affected', [])
             
-            texts.append(text)
+            by_category.setdefault(category, []).append(event)
+            for s in sectors:
+                by_sector.setdefault(s, []).append(i)
+            
+            texts.append(f"{g('title', '')} - {g('description', '')} Category: {category} Impact: {impact}")
             metadatas.append({
-                "category": event.get('category', 'unknown'),
-                "date": str(event.get('date', '')),
-                "impact_level": event.get('impact_level', 'medium'),
-                "countries": ','.join(event.get('countries_affected', [])),
-                "sectors": ','.join(event.get('sectors_affected', []))
+                "category": category,
+                "date": str(g('date', '')),
+                "impact_level": impact,
+                "countries": ','.join(g('countries_affected', [])),
+                "sectors": ','.join(sectors)
             })
         
+        self._categories_covered = set(self._events_by_category)
+        
+        # Same shape as retrieve_context results, for the sector fast path
+        self._event_docs = [
+            {"content": text, "metadata": metadata} for text, metadata in zip(texts, metadatas)
+        ]
+        
         if texts:
             self.add_documents(texts, metadatas)
-            print(f"✓ Loaded {len(events)} geopolitical events")
+            logger.info("✓ Loaded %d geopolitical events", len(events))
     
     def analyze(self, stock_name: str = None, timeframe: str = "30d") -> Dict[str, Any]:
         """
@@ -153,31 +332,68 @@ class GeopoliticalAgent(BaseAgent):
         Returns:
             Dict containing geopolitical analysis and impact assessment
         """
-        print(f"\n🌍 Analyzing geopolitical factors...")
+        result, prompt = self._prepare_analysis(stock_name, timeframe)
+        result["ai_insight"] = self.generate_response(prompt)
+        return result
+    
+    async def analyze_async(self, stock_name: str = None, timeframe: str = "30d",
+                            session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """analyze() awaiting the LLM instead of blocking on it"""
+        result, prompt = self._prepare_analysis(stock_name, timeframe)
+        result["ai_insight"] = await self.agenerate_response(prompt, session=session)
+        return result
+    
+    def analyze_batch(self, stock_names: List[str], timeframe: str = "30d") -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze several stocks, sending all LLM prompts concurrently
+        
+        Args:
+            stock_names: Stock names to analyze
+            timeframe: Analysis timeframe (7d, 30d, 90d)
+            
+        Returns:
+            Dict mapping each stock name to its analysis
+        """
+        prepared = [self._prepare_analysis(stock_name, timeframe) for stock_name in stock_names]
+        insights = self.generate_responses([prompt for _, prompt in prepared])
+        
+        results = {}
+        for stock_name, (result, _), insight in zip(stock_names, prepared, insights):
+            result["ai_insight"] = insight
+            results[stock_name] = result
+        return results
+    
+    def _prepare_analysis(self, stock_name: Optional[str], timeframe: str):
+        """Run every analysis step except the LLM call; returns (result, insight prompt)"""
+        logger.info("Analyzing geopolitical factors...")
         
         # Determine sector if stock provided
         sector = None
         if stock_name:
             sector = self.stock_sectors.get(stock_name, "General")
-            print(f"   Stock: {stock_name}, Sector: {sector}")
+            logger.info("Stock: %s, Sector: %s", stock_name, sector)
         
-        # Get relevant events
-        query = f"geopolitical events {sector if sector else 'India market'} impact"
-        relevant_events = self.retrieve_context(query, k=10)
+        # Get relevant events; small corpora answer sector queries from the index
+        sector_events = self._events_by_sector.get(sector) if sector else None
+        if sector_events and len(self.events_data) < _SECTOR_INDEX_MAX_EVENTS:
+            relevant_events = [self._event_docs[i] for i in sector_events[:10]]
+        else:
+            query = f"geopolitical events {sector if sector else 'India market'} impact"
+            relevant_events = self._retrieve_cached(query, k=10)
         
         # Analyze events
-        event_analysis = self._analyze_events(relevant_events, sector)
+        event_analysis, impact_dist_arr = self._analyze_events(relevant_events, sector)
         
         # Calculate risk scores
-        risk_assessment = self._calculate_risk_scores(event_analysis, sector)
+        risk_assessment = self._calculate_risk_scores(event_analysis, sector, impact_dist_arr)
         
-        # Generate AI insights
-        ai_insight = self._generate_geopolitical_insights(stock_name, sector, event_analysis, risk_assessment)
+        # Prompt for the AI insights, answered by the caller
+        prompt = self._build_geopolitical_prompt(stock_name, sector, event_analysis, risk_assessment)
         
         # Get sector-specific factors
         sector_factors = self._get_sector_factors(sector) if sector else self._get_market_factors()
         
-        return {
+        result = {
             "stock": stock_name,
             "sector": sector,
             "analysis_date": datetime.now().strftime("%Y-%m-%d"),
@@ -185,90 +401,116 @@ class GeopoliticalAgent(BaseAgent):
             "event_summary": event_analysis,
             "risk_assessment": risk_assessment,
             "sector_factors": sector_factors,
-            "ai_insight": ai_insight,
+            "ai_insight": None,
             "recommendation": self._get_geopolitical_recommendation(risk_assessment)
         }
+        return result, prompt
     
-    def _analyze_events(self, events: List[Dict], sector: str = None) -> Dict[str, Any]:
-        """Analyze retrieved events and categorize them"""
-        categories = {cat: [] for cat in self.event_categories.keys()}
-        
-        impact_counts = {"high": 0, "medium": 0, "low": 0}
-        
-        for event in events:
-            content = event.get('content', '')
-            metadata = event.get('metadata', {})
-            
-            category = metadata.get('category', 'policy_changes')
-            impact = metadata.get('impact_level', 'medium')
-            
-            if category in categories:
-                categories[category].append({
-                    "content": content[:200],
+    def _retrieve_cached(self, query: str, k: int) -> List[Dict]:
+        """retrieve_context memoized until the next event load; callers must not mutate the result"""
+        key = (query, k)
+        docs = self._retrieval_cache.get(key)
+        if docs is None:
+            docs = self.retrieve_context(query, k=k)
+            if docs:
+                self._retrieval_cache[key] = docs
+        return docs
+    
+    def _analyze_events(self, events: List[Dict], sector: str = None) -> Tuple[Dict[str, Any], np.ndarray]:
+        """Analyze retrieved events and categorize them; also returns the (high, medium, low) count array"""
+        n_known = len(_CAT_NAMES)
+        metadatas = [event.get('metadata', {}) for event in events]
+        
+        # Encode categories and impact levels once, then count them in one pass
+        cat_ids = np.fromiter(
+            (_CAT2ID.get(m.get('category', 'policy_changes'), n_known) for m in metadatas),
+            dtype=np.int8, count=len(metadatas)
+        )
+        impacts = [m.get('impact_level', 'medium') for m in metadatas]
+        impact_ids = np.fromiter(
+            (_IMPACT2ID.get(impact, -1) for impact in impacts),
+            dtype=np.int8, count=len(impacts)
+        )
+        counts = _bucket_counts(cat_ids, impact_ids, n_known + 1)
+        
+        # (high, medium, low) counts, in _IMPACT_LEVELS order
+        impact_dist_arr = counts[:, :3].sum(axis=0).astype(np.int32)
+        impact_counts = dict(zip(_IMPACT_LEVELS, impact_dist_arr.tolist()))
+        for impact, impact_id in zip(impacts, impact_ids):
+            if impact_id < 0:
+                impact_counts[impact] = impact_counts.get(impact, 0) + 1
+        
+        # Keep only non-empty categories, restricted to the sector's if provided
+        totals = counts.sum(axis=1)
+        present_mask = int(np.dot(totals[:n_known] > 0, _CAT_BITS))
+        
+        if sector and sector in _SECTOR_MASK:
+            mask = _SECTOR_MASK[sector] & present_mask
+            wanted = [i for i in _SECTOR_CAT_IDS[sector] if mask >> i & 1]
+        else:
+            # Walk the set bits lowest first, i.e. in category order
+            wanted = []
+            mask = present_mask
+            while mask:
+                bit = mask & -mask
+                wanted.append(bit.bit_length() - 1)
+                mask ^= bit
+        relevant_categories = {_CAT_NAMES[i]: [] for i in wanted}
+        
+        # (event count, high-impact count) per reported category, shared downstream
+        category_stats = {_CAT_NAMES[i]: (int(totals[i]), int(counts[i, 0])) for i in wanted}
+        
+        # Materialize event entries only for the categories that are reported
+        for event, metadata, cat_id, impact in zip(events, metadatas, cat_ids, impacts):
+            entries = relevant_categories.get(_CAT_NAMES[cat_id]) if cat_id < n_known else None
+            if entries is not None:
+                entries.append({
+                    "content": event.get('content', '')[:200],
                     "date": metadata.get('date', 'Unknown'),
                     "impact": impact
                 })
-            
-            impact_counts[impact] = impact_counts.get(impact, 0) + 1
         
-        # Filter to relevant categories if sector provided
-        relevant_categories = {}
-        if sector and sector in self.sector_impact:
-            relevant_cats = self.sector_impact[sector]
-            relevant_categories = {cat: categories[cat] for cat in relevant_cats if categories[cat]}
-        else:
-            relevant_categories = {cat: events for cat, events in categories.items() if events}
-        
-        return {
+        event_analysis = {
             "total_events": len(events),
             "impact_distribution": impact_counts,
             "categories": relevant_categories,
-            "top_concerns": self._identify_top_concerns(relevant_categories)
+            "category_stats": category_stats,
+            "top_concerns": self._identify_top_concerns(category_stats)
         }
+        return event_analysis, impact_dist_arr
     
-    def _identify_top_concerns(self, categories: Dict) -> List[Dict]:
+    def _identify_top_concerns(self, category_stats: Dict[str, Tuple[int, int]]) -> List[Dict]:
         """Identify top geopolitical concerns"""
-        concerns = []
-        
-        for category, events in categories.items():
-            if events:
-                high_impact = sum(1 for e in events if e.get('impact') == 'high')
-                concerns.append({
-                    "category": self.event_categories.get(category, category),
-                    "event_count": len(events),
-                    "high_impact_count": high_impact,
-                    "severity": "High" if high_impact > 0 else "Medium" if len(events) > 2 else "Low"
-                })
-        
-        # Sort by severity and count
-        concerns.sort(key=lambda x: (x['high_impact_count'], x['event_count']), reverse=True)
-        return concerns[:5]
+        # Top five by high-impact then total count, ties kept in category order
+        top = heapq.nlargest(5, category_stats.items(), key=lambda item: (item[1][1], item[1][0]))
+        
+        return [
+            {
+                "category": self.event_categories.get(category, category),
+                "event_count": count,
+                "high_impact_count": high_impact,
+                "severity": "High" if high_impact > 0 else "Medium" if count > 2 else "Low"
+            }
+            for category, (count, high_impact) in top
+        ]
     
-    def _calculate_risk_scores(self, event_analysis: Dict, sector: str = None) -> Dict[str, Any]:
+    def _calculate_risk_scores(self, event_analysis: Dict, sector: str = None,
+                               impact_dist_arr: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Calculate geopolitical risk scores"""
         
-        # Base risk score
-        total_events = event_analysis.get('total_events', 0)
-        impact_dist = event_analysis.get('impact_distribution', {})
+        if impact_dist_arr is None:
+            impact_dist = event_analysis.get('impact_distribution', {})
+            impact_dist_arr = np.array([impact_dist.get(level, 0) for level in _IMPACT_LEVELS], dtype=np.int32)
         
-        # Weighted score based on impact levels
-        risk_score = (
-            impact_dist.get('high', 0) * 30 +
-            impact_dist.get('medium', 0) * 15 +
-            impact_dist.get('low', 0) * 5
-        )
-        
-        # Normalize to 0-100
-        risk_score = min(risk_score, 100)
+        # Weighted score based on impact levels, normalized to 0-100
+        risk_score = min(int(_weighted_risk_score(impact_dist_arr)), 100)
         
-        # Category-specific risks
-        category_risks = {}
+        # Category-specific risks: 10 points per event plus 10 per high-impact event
+        category_stats = event_analysis.get('category_stats', {})
         categories = event_analysis.get('categories', {})
         
-        for category, events in categories.items():
-            if events:
-                cat_score = len(events) * 10 + sum(10 for e in events if e.get('impact') == 'high')
-                category_risks[category] = min(cat_score, 100)
+        stats = np.array(list(category_stats.values()), dtype=np.int32).reshape(-1, 2)
+        category_risks = dict(zip(category_stats, np.minimum(stats.sum(axis=1) * 10, 100).tolist()))
         
         # Determine risk level
         if risk_score >= 70:
@@ -291,28 +533,7 @@ class GeopoliticalAgent(BaseAgent):
     
     def _identify_key_risks(self, categories: Dict, sector: str = None) -> List[str]:
         """Identify key risk factors"""
-        risks = []
-        
-        if 'conflicts' in categories and categories['conflicts']:
-            risks.append("Ongoing geopolitical conflicts may cause market volatility")
-        
-        if 'tariffs' in categories and categories['tariffs']:
-            risks.append("Trade tariff changes affecting export-oriented sectors")
-        
-        if 'sanctions' in categories and categories['sanctions']:
-            risks.append("Economic sanctions impacting international trade")
-        
-        if 'pandemics' in categories and categories['pandemics']:
-            risks.append("Health crisis concerns affecting market sentiment")
-        
-        if 'natural_disasters' in categories and categories['natural_disasters']:
-            risks.append("Natural disasters disrupting supply chains")
-        
-        if 'policy_changes' in categories and categories['policy_changes']:
-            risks.append("Government policy changes creating regulatory uncertainty")
-        
-        if 'monetary_policy' in categories and categories['monetary_policy']:
-            risks.append("Central bank policy shifts affecting liquidity")
+        risks = [message for category, message in _RISK_RULES if categories.get(category)]
         
         if sector:
             sector_specific = self._get_sector_specific_risks(sector)
@@ -320,48 +541,9 @@ class GeopoliticalAgent(BaseAgent):
         
         return risks[:5] if risks else ["No significant geopolitical risks identified"]
     
-    def _get_sector_specific_risks(self, sector: str) -> List[str]:
+    def _get_sector_specific_risks(self, sector: str) -> Tuple[str, ...]:
         """Get sector-specific risk factors"""
-        sector_risks = {
-            "IT": [
-                "US immigration policy changes affecting H1B visas",
-                "Data localization requirements in major markets"
-            ],
-            "Banking": [
-                "Changes in foreign investment limits",
-                "Cross-border payment regulations"
-            ],
-            "Oil & Gas": [
-                "OPEC+ production decisions",
-                "Middle East tensions affecting oil prices"
-            ],
-            "Pharma": [
-                "Drug pricing regulations in export markets",
-                "API supply chain dependencies on China"
-            ],
-            "Auto": [
-                "EV policy changes and incentives",
-                "Semiconductor supply chain disruptions"
-            ],
-            "Metals": [
-                "Anti-dumping duties and trade barriers",
-                "China's steel production policies"
-            ],
-            "FMCG": [
-                "Commodity price volatility",
-                "Agricultural policy changes"
-            ],
-            "Infrastructure": [
-                "Government capex and infrastructure spending",
-                "Environmental clearance regulations"
-            ],
-            "Airlines": [
-                "Fuel price volatility",
-                "International travel restrictions"
-            ]
-        }
-        
-        return sector_risks.get(sector, [])
+        return SECTOR_RISKS.get(sector, ())
     
     def _get_sector_factors(self, sector: str) -> Dict[str, Any]:
         """Get sector-specific geopolitical factors"""
@@ -403,45 +585,15 @@ class GeopoliticalAgent(BaseAgent):
     
     def _get_monitoring_areas(self, sector: str) -> List[str]:
         """Get key areas to monitor for a sector"""
-        monitoring = {
-            "IT": ["US tech policy", "Currency movements", "Global IT spending"],
-            "Banking": ["RBI policies", "NPA regulations", "Credit growth"],
-            "Oil & Gas": ["OPEC decisions", "US sanctions", "Demand outlook"],
-            "Pharma": ["USFDA approvals", "Drug pricing", "API regulations"],
-            "Auto": ["EV policies", "Chip supply", "Demand recovery"],
-            "Metals": ["China demand", "Trade duties", "Green transition"],
-            "FMCG": ["Rural demand", "Input costs", "GST changes"],
-            "Infrastructure": ["Government spending", "Interest rates", "Project awards"],
-            "Airlines": ["ATF prices", "Travel recovery", "Competition"]
-        }
-        
-        return monitoring.get(sector, ["General economic indicators"])
+        return list(MONITORING_AREAS.get(sector, ("General economic indicators",)))
     
     def _get_historical_impact(self, sector: str) -> Dict[str, str]:
         """Get historical geopolitical impact on sector"""
-        impacts = {
-            "IT": {
-                "2008 Crisis": "Revenue growth slowdown",
-                "COVID-2020": "Work-from-home demand surge",
-                "US Recession Fears": "Deal deferrals"
-            },
-            "Banking": {
-                "Demonetization 2016": "Deposit surge, loan growth hit",
-                "IL&FS Crisis 2018": "NBFC liquidity crunch",
-                "COVID-2020": "NPA concerns, moratorium"
-            },
-            "Oil & Gas": {
-                "2014 Oil Crash": "Margin pressure",
-                "2022 Russia-Ukraine": "Inventory gains",
-                "OPEC Cuts": "Price volatility"
-            }
-        }
-        
-        return impacts.get(sector, {"General": "Varies by event"})
+        return dict(HISTORICAL_IMPACT.get(sector, {"General": "Varies by event"}))
     
-    def _generate_geopolitical_insights(self, stock_name: str, sector: str, 
-                                        event_analysis: Dict, risk_assessment: Dict) -> str:
-        """Generate AI-powered geopolitical insights"""
+    def _build_geopolitical_prompt(self, stock_name: str, sector: str,
+                                   event_analysis: Dict, risk_assessment: Dict) -> str:
+        """Build the LLM prompt for geopolitical insights"""
         
         context_parts = []
         
@@ -450,21 +602,22 @@ class GeopoliticalAgent(BaseAgent):
         if sector:
             context_parts.append(f"Sector: {sector}")
         
-        context_parts.append(f"Risk Score: {risk_assessment.get('overall_risk_score', 0):.0f}/100")
-        context_parts.append(f"Risk Level: {risk_assessment.get('risk_level', 'Unknown')}")
-        context_parts.append(f"Market Outlook: {risk_assessment.get('market_outlook', 'Unknown')}")
+        rg = risk_assessment.get
+        context_parts.append(f"Risk Score: {rg('overall_risk_score', 0):.0f}/100")
+        context_parts.append(f"Risk Level: {rg('risk_level', 'Unknown')}")
+        context_parts.append(f"Market Outlook: {rg('market_outlook', 'Unknown')}")
         
         top_concerns = event_analysis.get('top_concerns', [])
         if top_concerns:
             context_parts.append("\nTop Concerns:")
-            for concern in top_concerns[:3]:
-                context_parts.append(f"- {concern['category']}: {concern['severity']} severity")
+            context_parts.extend(
+                f"- {c['category']}: {c['severity']} severity" for c in top_concerns[:3]
+            )
         
-        key_risks = risk_assessment.get('key_risk_factors', [])
+        key_risks = rg('key_risk_factors', [])
         if key_risks:
             context_parts.append("\nKey Risks:")
-            for risk in key_risks[:3]:
-                context_parts.append(f"- {risk}")
+            context_parts.extend(f"- {risk}" for risk in key_risks[:3])
         
         context = "\n".join(context_parts)
         
@@ -480,48 +633,24 @@ Provide analysis including:
 
 Keep response under 200 words and be specific to India/NSE context."""
 
-        return self.generate_response(prompt)
+        return prompt
     
     def _get_geopolitical_recommendation(self, risk_assessment: Dict) -> Dict[str, Any]:
         """Generate recommendation based on geopolitical analysis"""
         risk_score = risk_assessment.get('overall_risk_score', 50)
         risk_level = risk_assessment.get('risk_level', 'Moderate')
         
-        if risk_score >= 70:
-            action = "Reduce Exposure"
-            strategy = "Defensive positioning, increase cash allocation"
-            confidence = 0.7
-        elif risk_score >= 50:
-            action = "Cautious"
-            strategy = "Maintain positions, avoid aggressive buying"
-            confidence = 0.6
-        elif risk_score >= 30:
-            action = "Neutral"
-            strategy = "Continue normal investment approach"
-            confidence = 0.5
-        else:
-            action = "Favorable"
-            strategy = "Supportive environment for equity investments"
-            confidence = 0.7
+        template = _RISK_TEMPLATES[bisect.bisect_right(_RISK_EDGES, risk_score)]
         
         return {
-            "action": action,
-            "strategy": strategy,
-            "confidence": confidence,
+            **template,
             "risk_level": risk_level,
             "portfolio_suggestion": self._get_portfolio_suggestion(risk_score)
         }
     
     def _get_portfolio_suggestion(self, risk_score: float) -> str:
         """Get portfolio allocation suggestion based on risk"""
-        if risk_score >= 70:
-            return "Consider 40% equity, 40% debt, 20% gold/cash"
-        elif risk_score >= 50:
-            return "Consider 50% equity, 35% debt, 15% alternatives"
-        elif risk_score >= 30:
-            return "Consider 60% equity, 30% debt, 10% alternatives"
-        else:
-            return "Consider 70% equity, 25% debt, 5% alternatives"
+        return _PORTFOLIO_SUGGESTIONS[bisect.bisect_right(_RISK_EDGES, risk_score)]
     
     def get_event_summary(self, category: str = None) -> Dict[str, Any]:
         """Get summary of geopolitical events by category"""
@@ -530,13 +659,13 @@ Keep response under 200 words and be specific to India/NSE context."""
         
         events = self.events_data
         if category:
-            events = [e for e in events if e.get('category') == category]
+            events = self._events_by_category.get(category, [])
         
         return {
             "total_events": len(events),
             "category": category or "All",
-            "recent_events": events[:5] if events else [],
-            "categories_covered": list(set(e.get('category', 'unknown') for e in self.events_data))
+            "recent_events": heapq.nlargest(5, events, key=lambda e: str(e.get('date', ''))),
+            "categories_covered": list(self._categories_covered)
         }
     
     def track_specific_event(self, event_type: str) -> Dict[str, Any]:
@@ -555,7 +684,8 @@ Keep response under 200 words and be specific to India/NSE context."""
         if not docs:
             return f"No recent {event_type} events found in database"
         
-        context = "\n".join([d.get('content', '')[:200] for d in docs[:3]])
+        # Each document keeps its own 200-character cap; docs are not copied first
+        context = "\n".join(d.get('content', '')[:200] for d in islice(docs, 3))
         
         prompt = f"""Analyze the following {event_type} events and their potential impact on Indian markets:
 
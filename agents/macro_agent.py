@@ -1,8 +1,24 @@
 from agents.base_agent import BaseAgent
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
+import aiohttp
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+_PROMPT_PREAMBLE = (
+    "You are a macro economist analyzing the Indian economy. "
+    "Based on the following indicators, provide analysis.\n\n"
+    "Current Economic Indicators:\n"
+)
+
+
+@lru_cache(maxsize=64)
+def _indicator_prompt_prefix(signature: Tuple[Tuple[str, float, str], ...]) -> str:
+    """Preamble plus indicator lines for one (name, value, trend) signature"""
+    lines = "\n".join(f"- {name}: {value:.2f} ({trend})" for name, value, trend in signature)
+    return _PROMPT_PREAMBLE + lines
+
 
 class MacroEconomicAgent(BaseAgent):
     """Macro Economic Indicator Analysis Agent"""
@@ -23,6 +39,11 @@ class MacroEconomicAgent(BaseAgent):
         }
         
         self.economic_data = {}
+        
+        # Derived at load time: latest reading and value array per indicator
+        self._latest = {}
+        self._values_np = {}
+        self._date_index = {}
         print("✓ Macro Economic Agent initialized")
     
     def load_economic_data(self, data: Dict[str, pd.DataFrame]):
@@ -34,6 +55,26 @@ class MacroEconomicAgent(BaseAgent):
                   Each DataFrame should have columns: 'date', 'value'
         """
         self.economic_data = data
+        self._values_np = {
+            indicator: df['value'].to_numpy(dtype=np.float64) for indicator, df in data.items()
+        }
+        
+        # Row of each date string (first occurrence) for compare_periods
+        self._date_index = {}
+        for indicator, df in data.items():
+            index = {}
+            for i, date in enumerate(df['date'].astype(str).tolist()):
+                index.setdefault(date, i)
+            self._date_index[indicator] = index
+        
+        self._latest = {
+            indicator: {
+                "value": float(df['value'].iloc[-1]),
+                "date": str(df['date'].iloc[-1]),
+                "name": self.indicators.get(indicator, indicator)
+            }
+            for indicator, df in data.items() if not df.empty
+        }
         
         # Create embeddings from economic reports
         texts = []
@@ -43,15 +84,17 @@ class MacroEconomicAgent(BaseAgent):
             if df.empty:
                 continue
             
-            # Create summary text for each time period
-            for idx, row in df.iterrows():
-                text = f"{self.indicators.get(indicator, indicator)}: {row['value']} on {row['date']}"
-                texts.append(text)
-                metadatas.append({
-                    "indicator": indicator,
-                    "date": str(row['date']),
-                    "value": float(row['value'])
-                })
+            # Create summary text for each time period; str() per element keeps
+            # Timestamps as "YYYY-MM-DD HH:MM:SS", unlike Series.astype(str)
+            label = self.indicators.get(indicator, indicator)
+            dates = [str(d) for d in df['date'].tolist()]
+            values = df['value'].tolist()
+            
+            texts.extend(f"{label}: {v} on {d}" for v, d in zip(values, dates))
+            metadatas.extend(
+                {"indicator": indicator, "date": d, "value": float(v)}
+                for v, d in zip(values, dates)
+            )
         
         if texts:
             self.add_documents(texts, metadatas)
@@ -59,34 +102,49 @@ class MacroEconomicAgent(BaseAgent):
     
     def get_latest_indicators(self) -> Dict[str, Any]:
         """Get latest values of all indicators"""
-        latest = {}
-        for indicator, df in self.economic_data.items():
-            if not df.empty:
-                latest[indicator] = {
-                    "value": float(df.iloc[-1]['value']),
-                    "date": str(df.iloc[-1]['date']),
-                    "name": self.indicators.get(indicator, indicator)
-                }
-        return latest
+        return {indicator: dict(entry) for indicator, entry in self._latest.items()}
     
-    def calculate_trend(self, indicator: str, periods: int = 3) -> str:
+    def calculate_trend(self, indicator: str, periods: int = 3, threshold: float = 1.0) -> str:
         """Calculate trend for an indicator"""
         if indicator not in self.economic_data:
             return "unknown"
         
-        df = self.economic_data[indicator]
-        if len(df) < periods:
+        values = self._values_np[indicator]
+        if len(values) < periods:
             return "insufficient_data"
         
-        recent_values = df.tail(periods)['value'].values
-        
-        # Calculate simple trend
-        if all(recent_values[i] <= recent_values[i+1] for i in range(len(recent_values)-1)):
-            return "increasing"
-        elif all(recent_values[i] >= recent_values[i+1] for i in range(len(recent_values)-1)):
-            return "decreasing"
-        else:
-            return "stable"
+        return self._zscore_trends(values[len(values) - periods:][None, :], threshold)[0]
+    
+    def calculate_trends(self, periods: int = 3, threshold: float = 1.0) -> Dict[str, str]:
+        """Trend of every loaded indicator, same rules as calculate_trend"""
+        trends = {}
+        tails = {}
+        for indicator, values in self._values_np.items():
+            if len(values) < periods:
+                trends[indicator] = "insufficient_data"
+            else:
+                trends[indicator] = None
+                tails[indicator] = values[len(values) - periods:]
+        
+        if tails:
+            # One (indicators x periods) matrix scored in a single pass
+            labels = self._zscore_trends(np.vstack(list(tails.values())), threshold)
+            trends.update(zip(tails, labels))
+        
+        return trends
+    
+    @staticmethod
+    def _zscore_trends(x: np.ndarray, threshold: float) -> List[str]:
+        """
+        Label each row by the z-score of its last value against the row's mean:
+        above threshold is increasing, below -threshold decreasing, else stable
+        """
+        last = x[:, -1]
+        mean = x.mean(axis=1)
+        std = x.std(axis=1)
+        std[std == 0] = np.nan  # flat windows score as NaN -> "stable"
+        z = (last - mean) / std
+        return np.select([z > threshold, z < -threshold], ["increasing", "decreasing"], default="stable").tolist()
     
     def analyze(self, stock_name: str = None, timeframe: str = "current") -> Dict[str, Any]:
         """
@@ -96,6 +154,21 @@ class MacroEconomicAgent(BaseAgent):
             stock_name: Optional stock name for sector-specific analysis
             timeframe: Analysis timeframe ("current", "1m", "3m", "1y")
         """
+        result, prompt = self._prepare_analysis(stock_name, timeframe)
+        if prompt is not None:
+            result["llm_insight"] = self.generate_response(prompt)
+        return result
+    
+    async def analyze_async(self, stock_name: str = None, timeframe: str = "current",
+                            session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """analyze() awaiting the LLM instead of blocking on it"""
+        result, prompt = self._prepare_analysis(stock_name, timeframe)
+        if prompt is not None:
+            result["llm_insight"] = await self.agenerate_response(prompt, session=session)
+        return result
+    
+    def _prepare_analysis(self, stock_name: Optional[str], timeframe: str):
+        """Run every analysis step except the LLM call; returns (result, insight prompt or None)"""
         print(f"\n📊 Analyzing macro economic indicators...")
         
         if not self.economic_data:
@@ -103,35 +176,27 @@ class MacroEconomicAgent(BaseAgent):
                 "error": "No economic data loaded. Please load data first.",
                 "indicators": {},
                 "outlook": "unknown"
-            }
+            }, None
         
         # Get latest indicators
         latest = self.get_latest_indicators()
         
         # Calculate trends
-        trends = {}
-        for indicator in self.economic_data.keys():
-            trends[indicator] = self.calculate_trend(indicator)
+        trends = self.calculate_trends()
         
         # Retrieve relevant economic context
         query = f"economic indicators impact on {stock_name if stock_name else 'Indian stock market'}"
         context_docs = self.retrieve_context(query, k=5)
         
-        # Build context for LLM
-        indicator_summary = []
-        for indicator, data in latest.items():
-            trend = trends.get(indicator, "stable")
-            indicator_summary.append(
-                f"- {data['name']}: {data['value']:.2f} ({trend})"
-            )
-        
-        context_text = "\n".join(indicator_summary)
+        # Build context for LLM; the rendered indicator block only changes
+        # when the data does, so repeated analyses reuse it
+        signature = tuple(
+            (data['name'], data['value'], trends.get(indicator, "stable"))
+            for indicator, data in latest.items()
+        )
         
         # Generate LLM analysis
-        prompt = f"""You are a macro economist analyzing the Indian economy. Based on the following indicators, provide analysis.
-
-Current Economic Indicators:
-{context_text}
+        prompt = f"""{_indicator_prompt_prefix(signature)}
 
 {"Analysis for: " + stock_name if stock_name else "General Market Analysis"}
 
@@ -148,34 +213,36 @@ Consider:
 - Global factors (crude oil, USD)
 
 Keep response under 200 words."""
-
-        llm_insight = self.generate_response(prompt)
         
-        # Calculate economic health score (0-100)
-        scores = []
+        # Calculate economic health score (0-100) as a running mean
+        total, count = 0.0, 0
         
         # GDP growth (higher is better)
         if "gdp_growth" in latest:
             gdp = latest["gdp_growth"]["value"]
-            scores.append(min(gdp * 10, 100))
+            total += min(gdp * 10, 100)
+            count += 1
         
         # Inflation (5-6% is optimal, higher/lower is worse)
         if "inflation_cpi" in latest:
             inflation = latest["inflation_cpi"]["value"]
             inflation_score = 100 - abs(inflation - 5.5) * 10
-            scores.append(max(inflation_score, 0))
+            total += max(inflation_score, 0)
+            count += 1
         
         # Repo rate (stable is good)
         if "repo_rate" in latest:
-            scores.append(60)  # Neutral score
+            total += 60  # Neutral score
+            count += 1
         
         # USD-INR (lower is better)
         if "usd_inr" in latest:
             usd_inr = latest["usd_inr"]["value"]
             usd_score = 100 - (usd_inr - 75) * 2  # 75 as baseline
-            scores.append(max(min(usd_score, 100), 0))
+            total += max(min(usd_score, 100), 0)
+            count += 1
         
-        health_score = np.mean(scores) if scores else 50
+        health_score = total / count if count else 50
         
         # Determine overall outlook
         if health_score > 70:
@@ -196,9 +263,9 @@ Keep response under 200 words."""
             "economic_health_score": float(health_score),
             "outlook": outlook,
             "market_impact": market_impact,
-            "llm_insight": llm_insight,
+            "llm_insight": None,  # filled in by the caller
             "key_factors": self._identify_key_factors(latest, trends)
-        }
+        }, prompt
     
     def _identify_key_factors(self, indicators: Dict, trends: Dict) -> List[str]:
         """Identify key factors affecting the economy"""
@@ -239,14 +306,9 @@ Keep response under 200 words."""
         if indicator not in self.economic_data:
             return {"error": f"Indicator {indicator} not found"}
         
-        df = self.economic_data[indicator]
-        comparison = {}
-        
-        for period in periods:
-            # Simple implementation - can be enhanced
-            if period in df['date'].astype(str).values:
-                value = df[df['date'].astype(str) == period]['value'].iloc[0]
-                comparison[period] = float(value)
+        index = self._date_index[indicator]
+        values = self._values_np[indicator]
+        comparison = {period: float(values[index[period]]) for period in periods if period in index}
         
         return {
             "indicator": self.indicators.get(indicator, indicator),
@@ -2,22 +2,58 @@ from agents.base_agent import BaseAgent
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
+import aiohttp
 from datetime import datetime, timedelta
+from collections import OrderedDict
+import hashlib
+import os
+import shutil
+import threading
+
+# Aggregated sentiment score keys, in score-matrix row order
+SENTIMENT_KEYS = ("positive", "negative", "neutral", "compound")
+
+# Number of per-text sentiment results kept in the LRU cache
+SENTIMENT_CACHE_SIZE = 1000
+
+# Texts per FinBERT forward pass; bounds the padded input tensor and peak memory
+FINBERT_BATCH_SIZE = 32
+
+# FinBERT exported to ONNX, reused across runs so the export happens once
+FINBERT_ONNX_DIR = "./models/finbert_onnx"
 
 class SentimentAgent(BaseAgent):
     """Sentiment Analysis Agent using FinBERT and VADER"""
     
-    def __init__(self, model_name: str = "llama3.2"):
+    def __init__(self, model_name: str = "llama3.2", quantize: bool = True, use_onnx: bool = True,
+                 max_seq_len: int = 256):
         super().__init__("Sentiment Agent", model_name)
         
-        # Initialize FinBERT
+        # FinBERT token budget per text; news snippets carry their signal early
+        self.max_seq_len = max_seq_len
+        
+        # Initialize FinBERT; on CPU prefer ONNX Runtime when optimum is installed
         print("Loading FinBERT model (this may take a moment)...")
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        if self.device == "cuda":
+            # TF32 tensor-core matmuls on Ampere and newer GPUs
+            torch.backends.cuda.matmul.allow_tf32 = True
         try:
             self.finbert_tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-            self.finbert_model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
-            print("✓ FinBERT model loaded")
+            self.finbert_model = None
+            if use_onnx and self.device == "cpu":
+                self.finbert_model = self._load_finbert_onnx()
+            
+            if self.finbert_model is not None:
+                print("✓ FinBERT model loaded on ONNX Runtime")
+            else:
+                self.finbert_model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
+                self.finbert_model.to(self.device).eval()
+                if quantize:
+                    self.finbert_model = self._quantize_finbert(self.finbert_model)
+                print(f"✓ FinBERT model loaded on {self.device}")
         except Exception as e:
             print(f"✗ Failed to load FinBERT - {e}")
             print("  Installing transformers: pip install transformers torch")
@@ -26,36 +62,150 @@ class SentimentAgent(BaseAgent):
         # Initialize VADER (fallback)
         self.vader = SentimentIntensityAnalyzer()
         print("✓ VADER sentiment analyzer loaded")
+        
+        # LRU of sentiment results keyed by (scorer, content digest); the same news
+        # documents come back for many stocks and on every re-analysis
+        self._sentiment_cache = OrderedDict()
+        self._sentiment_cache_lock = threading.Lock()
+        
+        # One forward pass at a time: each already spreads over every core, and
+        # overlapping ones (threaded callers) would only oversubscribe them
+        self._finbert_lock = threading.Lock()
+    
+    def _load_finbert_onnx(self):
+        """FinBERT as an ONNX Runtime session with all graph optimizations, or None if unavailable"""
+        try:
+            import onnxruntime as ort
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError:
+            return None
+        
+        try:
+            session_options = ort.SessionOptions()
+            session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            
+            # Only a directory holding the model file counts as a finished export
+            exported = os.path.isfile(os.path.join(FINBERT_ONNX_DIR, "model.onnx"))
+            model = ORTModelForSequenceClassification.from_pretrained(
+                FINBERT_ONNX_DIR if exported else "ProsusAI/finbert",
+                export=not exported,
+                provider="CPUExecutionProvider",
+                session_options=session_options
+            )
+            if not exported:
+                self._save_finbert_onnx(model)
+            return model
+        except Exception as e:
+            print(f"⚠ ONNX Runtime FinBERT unavailable, using PyTorch - {e}")
+            return None
+    
+    @staticmethod
+    def _save_finbert_onnx(model):
+        """Save the export to a temp directory and rename it into place, so an interrupted save leaves nothing behind"""
+        tmp_dir = f"{FINBERT_ONNX_DIR}.{os.getpid()}.tmp"
+        try:
+            model.save_pretrained(tmp_dir)
+            shutil.rmtree(FINBERT_ONNX_DIR, ignore_errors=True)  # leftovers of an unfinished export
+            os.replace(tmp_dir, FINBERT_ONNX_DIR)
+        except OSError as e:
+            print(f"⚠ FinBERT ONNX export not saved - {e}")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def _quantize_finbert(self, model):
+        """int8 dynamic quantization of the Linear layers on CPU, fp16 weights on GPU"""
+        try:
+            if self.device == "cuda":
+                return model.half()
+            return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        except Exception as e:
+            print(f"⚠ FinBERT quantization skipped - {e}")
+            return model
     
     def analyze_text_sentiment(self, text: str, use_finbert: bool = True) -> Dict[str, float]:
         """Analyze sentiment of a single text"""
-        if use_finbert and self.finbert_model:
-            return self._finbert_sentiment(text)
-        else:
-            return self._vader_sentiment(text)
+        return self.analyze_texts_sentiment([text], use_finbert)[0]
+    
+    def analyze_texts_sentiment(self, texts: List[str], use_finbert: bool = True) -> List[Dict[str, float]]:
+        """Analyze sentiment of several texts; distinct cache misses are batched through FinBERT"""
+        finbert = bool(use_finbert and self.finbert_model)
+        keys = [
+            (finbert, hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest())
+            for text in texts
+        ]
+        
+        results = [None] * len(texts)
+        # Each distinct missing text is scored once, then copied to every index sharing its key
+        misses = {}
+        with self._sentiment_cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._sentiment_cache.get(key)
+                if cached is None:
+                    misses.setdefault(key, []).append(i)
+                else:
+                    self._sentiment_cache.move_to_end(key)
+                    results[i] = dict(cached)
+        
+        if misses:
+            miss_texts = [texts[indices[0]] for indices in misses.values()]
+            used_finbert = finbert
+            if finbert:
+                scored, used_finbert = self._finbert_sentiment_batch(miss_texts)
+            else:
+                scored = [self._vader_sentiment(text) for text in miss_texts]
+            
+            with self._sentiment_cache_lock:
+                for (key, indices), sentiment in zip(misses.items(), scored):
+                    for i in indices:
+                        results[i] = dict(sentiment)
+                    # A FinBERT failure returns VADER scores; file them under the VADER key
+                    self._sentiment_cache[(used_finbert, key[1])] = dict(sentiment)
+                while len(self._sentiment_cache) > SENTIMENT_CACHE_SIZE:
+                    self._sentiment_cache.popitem(last=False)
+        
+        return results
     
     def _finbert_sentiment(self, text: str) -> Dict[str, float]:
         """Analyze using FinBERT. Keys: positive, negative, neutral, compound"""
+        return self._finbert_sentiment_batch([text])[0][0]
+    
+    def _finbert_sentiment_batch(self, texts: List[str]) -> Tuple[List[Dict[str, float]], bool]:
+        """
+        Analyze texts with FinBERT, FINBERT_BATCH_SIZE per forward pass
+        Returns (results, True), or (VADER results, False) when FinBERT failed
+        """
         try:
-            inputs = self.finbert_tokenizer(text, return_tensors="pt", 
-                                           truncation=True, max_length=512, 
-                                           padding=True)
-            
-            with torch.no_grad():
-                outputs = self.finbert_model(**inputs)
-                predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            
-            scores = predictions[0].tolist()
-            # FinBERT labels are often in the order: negative, neutral, positive
-            return {
-                "negative": scores[0],
-                "neutral": scores[1],
-                "positive": scores[2],
-                "compound": scores[2] - scores[0]  # -1 to 1 scale
-            }
+            results = []
+            for start in range(0, len(texts), FINBERT_BATCH_SIZE):
+                results += self._finbert_forward(texts[start:start + FINBERT_BATCH_SIZE])
+            return results, True
         except Exception as e:
             print(f"FinBERT error: {e}, falling back to VADER")
-            return self._vader_sentiment(text)
+            return [self._vader_sentiment(text) for text in texts], False
+    
+    def _finbert_forward(self, texts: List[str]) -> List[Dict[str, float]]:
+        """One padded FinBERT forward pass over texts; raises on failure"""
+        inputs = self.finbert_tokenizer(texts, return_tensors="pt", 
+                                       truncation=True, max_length=self.max_seq_len, 
+                                       padding="longest")
+        if self.device == "cuda":
+            # Pinned host buffers let the host-to-device copies run asynchronously
+            inputs = {k: v.pin_memory().to(self.device, non_blocking=True) for k, v in inputs.items()}
+        
+        with self._finbert_lock, torch.inference_mode():
+            outputs = self.finbert_model(**inputs)
+            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
+        
+        # FinBERT labels are often in the order: negative, neutral, positive
+        return [
+            {
+                "negative": neg,
+                "neutral": neu,
+                "positive": pos,
+                "compound": pos - neg  # -1 to 1 scale
+            }
+            for neg, neu, pos in predictions.float().cpu().tolist()
+        ]
     
     def _vader_sentiment(self, text: str) -> Dict[str, float]:
         """Analyze using VADER. Keys: neg, neu, pos, compound"""
@@ -75,11 +225,27 @@ class SentimentAgent(BaseAgent):
         """
         Analyze sentiment for a stock
         """
+        result, prompt = self._prepare_analysis(stock_name, timeframe, use_finbert)
+        if prompt is not None:
+            result["llm_insight"] = self.generate_response(prompt)
+        return result
+    
+    async def analyze_async(self, stock_name: str, timeframe: str = "7d", use_finbert: bool = True,
+                            session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """analyze() awaiting the LLM instead of blocking on it"""
+        result, prompt = self._prepare_analysis(stock_name, timeframe, use_finbert)
+        if prompt is not None:
+            result["llm_insight"] = await self.agenerate_response(prompt, session=session)
+        return result
+    
+    def _prepare_analysis(self, stock_name: str, timeframe: str, use_finbert: bool,
+                          docs: Optional[List[Dict]] = None):
+        """Run every analysis step except the LLM call; returns (result, insight prompt or None)"""
         print(f"\n🔍 Analyzing sentiment for {stock_name} ({timeframe})...")
         
-        # Retrieve relevant news from vector store
-        query = f"{stock_name} news sentiment analysis"
-        docs = self.retrieve_context(query, k=10)
+        # Retrieve relevant news from vector store unless prefetched
+        if docs is None:
+            docs = self.retrieve_context(self._news_query(stock_name), k=10)
         
         if not docs:
             return {
@@ -88,28 +254,23 @@ class SentimentAgent(BaseAgent):
                 "error": "No news data found. Please load news data first.",
                 "recommendation": "neutral",
                 "confidence": 0.0
-            }
+            }, None
         
-        # Analyze sentiment for each document
-        sentiments = []
+        # Analyze sentiment for all documents at once; results always use keys: positive, negative, neutral, compound
+        sentiments = self.analyze_texts_sentiment([doc["content"] for doc in docs], use_finbert)
         analyzed_docs = []
         
-        for doc in docs:
-            # The result from analyze_text_sentiment now always uses keys: positive, negative, neutral, compound
-            sentiment = self.analyze_text_sentiment(doc["content"], use_finbert)
-            sentiments.append(sentiment)
+        for doc, sentiment in zip(docs, sentiments):
             analyzed_docs.append({
                 "text": doc["content"][:200] + "...",
                 "sentiment": sentiment,
                 "metadata": doc.get("metadata", {})
             })
         
-        # Aggregate sentiments (The fix is primarily ensuring the keys are 'positive', 'negative', etc.)
+        # Aggregate sentiments: one (4, N) score matrix, one row-wise mean
         # This now reliably uses the normalized keys from the VADER/FinBERT helper methods
-        avg_positive = np.mean([s["positive"] for s in sentiments])
-        avg_negative = np.mean([s["negative"] for s in sentiments])
-        avg_neutral = np.mean([s["neutral"] for s in sentiments]) # Use 'neutral' consistently
-        avg_compound = np.mean([s["compound"] for s in sentiments])
+        scores = np.array([[s[key] for s in sentiments] for key in SENTIMENT_KEYS], dtype=np.float64)
+        avg_positive, avg_negative, avg_neutral, avg_compound = scores.mean(axis=1)
         
         # Generate LLM-based insights
         context = "\n".join([f"- {doc['content'][:150]}" for doc in docs[:5]])
@@ -132,8 +293,6 @@ Provide:
 4. Investment recommendation (Buy/Hold/Sell)
 
 Keep response under 150 words."""
-
-        llm_insight = self.generate_response(prompt)
         
         # Determine recommendation
         if avg_compound > 0.3:
@@ -159,17 +318,30 @@ Keep response under 150 words."""
             "recommendation": recommendation,
             "confidence": float(abs(avg_compound)),
             "total_news_analyzed": len(docs),
-            "llm_insight": llm_insight,
+            "llm_insight": None,
             "sample_news": analyzed_docs[:3]
-        }
+        }, prompt
+    
+    def _news_query(self, stock_name: str) -> str:
+        return f"{stock_name} news sentiment analysis"
     
     def batch_analyze(self, stocks: List[str], timeframe: str = "7d") -> List[Dict[str, Any]]:
-        """Analyze multiple stocks"""
-        results = []
-        for stock in stocks:
-            result = self.analyze(stock, timeframe)
-            results.append(result)
-        return results
+        """Analyze multiple stocks, sending all LLM prompts concurrently"""
+        # One bulk retrieval, then one FinBERT pass over every retrieved document;
+        # the per-stock scoring below is then served from the sentiment cache
+        all_docs = self.retrieve_context_batch([self._news_query(stock) for stock in stocks], k=10)
+        self.analyze_texts_sentiment([doc["content"] for docs in all_docs for doc in docs])
+        
+        prepared = [
+            self._prepare_analysis(stock, timeframe, True, docs)
+            for stock, docs in zip(stocks, all_docs)
+        ]
+        pending = [(result, prompt) for result, prompt in prepared if prompt is not None]
+        insights = self.generate_responses([prompt for _, prompt in pending])
+        
+        for (result, _), insight in zip(pending, insights):
+            result["llm_insight"] = insight
+        return [result for result, _ in prepared]
     
     def load_news_data(self, news_data: List[Dict[str, str]]):
         """
@@ -1,8 +1,238 @@
 from agents.base_agent import BaseAgent
 from typing import Dict, List, Any, Optional
+from dataclasses import dataclass, fields
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import aiohttp
+from datetime import date, timedelta
+from scipy.signal import lfilter
+import bisect
+import hashlib
+import math
+import os
+from utils._njit import njit, prange
+
+# On-disk memo of computed technical indicator frames, keyed by input content;
+# bump the version whenever an indicator formula changes
+TECHNICAL_CACHE_DIR = "./cache/technical"
+TECHNICAL_CACHE_VERSION = 2
+
+# Derived indicator columns stored as float32; they only feed threshold checks
+# and display, and the raw OHLCV columns keep full precision
+_FLOAT32_INDICATORS = [
+    'sma_20', 'sma_50', 'sma_200', 'ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_histogram',
+    'rsi', 'bollinger_upper', 'bollinger_middle', 'bollinger_lower', 'atr', 'vwap'
+]
+
+# Upside (%) bands, lowest first; bisect_left puts a value on a boundary in the
+# lower band, matching the strict ">" comparisons of the ratings
+_VALUATION_THRESHOLDS = (-30, -15, 15, 30)
+_VALUATION_LABELS = ("Highly Overvalued", "Overvalued", "Fairly Valued", "Undervalued", "Highly Undervalued")
+_FUNDAMENTAL_THRESHOLDS = (-20, -10, 10, 20)
+_FUNDAMENTAL_SIGNALS = (("Strong Sell", -2), ("Sell", -1), ("Hold", 0), ("Buy", 1), ("Strong Buy", 2))
+
+# Combined-score bands; bisect_right puts a value on a boundary in the upper band (">=")
+_ACTION_THRESHOLDS = (-1.5, -0.5, 0.5, 1.5)
+_ACTIONS = (("Strong Sell", 0.9), ("Sell", 0.7), ("Hold", 0.5), ("Buy", 0.7), ("Strong Buy", 0.9))
+_TECHNICAL_SIGNALS = {"Bullish": ("Buy", 1), "Bearish": ("Sell", -1)}
+
+# Kernel input columns and output fair-value methods, in kernel order
+_FAIR_VALUE_INPUTS = ('pe_ratio', 'pb_ratio', 'peg_ratio', 'ev_ebitda', 'current_price')
+_FAIR_VALUE_METHODS = ('pe_method', 'pb_method', 'peg_method', 'ev_ebitda_method')
+
+# Ratios where a value below the industry average is the favourable side
+_LOWER_IS_BETTER = frozenset({'pe_ratio', 'pb_ratio', 'ps_ratio', 'ev_ebitda', 'peg_ratio', 'debt_to_equity'})
+
+# Industry comparison labels by class: 0 = below 80% of average, 1 = in-line, 2 = above 120%
+_INDUSTRY_LABELS_LOWER = ("Attractive", "In-line", "Premium")
+_INDUSTRY_LABELS_HIGHER = ("Below Average", "In-line", "Above Average")
+
+
+@njit(parallel=True, cache=True)
+def _fair_value_kernel(metrics, industry):
+    """
+    Fair value per method for each company
+    
+    metrics: (N, 5) pe, pb, peg, ev/ebitda, current price; NaN when missing
+    industry: industry pe, pb and ev/ebitda
+    Returns (N, 4) pe, pb, peg and ev/ebitda fair values; NaN where the ratio is not positive
+    """
+    n = metrics.shape[0]
+    out = np.full((n, 4), np.nan)
+    for i in prange(n):
+        price = metrics[i, 4]
+        if metrics[i, 0] > 0:
+            out[i, 0] = price * (industry[0] / metrics[i, 0])
+        if metrics[i, 1] > 0:
+            out[i, 1] = price * (industry[1] / metrics[i, 1])
+        if metrics[i, 2] > 0:
+            out[i, 2] = price * (1.0 / metrics[i, 2])
+        if metrics[i, 3] > 0:
+            out[i, 3] = price * (industry[2] / metrics[i, 3])
+    return out
+
+
+@njit(cache=True)
+def _wilder_rsi_kernel(close, period, out):
+    """
+    Wilder RSI of `close` written into `out`
+    
+    The first average is the plain mean of the first `period` moves, later ones
+    use Wilder smoothing avg = (avg * (period - 1) + x) / period. Entries before
+    index `period` are NaN; NaN moves count as no gain and no loss.
+    """
+    n = close.shape[0]
+    out[:] = np.nan
+    if n <= period:
+        return
+    
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        
+        if i <= period:
+            avg_gain += gain / period
+            avg_loss += loss / period
+            if i < period:
+                continue
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        
+        if avg_loss > 0:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        elif avg_gain > 0:
+            out[i] = 100.0
+
+
+
+@njit(parallel=True, cache=True)
+def _batch_rsi_kernel(values, offsets, period, out):
+    """Wilder RSI of every company's slice values[offsets[i]:offsets[i + 1]], in parallel across companies"""
+    for i in prange(offsets.shape[0] - 1):
+        start = offsets[i]
+        end = offsets[i + 1]
+        _wilder_rsi_kernel(values[start:end], period, out[start:end])
+
+
+@njit(cache=True, error_model='numpy')
+def _vwap_kernel(high, low, close, volume, out):
+    """
+    Running VWAP in one sweep, same as cumsum(volume * (h + l + c) / 3) / cumsum(volume)
+    
+    Like pandas' cumsum, a NaN term leaves its own bar NaN without breaking the
+    running sums; a zero cumulative volume divides to NaN/inf.
+    """
+    num = 0.0
+    den = 0.0
+    for i in range(close.shape[0]):
+        traded = volume[i] * (high[i] + low[i] + close[i]) / 3
+        num_i = np.nan
+        den_i = np.nan
+        if not np.isnan(traded):
+            num += traded
+            num_i = num
+        if not np.isnan(volume[i]):
+            den += volume[i]
+            den_i = den
+        out[i] = num_i / den_i
+
+
+def _ewm(values: np.ndarray, span: int) -> np.ndarray:
+    """pandas ewm(span=span, adjust=False).mean() of a NaN-free array as one IIR filter pass"""
+    if len(values) == 0:
+        return values.copy()
+    alpha = 2.0 / (span + 1)
+    # y[0] = x[0], then y[i] = alpha * x[i] + (1 - alpha) * y[i - 1]
+    filtered, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])
+    return filtered
+
+
+
+def _moving_averages(values: np.ndarray, windows) -> List[np.ndarray]:
+    """Trailing simple moving averages of a NaN-free array from one cumulative sum; NaN until each window fills"""
+    n = len(values)
+    # Summing offsets from the first close keeps the running total small
+    base = values[0] if n else 0.0
+    csum = np.empty(n + 1)
+    csum[0] = 0.0
+    np.cumsum(values - base, out=csum[1:])
+    
+    averages = []
+    for window in windows:
+        sma = np.full(n, np.nan)
+        if n >= window:
+            sma[window - 1:] = (csum[window:] - csum[:-window]) / window + base
+        averages.append(sma)
+    return averages
+
+
+
+@dataclass
+class TechSeries:
+    """Struct-of-arrays view of one company's price history and technical indicators"""
+    date: np.ndarray
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    sma_20: np.ndarray
+    sma_50: np.ndarray
+    sma_200: np.ndarray
+    ema_12: np.ndarray
+    ema_26: np.ndarray
+    macd: np.ndarray
+    macd_signal: np.ndarray
+    macd_histogram: np.ndarray
+    rsi: np.ndarray
+    bollinger_upper: np.ndarray
+    bollinger_middle: np.ndarray
+    bollinger_lower: np.ndarray
+    atr: np.ndarray
+    obv: np.ndarray
+    vwap: np.ndarray
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "TechSeries":
+        # Dates stay as objects so datetime columns keep their Timestamp form
+        arrays = {field.name: df[field.name].to_numpy() for field in fields(cls) if field.name != 'date'}
+        return cls(date=df['date'].to_numpy(dtype=object), **arrays)
+    
+    def latest(self) -> Dict[str, Any]:
+        """Value of every series on the last bar, as Python scalars"""
+        return {field.name: getattr(self, field.name)[-1:].tolist()[0] for field in fields(self)}
+
+
+def _finite_or_none(value) -> Optional[float]:
+    """Float of a latest-bar scalar, None when missing or NaN"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return float(value)
+
+
+@dataclass
+class TechIndicators:
+    """Latest indicator readings reported with the technical analysis"""
+    rsi: Optional[float]
+    macd: Optional[float]
+    macd_signal: Optional[float]
+    sma_20: Optional[float]
+    sma_50: Optional[float]
+    sma_200: Optional[float]
+    bollinger_upper: Optional[float]
+    bollinger_lower: Optional[float]
+    atr: Optional[float]
+    obv: Optional[float]
+    
+    @classmethod
+    def from_latest(cls, latest: Dict[str, Any]) -> "TechIndicators":
+        return cls(*[_finite_or_none(latest.get(field.name)) for field in fields(cls)])
+    
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
 
 class ValuationAgent(BaseAgent):
     """
@@ -11,9 +241,12 @@ class ValuationAgent(BaseAgent):
     including RSI, MACD, Bollinger Bands, Moving Averages, and fundamental valuation ratios
     """
     
-    def __init__(self, model_name: str = "llama3.2"):
+    def __init__(self, model_name: str = "llama3.2", use_cache: bool = True):
         super().__init__("Valuation Agent", model_name)
         
+        # Reuse technical indicators computed in earlier runs for identical price data
+        self.use_cache = use_cache
+        
         # Valuation metrics
         self.metrics = {
             'pe_ratio': 'Price to Earnings (P/E)',
@@ -54,6 +287,16 @@ class ValuationAgent(BaseAgent):
         self.valuation_data = {}
         self.price_data = {}
         
+        # Per-company TechSeries of the loaded price data
+        self._tech_series = {}
+        # (3, n) true-range workspace reused by _calculate_atr
+        self._tr_scratch = None
+        
+        # All companies' valuation rows stacked into one long frame keyed by (company, date)
+        self._valuation_frame = pd.DataFrame(columns=['company', 'date', 'metric', 'value'])
+        # {company: {metric: value}} on each company's latest valuation date
+        self._latest_by_company = {}
+        
         # Industry average benchmarks for NSE stocks
         self.industry_averages = {
             'pe_ratio': 22.0,
@@ -67,6 +310,7 @@ class ValuationAgent(BaseAgent):
             'debt_to_equity': 0.8,
             'current_ratio': 1.5
         }
+        self._pack_industry_averages()
         
         print("✓ Valuation Agent initialized with technical analysis capabilities")
     
@@ -84,30 +328,46 @@ class ValuationAgent(BaseAgent):
         
         if industry_averages:
             self.industry_averages.update(industry_averages)
-        
-        texts = []
-        metadatas = []
-        
-        for company, df in data.items():
-            if df.empty:
-                continue
-            
-            for date in df['date'].unique():
-                date_data = df[df['date'] == date]
-                
-                summary_parts = []
-                for _, row in date_data.iterrows():
-                    metric_name = self.metrics.get(row['metric'], row['metric'])
-                    summary_parts.append(f"{metric_name}: {row['value']}")
-                
-                text = f"{company} Valuation {date}: " + ", ".join(summary_parts)
-                texts.append(text)
-                
-                metadatas.append({
-                    "company": company,
-                    "date": str(date),
-                    "type": "valuation_data"
-                })
+            self._pack_industry_averages()
+        
+        # Stack the companies once; "<metric name>: <value>" is rendered per
+        # company so each frame keeps its own value formatting
+        frames = {
+            company: df[['date', 'metric', 'value']].assign(
+                part=df['metric'].map(self.metrics).fillna(df['metric']) + ": " + df['value'].astype(str)
+            )
+            for company, df in data.items()
+            if not df.empty
+        }
+        if frames:
+            stacked = pd.concat(frames, names=['company', None]).reset_index(level='company')
+        else:
+            stacked = pd.DataFrame(columns=['company', 'date', 'metric', 'value', 'part'])
+        
+        self._valuation_frame = stacked.drop(columns='part').reset_index(drop=True)
+        
+        # Latest-date metrics for every company, read from the long frame once per
+        # load instead of on every analysis; an empty frame gives no metrics rather than no data
+        frame = self._valuation_frame
+        latest = frame[frame['date'] == frame.groupby('company', sort=False)['date'].transform('max')]
+        self._latest_by_company = {company: {} for company in data}
+        for company, metric, value in zip(latest['company'].tolist(), latest['metric'].tolist(),
+                                          latest['value'].astype(float).tolist()):
+            self._latest_by_company[company][metric] = value
+        
+        # One groupby over every (company, date), in first-appearance order
+        summaries = stacked.groupby(['company', 'date'], sort=False)['part'].agg(", ".join)
+        
+        # Plain lists of keys and summaries, no per-row Series access
+        keys = summaries.index.tolist()
+        texts = [
+            f"{company} Valuation {date}: {summary}"
+            for (company, date), summary in zip(keys, summaries.tolist())
+        ]
+        metadatas = [
+            {"company": company, "date": str(date), "type": "valuation_data"}
+            for company, date in keys
+        ]
         
         if texts:
             self.add_documents(texts, metadatas)
@@ -123,112 +383,236 @@ class ValuationAgent(BaseAgent):
         """
         self.price_data = data
         
-        texts = []
-        metadatas = []
+        self._tech_series = {}
         
+        # Indicator frames from the cache where possible; the rest are computed together
+        frames = {}
+        misses = {}
         for company, df in data.items():
             if df.empty:
                 continue
+            path = self._indicator_cache_path(company, df)
+            cached = self._read_indicator_cache(path)
+            if cached is None:
+                misses[company] = (df, path)
+            else:
+                frames[company] = cached
+        
+        computed = self._calculate_technical_indicators_batch([df for df, _ in misses.values()])
+        for (company, (_, path)), df in zip(misses.items(), computed):
+            self._write_indicator_cache(path, df)
+            frames[company] = df
+        
+        # Latest close, RSI, MACD and date per company, read as scalars
+        latest = {}
+        for company in data:
+            if company not in frames:
+                continue
             
-            # Calculate technical indicators
-            df = self._calculate_technical_indicators(df)
+            df = frames[company]
             self.price_data[company] = df
-            
-            # Create text summaries for RAG
-            latest = df.iloc[-1]
-            text = f"{company} Technical Analysis: Price ₹{latest['close']:.2f}, "
-            
-            if 'rsi' in df.columns:
-                text += f"RSI {latest['rsi']:.1f}, "
-            if 'macd' in df.columns:
-                text += f"MACD {latest['macd']:.2f}"
-            
-            texts.append(text)
-            metadatas.append({
-                "company": company,
-                "date": str(latest['date']),
-                "type": "technical_data"
-            })
+            series = TechSeries.from_frame(df)
+            self._tech_series[company] = series
+            latest[company] = (series.close[-1], series.rsi[-1], series.macd[-1], series.date[-1])
+        
+        # Create text summaries for RAG, all companies in one pass
+        texts = [
+            f"{company} Technical Analysis: Price ₹{close:.2f}, RSI {rsi:.1f}, MACD {macd:.2f}"
+            for company, (close, rsi, macd, _) in latest.items()
+        ]
+        metadatas = [
+            {"company": company, "date": str(date), "type": "technical_data"}
+            for company, (_, _, _, date) in latest.items()
+        ]
         
         if texts:
             self.add_documents(texts, metadatas)
             print(f"✓ Loaded price data for {len(data)} companies")
     
+    def _indicator_cache_path(self, company: str, df: pd.DataFrame) -> Optional[str]:
+        """
+        Parquet file memoizing the indicators of a company's price frame, named
+        "<company hash>_<content hash>.parquet" so each company keeps one entry
+        """
+        if not self.use_cache:
+            return None
+        
+        company_key = hashlib.blake2b(company.encode(), digest_size=8).hexdigest()
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{TECHNICAL_CACHE_VERSION}|{'|'.join(map(str, df.columns))}".encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return os.path.join(TECHNICAL_CACHE_DIR, f"{company_key}_{digest.hexdigest()}.parquet")
+    
+    def _read_indicator_cache(self, path: Optional[str]) -> Optional[pd.DataFrame]:
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return None  # unreadable entry: recompute and overwrite it
+    
+    def _write_indicator_cache(self, path: Optional[str], df: pd.DataFrame):
+        if path is None:
+            return
+        try:
+            os.makedirs(TECHNICAL_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            return  # no Parquet engine or an unstorable column: serve uncached
+        
+        # Drop the company's entries for earlier price data so the directory stays bounded
+        name = os.path.basename(path)
+        prefix = name.split('_', 1)[0] + '_'
+        for old in os.listdir(TECHNICAL_CACHE_DIR):
+            if old.startswith(prefix) and old.endswith('.parquet') and old != name:
+                try:
+                    os.remove(os.path.join(TECHNICAL_CACHE_DIR, old))
+                except OSError:
+                    pass
+    
+    def _calculate_technical_indicators_batch(self, frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Technical indicators of several price frames, with RSI from one parallel kernel over all of them"""
+        # Ensure data is sorted by date; sorting already yields a new frame, and
+        # the caller's frame is never written to, so no defensive copy is needed
+        frames = [
+            df.reset_index(drop=True) if df['date'].is_monotonic_increasing
+            else df.sort_values('date', ignore_index=True)
+            for df in frames
+        ]
+        rsis = self._calculate_rsi_batch([df['close'] for df in frames], period=14)
+        return [self._add_technical_indicators(df, rsi) for df, rsi in zip(frames, rsis)]
+    
     def _calculate_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate all technical indicators"""
-        df = df.copy()
-        
-        # Ensure data is sorted by date
-        df = df.sort_values('date').reset_index(drop=True)
-        
+        return self._calculate_technical_indicators_batch([df])[0]
+    
+    def _add_technical_indicators(self, df: pd.DataFrame, rsi: pd.Series) -> pd.DataFrame:
+        """Indicator columns for a date-sorted frame with a RangeIndex, given its RSI"""
         close = df['close']
         high = df['high']
         low = df['low']
         volume = df['volume']
         
-        # Simple Moving Averages
-        df['sma_20'] = close.rolling(window=20).mean()
-        df['sma_50'] = close.rolling(window=50).mean()
-        df['sma_200'] = close.rolling(window=200).mean()
+        # The array kernels below cannot skip gaps, so series with missing
+        # closes keep pandas' NaN-aware rolling/ewm implementations
+        close_np = close.to_numpy(dtype=np.float64)
+        has_gaps = bool(np.isnan(close_np).any())
         
-        # Exponential Moving Averages
-        df['ema_12'] = close.ewm(span=12, adjust=False).mean()
-        df['ema_26'] = close.ewm(span=26, adjust=False).mean()
+        # Indicators are gathered as arrays and attached to the frame in one step
+        ind = {}
         
-        # MACD
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
+        # Simple Moving Averages, all three from one running sum
+        if has_gaps:
+            sma_20, sma_50, sma_200 = (close.rolling(window=w).mean().to_numpy() for w in (20, 50, 200))
+        else:
+            sma_20, sma_50, sma_200 = _moving_averages(close_np, (20, 50, 200))
+        ind['sma_20'] = sma_20
+        ind['sma_50'] = sma_50
+        ind['sma_200'] = sma_200
+        
+        # Exponential Moving Averages and MACD
+        if has_gaps:
+            ema_12 = close.ewm(span=12, adjust=False).mean().to_numpy()
+            ema_26 = close.ewm(span=26, adjust=False).mean().to_numpy()
+            macd = ema_12 - ema_26
+            macd_signal = pd.Series(macd).ewm(span=9, adjust=False).mean().to_numpy()
+        else:
+            ema_12 = _ewm(close_np, 12)
+            ema_26 = _ewm(close_np, 26)
+            macd = ema_12 - ema_26
+            macd_signal = _ewm(macd, 9)
+        ind['ema_12'] = ema_12
+        ind['ema_26'] = ema_26
+        ind['macd'] = macd
+        ind['macd_signal'] = macd_signal
+        ind['macd_histogram'] = macd - macd_signal
         
         # RSI
-        df['rsi'] = self._calculate_rsi(close, period=14)
+        ind['rsi'] = rsi.to_numpy()
         
-        # Bollinger Bands
-        df['bollinger_middle'] = close.rolling(window=20).mean()
-        bb_std = close.rolling(window=20).std()
-        df['bollinger_upper'] = df['bollinger_middle'] + (bb_std * 2)
-        df['bollinger_lower'] = df['bollinger_middle'] - (bb_std * 2)
+        # Bollinger Bands around the 20-day SMA
+        bb_std = close.rolling(window=20).std().to_numpy()
+        ind['bollinger_middle'] = sma_20
+        ind['bollinger_upper'] = sma_20 + (bb_std * 2)
+        ind['bollinger_lower'] = sma_20 - (bb_std * 2)
         
         # Average True Range (ATR)
-        df['atr'] = self._calculate_atr(high, low, close, period=14)
+        ind['atr'] = self._calculate_atr(high, low, close, period=14).to_numpy()
         
         # On-Balance Volume (OBV)
-        df['obv'] = self._calculate_obv(close, volume)
+        ind['obv'] = self._calculate_obv(close, volume).to_numpy()
         
-        # Volume Weighted Average Price (VWAP)
-        df['vwap'] = (volume * (high + low + close) / 3).cumsum() / volume.cumsum()
+        # Volume Weighted Average Price (VWAP), numerator and denominator in one pass
+        vwap = np.empty(len(df))
+        _vwap_kernel(high.to_numpy(dtype=np.float64), low.to_numpy(dtype=np.float64),
+                     close_np, volume.to_numpy(dtype=np.float64), vwap)
+        ind['vwap'] = vwap
         
-        return df
+        for name in _FLOAT32_INDICATORS:
+            ind[name] = ind[name].astype(np.float32)
+        
+        # Recomputing over a frame that already carries indicators replaces them
+        indicators = pd.DataFrame(ind, index=df.index)
+        return pd.concat([df.drop(columns=indicators.columns, errors='ignore'), indicators], axis=1)
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate Relative Strength Index"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Calculate Relative Strength Index (Wilder smoothing)"""
+        return self._calculate_rsi_batch([prices], period)[0]
+    
+    def _calculate_rsi_batch(self, prices: List[pd.Series], period: int = 14) -> List[pd.Series]:
+        """RSI of several price series; the series are laid end to end and split across threads"""
+        lengths = [len(series) for series in prices]
+        offsets = np.zeros(len(prices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        
+        values = np.concatenate([series.to_numpy(dtype=np.float64) for series in prices]) if prices else np.empty(0)
+        out = np.empty_like(values)
+        _batch_rsi_kernel(values, offsets, period, out)
+        
+        return [
+            pd.Series(out[start:end], index=series.index)
+            for series, start, end in zip(prices, offsets[:-1], offsets[1:])
+        ]
     
     def _calculate_atr(self, high: pd.Series, low: pd.Series, 
                        close: pd.Series, period: int = 14) -> pd.Series:
         """Calculate Average True Range"""
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(window=period).mean()
+        h = high.to_numpy(dtype=np.float64)
+        l = low.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        
+        # The three true-range candidates go into scratch rows that are reused
+        # across companies and loads; grown only for a longer history
+        n = len(h)
+        if self._tr_scratch is None or self._tr_scratch.shape[1] < n:
+            self._tr_scratch = np.empty((3, n))
+        ranges = self._tr_scratch[:, :n]
+        ranges[1:, :1] = np.nan  # no previous close on the first bar
+        np.subtract(h, l, out=ranges[0])
+        np.abs(np.subtract(h[1:], c[:-1], out=ranges[1, 1:]), out=ranges[1, 1:])
+        np.abs(np.subtract(l[1:], c[:-1], out=ranges[2, 1:]), out=ranges[2, 1:])
+        
+        # fmax skips NaN like DataFrame.max, so the first bar's range is just high - low
+        tr = np.fmax.reduce(ranges, axis=0)
+        return pd.Series(tr, index=high.index).rolling(window=period).mean()
     
     def _calculate_obv(self, close: pd.Series, volume: pd.Series) -> pd.Series:
         """Calculate On-Balance Volume"""
-        obv = [0]
-        for i in range(1, len(close)):
-            if close.iloc[i] > close.iloc[i-1]:
-                obv.append(obv[-1] + volume.iloc[i])
-            elif close.iloc[i] < close.iloc[i-1]:
-                obv.append(obv[-1] - volume.iloc[i])
-            else:
-                obv.append(obv[-1])
+        c = close.to_numpy()
+        v = volume.to_numpy()
+        
+        # +1 / -1 / 0 per bar by close-to-close direction, times that bar's volume;
+        # the int8 difference of the two comparison masks needs no float sign or
+        # NaN cleanup (comparisons with NaN are False, i.e. no move)
+        up = (c[1:] > c[:-1]).view(np.int8)
+        down = (c[1:] < c[:-1]).view(np.int8)
+        steps = (up - down) * v[1:]
+        
+        obv = np.empty(len(c), dtype=steps.dtype)
+        obv[0] = 0
+        np.cumsum(steps, out=obv[1:])
         return pd.Series(obv, index=close.index)
     
     def analyze(self, stock_name: str, target_period: int = 12) -> Dict[str, Any]:
@@ -244,67 +628,141 @@ class ValuationAgent(BaseAgent):
         """
         print(f"\n💰 Analyzing valuation for {stock_name}...")
         
+        result = self._prepare_analysis(stock_name, target_period, self._analyze_fundamentals(stock_name))
+        
+        # Generate AI insights
+        ai_insight = self._generate_valuation_insights(stock_name, result)
+        result["ai_insight"] = ai_insight
+        
+        # Generate final recommendation
+        result["recommendation"] = self._get_final_recommendation(result)
+        
+        return result
+    
+    async def analyze_async(self, stock_name: str, target_period: int = 12,
+                            session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """analyze() awaiting the LLM instead of blocking on it"""
+        print(f"\n💰 Analyzing valuation for {stock_name}...")
+        
+        result = self._prepare_analysis(stock_name, target_period, self._analyze_fundamentals(stock_name))
+        result["ai_insight"] = await self.agenerate_response(
+            self._build_valuation_prompt(stock_name, result), session=session
+        )
+        result["recommendation"] = self._get_final_recommendation(result)
+        
+        return result
+    
+    def analyze_batch(self, stock_names: List[str], target_period: int = 12) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze several stocks: one fair-value kernel call for all of them and
+        concurrent LLM insight requests
+        
+        Args:
+            stock_names: Names of the stocks to analyze
+            target_period: Target period in months for price target
+            
+        Returns:
+            Dict mapping each stock name to its analysis
+        """
+        print(f"\n💰 Analyzing valuation for {len(stock_names)} stocks...")
+        
+        metrics_list = [self._latest_metrics(stock_name) for stock_name in stock_names]
+        with_data = [metrics for metrics in metrics_list if metrics is not None]
+        fair_values = iter(self._fair_values(with_data)) if with_data else iter(())
+        
+        results = {}
+        for stock_name, metrics in zip(stock_names, metrics_list):
+            if metrics is None:
+                fundamental_analysis = self._no_valuation_data()
+            else:
+                fundamental_analysis = self._fundamentals_from(metrics, next(fair_values))
+            results[stock_name] = self._prepare_analysis(stock_name, target_period, fundamental_analysis)
+        
+        prompts = [self._build_valuation_prompt(stock_name, result) for stock_name, result in results.items()]
+        for result, insight in zip(results.values(), self.generate_responses(prompts)):
+            result["ai_insight"] = insight
+            result["recommendation"] = self._get_final_recommendation(result)
+        
+        return results
+    
+    def _prepare_analysis(self, stock_name: str, target_period: int,
+                          fundamental_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Result dict with fundamental and technical analysis filled in"""
         result = {
             "stock": stock_name,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+            "analysis_date": date.today().isoformat(),
             "target_period_months": target_period
         }
         
         # Fundamental Analysis
-        fundamental_analysis = self._analyze_fundamentals(stock_name)
         result.update(fundamental_analysis)
         
         # Technical Analysis
         technical_analysis = self._analyze_technicals(stock_name)
         result.update(technical_analysis)
         
-        # Generate AI insights
-        ai_insight = self._generate_valuation_insights(stock_name, result)
-        result["ai_insight"] = ai_insight
-        
-        # Generate final recommendation
-        result["recommendation"] = self._get_final_recommendation(result)
-        
         return result
     
+    def _pack_industry_averages(self):
+        """Refresh the array forms of industry_averages used by the kernels and comparisons"""
+        # Industry P/E, P/B and EV/EBITDA in fair-value kernel order
+        self._industry_vec = np.array([
+            self.industry_averages.get('pe_ratio', 20),
+            self.industry_averages.get('pb_ratio', 3.0),
+            self.industry_averages.get('ev_ebitda', 15.0)
+        ], dtype=np.float64)
+        
+        self._industry_keys = list(self.industry_averages)
+        self._industry_avgs = list(self.industry_averages.values())
+        self._industry_vals = np.array(self._industry_avgs, dtype=np.float64)
+        self._industry_lower = np.array([key in _LOWER_IS_BETTER for key in self._industry_keys])
+        # Label table per metric, picked once by its direction
+        self._industry_labels = [
+            _INDUSTRY_LABELS_LOWER if lower else _INDUSTRY_LABELS_HIGHER for lower in self._industry_lower.tolist()
+        ]
+    
+    def _fair_values(self, metrics_list: List[Dict[str, float]]) -> np.ndarray:
+        """(N, 4) fair values for a list of metric dicts; NaN marks an unusable method"""
+        # A missing price values the stock at 0, a missing ratio rules its method out
+        matrix = np.array(
+            [
+                [metrics.get(key, np.nan) for key in _FAIR_VALUE_INPUTS[:4]] + [metrics.get('current_price', 0)]
+                for metrics in metrics_list
+            ],
+            dtype=np.float64
+        )
+        return _fair_value_kernel(matrix, self._industry_vec)
+    
+    def _no_valuation_data(self) -> Dict[str, Any]:
+        return {
+            "fundamental_analysis": {
+                "status": "No valuation data available",
+                "valuation_rating": "Unknown"
+            }
+        }
+    
+    def _latest_metrics(self, stock_name: str) -> Optional[Dict[str, float]]:
+        """Metric values on the stock's latest valuation date, or None without data"""
+        return self._latest_by_company.get(stock_name)
+    
     def _analyze_fundamentals(self, stock_name: str) -> Dict[str, Any]:
         """Analyze fundamental valuation metrics"""
-        if stock_name not in self.valuation_data:
-            return {
-                "fundamental_analysis": {
-                    "status": "No valuation data available",
-                    "valuation_rating": "Unknown"
-                }
-            }
-        
-        df = self.valuation_data[stock_name]
-        latest_date = df['date'].max()
-        latest_data = df[df['date'] == latest_date]
-        
-        metrics = {}
-        for _, row in latest_data.iterrows():
-            metrics[row['metric']] = float(row['value'])
+        metrics = self._latest_metrics(stock_name)
+        if metrics is None:
+            return self._no_valuation_data()
         
+        return self._fundamentals_from(metrics, self._fair_values([metrics])[0])
+    
+    def _fundamentals_from(self, metrics: Dict[str, float], fair_values: np.ndarray) -> Dict[str, Any]:
+        """Fundamental analysis from latest metrics and their fair-value kernel row"""
         current_price = metrics.get('current_price', 0)
         
-        # Calculate fair values using different methods
-        valuations = {}
-        
-        if 'pe_ratio' in metrics and metrics['pe_ratio'] > 0:
-            pe_fair_value = self._pe_valuation(metrics, current_price)
-            valuations['pe_method'] = pe_fair_value
-        
-        if 'pb_ratio' in metrics and metrics['pb_ratio'] > 0:
-            pb_fair_value = self._pb_valuation(metrics, current_price)
-            valuations['pb_method'] = pb_fair_value
-        
-        if 'peg_ratio' in metrics and metrics['peg_ratio'] > 0:
-            peg_fair_value = self._peg_valuation(metrics, current_price)
-            valuations['peg_method'] = peg_fair_value
-        
-        if 'ev_ebitda' in metrics and metrics['ev_ebitda'] > 0:
-            ev_fair_value = self._ev_ebitda_valuation(metrics, current_price)
-            valuations['ev_ebitda_method'] = ev_fair_value
+        # Fair values of the methods whose ratio is available and positive
+        valuations = {
+            method: float(value)
+            for method, key, value in zip(_FAIR_VALUE_METHODS, _FAIR_VALUE_INPUTS, fair_values.tolist())
+            if metrics.get(key, 0) > 0
+        }
         
         # Calculate consensus fair value
         if valuations:
@@ -346,7 +804,7 @@ class ValuationAgent(BaseAgent):
     
     def _analyze_technicals(self, stock_name: str) -> Dict[str, Any]:
         """Analyze technical indicators"""
-        if stock_name not in self.price_data:
+        if stock_name not in self._tech_series:
             return {
                 "technical_analysis": {
                     "status": "No price data available",
@@ -354,8 +812,7 @@ class ValuationAgent(BaseAgent):
                 }
             }
         
-        df = self.price_data[stock_name]
-        latest = df.iloc[-1]
+        latest = self._tech_series[stock_name].latest()
         
         signals = []
         
@@ -411,7 +868,7 @@ class ValuationAgent(BaseAgent):
             technical_rating = "Neutral"
         
         # Support and Resistance levels
-        support_resistance = self._calculate_support_resistance(df)
+        support_resistance = self._calculate_support_resistance(self._tech_series[stock_name])
         
         return {
             "technical_analysis": {
@@ -419,29 +876,17 @@ class ValuationAgent(BaseAgent):
                 "technical_rating": technical_rating,
                 "buy_signals": buy_signals,
                 "sell_signals": sell_signals,
-                "indicators": {
-                    "rsi": float(rsi) if pd.notna(rsi) else None,
-                    "macd": float(macd) if pd.notna(macd) else None,
-                    "macd_signal": float(macd_signal) if pd.notna(macd_signal) else None,
-                    "sma_20": float(latest.get('sma_20', 0)) if pd.notna(latest.get('sma_20')) else None,
-                    "sma_50": float(sma_50) if pd.notna(sma_50) else None,
-                    "sma_200": float(sma_200) if pd.notna(sma_200) else None,
-                    "bollinger_upper": float(bb_upper) if pd.notna(bb_upper) else None,
-                    "bollinger_lower": float(bb_lower) if pd.notna(bb_lower) else None,
-                    "atr": float(latest.get('atr', 0)) if pd.notna(latest.get('atr')) else None,
-                    "obv": float(latest.get('obv', 0)) if pd.notna(latest.get('obv')) else None
-                },
+                "indicators": TechIndicators.from_latest(latest).to_dict(),
                 "support_resistance": support_resistance
             }
         }
     
-    def _calculate_support_resistance(self, df: pd.DataFrame) -> Dict[str, float]:
+    def _calculate_support_resistance(self, series: TechSeries) -> Dict[str, float]:
         """Calculate support and resistance levels"""
-        recent_data = df.tail(60)  # Last 60 trading days
-        
-        high = recent_data['high'].max()
-        low = recent_data['low'].min()
-        close = recent_data['close'].iloc[-1]
+        # Last 60 trading days as array views; fmax/fmin skip NaN like Series.max/min
+        high = np.fmax.reduce(series.high[-60:])
+        low = np.fmin.reduce(series.low[-60:])
+        close = series.close[-1]
         
         # Pivot points calculation
         pivot = (high + low + close) / 3
@@ -458,83 +903,38 @@ class ValuationAgent(BaseAgent):
             "support_2": float(s2)
         }
     
-    def _pe_valuation(self, metrics: Dict, current_price: float) -> float:
-        """P/E ratio based valuation"""
-        pe_ratio = metrics.get('pe_ratio', 0)
-        industry_pe = self.industry_averages.get('pe_ratio', 20)
-        
-        if pe_ratio > 0:
-            return current_price * (industry_pe / pe_ratio)
-        return current_price
-    
-    def _pb_valuation(self, metrics: Dict, current_price: float) -> float:
-        """P/B ratio based valuation"""
-        pb_ratio = metrics.get('pb_ratio', 0)
-        industry_pb = self.industry_averages.get('pb_ratio', 3.0)
-        
-        if pb_ratio > 0:
-            return current_price * (industry_pb / pb_ratio)
-        return current_price
-    
-    def _peg_valuation(self, metrics: Dict, current_price: float) -> float:
-        """PEG ratio based valuation"""
-        peg_ratio = metrics.get('peg_ratio', 0)
-        
-        if peg_ratio > 0:
-            return current_price * (1.0 / peg_ratio)
-        return current_price
-    
-    def _ev_ebitda_valuation(self, metrics: Dict, current_price: float) -> float:
-        """EV/EBITDA based valuation"""
-        ev_ebitda = metrics.get('ev_ebitda', 0)
-        industry_ev = self.industry_averages.get('ev_ebitda', 15.0)
-        
-        if ev_ebitda > 0:
-            return current_price * (industry_ev / ev_ebitda)
-        return current_price
-    
     def _get_valuation_rating(self, upside_potential: float) -> str:
         """Get valuation rating based on upside potential"""
-        if upside_potential > 30:
-            return "Highly Undervalued"
-        elif upside_potential > 15:
-            return "Undervalued"
-        elif upside_potential > -15:
-            return "Fairly Valued"
-        elif upside_potential > -30:
-            return "Overvalued"
-        else:
-            return "Highly Overvalued"
+        return _VALUATION_LABELS[bisect.bisect_left(_VALUATION_THRESHOLDS, upside_potential)]
     
     def _compare_to_industry(self, metrics: Dict) -> Dict[str, str]:
         """Compare ratios to industry averages"""
-        comparisons = {}
-        
-        for metric, industry_avg in self.industry_averages.items():
-            if metric in metrics and metrics[metric] is not None:
-                current = metrics[metric]
-                
-                if metric in ['pe_ratio', 'pb_ratio', 'ps_ratio', 'ev_ebitda', 'peg_ratio', 'debt_to_equity']:
-                    # Lower is better
-                    if current < industry_avg * 0.8:
-                        comparisons[metric] = f"Attractive ({current:.1f} vs {industry_avg:.1f})"
-                    elif current > industry_avg * 1.2:
-                        comparisons[metric] = f"Premium ({current:.1f} vs {industry_avg:.1f})"
-                    else:
-                        comparisons[metric] = f"In-line ({current:.1f} vs {industry_avg:.1f})"
-                else:
-                    # Higher is better (ROE, ROCE, dividend yield, current ratio)
-                    if current > industry_avg * 1.2:
-                        comparisons[metric] = f"Above Average ({current:.1f} vs {industry_avg:.1f})"
-                    elif current < industry_avg * 0.8:
-                        comparisons[metric] = f"Below Average ({current:.1f} vs {industry_avg:.1f})"
-                    else:
-                        comparisons[metric] = f"In-line ({current:.1f} vs {industry_avg:.1f})"
-        
-        return comparisons
+        current = [metrics.get(metric) for metric in self._industry_keys]
+        cur = np.array([np.nan if value is None else value for value in current], dtype=np.float64)
+        
+        # Classify every ratio at once; the side checked first differs by direction
+        below = cur < self._industry_vals * 0.8
+        above = cur > self._industry_vals * 1.2
+        cls = np.where(
+            self._industry_lower,
+            np.where(below, 0, np.where(above, 2, 1)),
+            np.where(above, 2, np.where(below, 0, 1))
+        )
+        
+        return {
+            metric: f"{labels[c]} ({value:.1f} vs {avg:.1f})"
+            for metric, value, avg, labels, c in zip(
+                self._industry_keys, current, self._industry_avgs, self._industry_labels, cls.tolist()
+            )
+            if value is not None
+        }
     
     def _generate_valuation_insights(self, stock_name: str, result: Dict) -> str:
         """Generate AI-powered valuation insights"""
+        return self.generate_response(self._build_valuation_prompt(stock_name, result))
+    
+    def _build_valuation_prompt(self, stock_name: str, result: Dict) -> str:
+        """Prompt for the valuation insights"""
         
         # Build context for LLM
         context_parts = [f"Stock: {stock_name}"]
@@ -576,7 +976,7 @@ Provide a comprehensive analysis including:
 
 Keep response under 250 words and focus on actionable insights."""
 
-        return self.generate_response(prompt)
+        return prompt
     
     def _get_final_recommendation(self, result: Dict) -> Dict[str, Any]:
         """Generate final recommendation combining fundamental and technical analysis"""
@@ -584,48 +984,19 @@ Keep response under 250 words and focus on actionable insights."""
         
         # Fundamental score
         if 'upside_potential' in result:
-            upside = result['upside_potential']
-            if upside > 20:
-                scores.append(('fundamental', 'Strong Buy', 2))
-            elif upside > 10:
-                scores.append(('fundamental', 'Buy', 1))
-            elif upside > -10:
-                scores.append(('fundamental', 'Hold', 0))
-            elif upside > -20:
-                scores.append(('fundamental', 'Sell', -1))
-            else:
-                scores.append(('fundamental', 'Strong Sell', -2))
+            signal, score = _FUNDAMENTAL_SIGNALS[bisect.bisect_left(_FUNDAMENTAL_THRESHOLDS, result['upside_potential'])]
+            scores.append(('fundamental', signal, score))
         
         # Technical score
         if 'technical_analysis' in result and isinstance(result['technical_analysis'], dict):
             tech = result['technical_analysis']
-            rating = tech.get('technical_rating', 'Neutral')
-            if rating == 'Bullish':
-                scores.append(('technical', 'Buy', 1))
-            elif rating == 'Bearish':
-                scores.append(('technical', 'Sell', -1))
-            else:
-                scores.append(('technical', 'Hold', 0))
+            signal, score = _TECHNICAL_SIGNALS.get(tech.get('technical_rating', 'Neutral'), ("Hold", 0))
+            scores.append(('technical', signal, score))
         
         # Calculate combined score
         if scores:
             total_score = sum(s[2] for s in scores) / len(scores)
-            
-            if total_score >= 1.5:
-                action = "Strong Buy"
-                confidence = 0.9
-            elif total_score >= 0.5:
-                action = "Buy"
-                confidence = 0.7
-            elif total_score >= -0.5:
-                action = "Hold"
-                confidence = 0.5
-            elif total_score >= -1.5:
-                action = "Sell"
-                confidence = 0.7
-            else:
-                action = "Strong Sell"
-                confidence = 0.9
+            action, confidence = _ACTIONS[bisect.bisect_right(_ACTION_THRESHOLDS, total_score)]
         else:
             action = "Hold"
             confidence = 0.3
@@ -640,11 +1011,10 @@ Keep response under 250 words and focus on actionable insights."""
     
     def get_technical_summary(self, stock_name: str) -> Dict[str, Any]:
         """Get a quick technical summary for a stock"""
-        if stock_name not in self.price_data:
+        if stock_name not in self._tech_series:
             return {"error": f"No price data for {stock_name}"}
         
-        df = self.price_data[stock_name]
-        latest = df.iloc[-1]
+        latest = self._tech_series[stock_name].latest()
         
         return {
             "stock": stock_name,
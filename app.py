@@ -1,17 +1,16 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
-from agents.sentiment_agent import SentimentAgent
-from agents.macro_agent import MacroEconomicAgent
-from agents.valuation_agent import ValuationAgent
-from agents.geopolitical_agent import GeopoliticalAgent
-from agents.fundamental_agent import FundamentalAgent
-from scrapers.news_scraper import NewsScraper
 from utils.data_loader import SampleDataLoader
 from utils.new_data_loaders import ValuationDataLoader, GeopoliticalDataLoader, FundamentalDataLoader
+from utils.scoring import SCORE_AGENTS, RSI_STATES, agent_scores, compute_combined_score, rsi_state
 import pandas as pd
 from datetime import datetime
+import asyncio
+import aiohttp
 import numpy as np
+import bisect
+import functools
 
 # Page configuration
 st.set_page_config(
@@ -51,7 +50,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # NSE 50 Stocks
-NSE_50_STOCKS = [
+NSE_50_STOCKS = (
     "Adani Enterprises Ltd.",
     "Adani Ports and Special Economic Zone Ltd.",
     "Apollo Hospitals Enterprise Ltd.",
@@ -102,22 +101,22 @@ NSE_50_STOCKS = [
     "UltraTech Cement Ltd.",
     "Wipro Ltd.",
     "Zomato Ltd."
-]
+)
 
-@st.cache_resource
-def initialize_agents():
-    """Initialize all agents (cached)"""
-    sentiment_agent = SentimentAgent()
-    macro_agent = MacroEconomicAgent()
-    valuation_agent = ValuationAgent()
-    geo_agent = GeopoliticalAgent()
-    fundamental_agent = FundamentalAgent()
-    return sentiment_agent, macro_agent, valuation_agent, geo_agent, fundamental_agent
+# First word of each name, used to query news for a stock
+NSE_50_SHORT = {stock: stock.split()[0] for stock in NSE_50_STOCKS}
 
-@st.cache_data
-def load_sample_data():
-    """Load sample data for all agents (cached)"""
-    # News data
+# Agent names as an array so they can be masked alongside agent_scores
+SCORE_AGENT_LABELS = np.array(SCORE_AGENTS)
+
+# Each data source is memoized on disk separately, so a restart does not
+# regenerate everything and a change to one source leaves the others cached
+# (persisted caches do not support a TTL)
+@st.cache_data(persist="disk", show_spinner=False)
+def load_news_data():
+    """News articles, from the saved JSON or freshly scraped (cached)"""
+    from scrapers.news_scraper import NewsScraper
+    
     try:
         scraper = NewsScraper()
         news_data = scraper.load_from_json("./data/news/sample_news.json")
@@ -126,37 +125,108 @@ def load_sample_data():
         stocks = ["Reliance", "TCS", "Infosys", "HDFC Bank"]
         news_data = scraper.scrape_multiple_sources(stocks, articles_per_stock=5)
         scraper.save_to_json(news_data, "./data/news/sample_news.json")
-    
-    # Economic data
+    return news_data
+
+@st.cache_data(persist="disk", show_spinner=False)
+def load_economic_data():
+    """Economic indicator series (cached)"""
     try:
         economic_data = SampleDataLoader.load_from_csv()
     except:
         economic_data = SampleDataLoader.load_all_indicators()
         SampleDataLoader.save_to_csv(economic_data)
-    
-    # Valuation data - generate for all NSE 50 stocks
-    valuation_stocks = NSE_50_STOCKS
-    valuation_data = ValuationDataLoader.generate_valuation_data(valuation_stocks)
-    price_data = ValuationDataLoader.generate_price_data(valuation_stocks)
-    
-    # Geopolitical data
+    return economic_data
+
+@st.cache_data(persist="disk", show_spinner=False)
+def load_valuation_data(stocks):
+    """Valuation metrics and price history for the given stocks (cached)"""
+    valuation_data = ValuationDataLoader.generate_valuation_data(list(stocks))
+    price_data = ValuationDataLoader.generate_price_data(list(stocks))
+    return valuation_data, price_data
+
+@st.cache_data(persist="disk", show_spinner=False)
+def load_geo_events():
+    """Geopolitical events (cached)"""
     try:
         geo_events = GeopoliticalDataLoader.load_from_json("./data/geopolitical/events.json")
     except:
         geo_events = GeopoliticalDataLoader.generate_sample_events()
         GeopoliticalDataLoader.save_to_json(geo_events)
+    return geo_events
+
+@st.cache_data(persist="disk", show_spinner=False)
+def load_fundamental_data(stocks):
+    """Quarterly and annual results for the given stocks (cached)"""
+    quarterly_data = FundamentalDataLoader.generate_quarterly_data(list(stocks))
+    annual_data = FundamentalDataLoader.generate_annual_data(list(stocks))
+    return quarterly_data, annual_data
+
+# Each agent is imported, created and given its data the first time a page
+# needs it, so a page never pays for the others (e.g. the FinBERT model)
+@st.cache_resource
+def get_sentiment_agent():
+    """Sentiment agent with the news loaded (cached)"""
+    from agents.sentiment_agent import SentimentAgent
     
-    # Fundamental data - generate for all NSE 50 stocks
-    quarterly_data = FundamentalDataLoader.generate_quarterly_data(valuation_stocks)
-    annual_data = FundamentalDataLoader.generate_annual_data(valuation_stocks)
+    agent = SentimentAgent()
+    agent.load_news_data(load_news_data())
+    return agent
+
+@st.cache_resource
+def get_macro_agent():
+    """Macro economic agent with the indicator series loaded (cached)"""
+    from agents.macro_agent import MacroEconomicAgent
     
-    return news_data, economic_data, valuation_data, price_data, geo_events, quarterly_data, annual_data
+    agent = MacroEconomicAgent()
+    agent.load_economic_data(load_economic_data())
+    return agent
 
-def create_sentiment_gauge(compound_score):
-    """Create a gauge chart for sentiment"""
-    fig = go.Figure(go.Indicator(
+@st.cache_resource
+def get_valuation_agent():
+    """Valuation agent with metrics and price history for all NSE 50 stocks loaded (cached)"""
+    from agents.valuation_agent import ValuationAgent
+    
+    agent = ValuationAgent()
+    valuation_data, price_data = load_valuation_data(NSE_50_STOCKS)
+    agent.load_valuation_data(valuation_data)
+    agent.load_price_data(price_data)
+    return agent
+
+@st.cache_resource
+def get_geo_agent():
+    """Geopolitical agent with the events loaded (cached)"""
+    from agents.geopolitical_agent import GeopoliticalAgent
+    
+    agent = GeopoliticalAgent()
+    agent.load_geopolitical_events(load_geo_events())
+    return agent
+
+@st.cache_resource
+def get_fundamental_agent():
+    """Fundamental agent with quarterly and annual results for all NSE 50 stocks loaded (cached)"""
+    from agents.fundamental_agent import FundamentalAgent
+    
+    agent = FundamentalAgent()
+    quarterly_data, annual_data = load_fundamental_data(NSE_50_STOCKS)
+    agent.load_quarterly_data(quarterly_data)
+    agent.load_annual_data(annual_data)
+    return agent
+
+def figure_spec(fig):
+    """Plain-dict form of a figure, used as a template by new_figure()"""
+    return fig.to_plotly_json()
+
+def new_figure(spec):
+    """Fresh figure from a template spec"""
+    # The spec was validated when its figure was built, so the copy skips
+    # Plotly's property validation, which dominates building small charts
+    return go.Figure(spec, _validate=False)
+
+# Chart templates, built once; the chart functions only patch in their values
+SENTIMENT_GAUGE_TEMPLATE = figure_spec(go.Figure(
+    go.Indicator(
         mode="gauge+number+delta",
-        value=compound_score,
+        value=0,
         domain={'x': [0, 1], 'y': [0, 1]},
         title={'text': "Sentiment Score"},
         delta={'reference': 0},
@@ -174,12 +244,80 @@ def create_sentiment_gauge(compound_score):
                 'value': 0
             }
         }
+    ),
+    layout={'height': 300}
+))
+
+# Gauge bar colour for scores below 40, 40-70 and 70+
+SCORE_GAUGE_THRESHOLDS = (40, 70)
+SCORE_GAUGE_COLORS = ("red", "orange", "green")
+
+# Combined-score bands: (action, colour, rationale) for scores below 30, 30-45, 45-55, 55-70 and 70+
+COMBINED_ACTION_THRESHOLDS = (30, 45, 55, 70)
+COMBINED_ACTIONS = (
+    ("🔴 STRONG SELL", "darkred", "Significant risks identified across multiple factors"),
+    ("🔴 SELL", "red", "Multiple concerns identified, consider reducing exposure"),
+    ("🟡 HOLD", "orange", "Mixed signals, maintain current position"),
+    ("🟢 BUY", "lightgreen", "Most indicators are positive, consider accumulating"),
+    ("🟢 STRONG BUY", "green", "All indicators point to a favorable investment opportunity")
+)
+
+def combined_action(combined_score):
+    """(action, colour, rationale) for a combined score"""
+    return COMBINED_ACTIONS[bisect.bisect_right(COMBINED_ACTION_THRESHOLDS, combined_score)]
+
+# One score gauge per bar colour
+SCORE_GAUGE_TEMPLATES = {
+    color: figure_spec(go.Figure(
+        go.Indicator(
+            mode="gauge+number",
+            value=0,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            title={'text': ""},
+            gauge={
+                'axis': {'range': [0, 100]},
+                'bar': {'color': color},
+                'steps': [
+                    {'range': [0, 40], 'color': "lightcoral"},
+                    {'range': [40, 70], 'color': "lightyellow"},
+                    {'range': [70, 100], 'color': "lightgreen"}
+                ]
+            }
+        ),
+        layout={'height': 250}
     ))
-    fig.update_layout(height=300)
+    for color in ("green", "orange", "red")
+}
+
+RSI_GAUGE_TEMPLATE = figure_spec(go.Figure(
+    go.Indicator(
+        mode="gauge+number",
+        value=0,
+        title={'text': "RSI"},
+        domain={'row': 0, 'column': 0},
+        gauge={
+            'axis': {'range': [0, 100]},
+            'bar': {'color': "blue"},
+            'steps': [
+                {'range': [0, 30], 'color': "green"},
+                {'range': [30, 70], 'color': "gray"},
+                {'range': [70, 100], 'color': "red"}
+            ]
+        }
+    ),
+    layout={'height': 300}
+))
+EMPTY_TECHNICAL_TEMPLATE = figure_spec(go.Figure(layout={'height': 300}))
+
+def create_sentiment_gauge(compound_score):
+    """Create a gauge chart for sentiment"""
+    fig = new_figure(SENTIMENT_GAUGE_TEMPLATE)
+    fig.data[0].value = compound_score
     return fig
 
+@st.cache_data(show_spinner=False)
 def create_indicator_chart(economic_data, indicator):
-    """Create line chart for economic indicator"""
+    """Create line chart for economic indicator (cached)"""
     if indicator not in economic_data:
         return None
     
@@ -191,29 +329,12 @@ def create_indicator_chart(economic_data, indicator):
 
 def create_score_gauge(score, title, max_val=100):
     """Create a score gauge"""
-    if score >= 70:
-        color = "green"
-    elif score >= 40:
-        color = "orange"
-    else:
-        color = "red"
-    
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=score,
-        domain={'x': [0, 1], 'y': [0, 1]},
-        title={'text': title},
-        gauge={
-            'axis': {'range': [0, max_val]},
-            'bar': {'color': color},
-            'steps': [
-                {'range': [0, 40], 'color': "lightcoral"},
-                {'range': [40, 70], 'color': "lightyellow"},
-                {'range': [70, 100], 'color': "lightgreen"}
-            ]
-        }
-    ))
-    fig.update_layout(height=250)
+    color = SCORE_GAUGE_COLORS[bisect.bisect_right(SCORE_GAUGE_THRESHOLDS, score)]
+    fig = new_figure(SCORE_GAUGE_TEMPLATES[color])
+    gauge = fig.data[0]
+    gauge.value = score
+    gauge.title.text = title
+    gauge.gauge.axis.range = [0, max_val]
     return fig
 
 def create_technical_chart(indicators):
@@ -227,812 +348,1006 @@ def create_technical_chart(indicators):
     if not valid_indicators:
         return None
     
-    fig = go.Figure()
-    
     # RSI subplot
     if 'rsi' in valid_indicators:
-        fig.add_trace(go.Indicator(
-            mode="gauge+number",
-            value=valid_indicators['rsi'],
-            title={'text': "RSI"},
-            domain={'row': 0, 'column': 0},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': "blue"},
-                'steps': [
-                    {'range': [0, 30], 'color': "green"},
-                    {'range': [30, 70], 'color': "gray"},
-                    {'range': [70, 100], 'color': "red"}
-                ]
-            }
-        ))
+        fig = new_figure(RSI_GAUGE_TEMPLATE)
+        fig.data[0].value = valid_indicators['rsi']
+    else:
+        fig = new_figure(EMPTY_TECHNICAL_TEMPLATE)
     
-    fig.update_layout(height=300)
     return fig
 
-def main():
-    # Header
-    st.markdown('<div class="main-header">📈 AI Stock Analysis Agents - NSE India</div>', 
-                unsafe_allow_html=True)
-    st.markdown('<p style="text-align:center">Complete Multi-Agent System with 5 Specialized AI Agents</p>',
-                unsafe_allow_html=True)
+async def quick_scan(sentiment_agent, macro_agent, geo_agent, valuation_agent, fundamental_agent,
+                     stock_name, short_name):
+    """Run the five Quick Scan analyses concurrently on one HTTP session; failures are returned, not raised"""
+    async with aiohttp.ClientSession() as session:
+        return await asyncio.gather(
+            sentiment_agent.analyze_async(short_name, use_finbert=False, session=session),
+            macro_agent.analyze_async(session=session),
+            geo_agent.analyze_async(stock_name=stock_name, session=session),
+            valuation_agent.analyze_async(stock_name, session=session),
+            fundamental_agent.analyze_async(stock_name, session=session),
+            return_exceptions=True
+        )
+
+# At most this many agent requests are in flight during a Portfolio Scan
+PORTFOLIO_SCAN_CONCURRENCY = 16
+
+def portfolio_score_inputs(sent_result, macro_result, geo_result, val_result, fund_result):
+    """agent_scores inputs from one stock's results; a failed or missing agent gives NaN"""
+    def value(result, get):
+        return np.nan if isinstance(result, Exception) else float(get(result))
     
-    # Sidebar
-    st.sidebar.title("🎯 Control Panel")
-    page = st.sidebar.radio("Select Agent", 
-                            ["🏠 Home", 
-                             "😊 Sentiment Analysis", 
-                             "📊 Macro Economic",
-                             "💰 Valuation & Technical",
-                             "🌍 Geopolitical Analysis",
-                             "📈 Fundamental Analysis",
-                             "🔍 Comprehensive Analysis"])
+    return (
+        value(sent_result, lambda r: r.get('sentiment_scores', {}).get('compound', 0)),
+        value(macro_result, lambda r: r.get('economic_health_score', 50)),
+        value(geo_result, lambda r: r.get('risk_assessment', {}).get('overall_risk_score', 50)),
+        value(val_result, lambda r: r.get('upside_potential', np.nan)),
+        value(fund_result, lambda r: r.get('fundamental_score', {}).get('overall_score', 50))
+    )
+
+async def portfolio_scan(sentiment_agent, macro_agent, geo_agent, valuation_agent, fundamental_agent,
+                         stocks):
+    """
+    Run every agent on every stock on one HTTP session; returns the stocks ranked
+    by combined score, the number of agent calls that failed and the number made
+    """
+    semaphore = asyncio.Semaphore(PORTFOLIO_SCAN_CONCURRENCY)
     
-    # Initialize
-    with st.spinner("Initializing agents..."):
-        sentiment_agent, macro_agent, valuation_agent, geo_agent, fundamental_agent = initialize_agents()
-        news_data, economic_data, valuation_data, price_data, geo_events, quarterly_data, annual_data = load_sample_data()
-        
-        # Load data into agents
-        sentiment_agent.load_news_data(news_data)
-        macro_agent.load_economic_data(economic_data)
-        valuation_agent.load_valuation_data(valuation_data)
-        valuation_agent.load_price_data(price_data)
-        geo_agent.load_geopolitical_events(geo_events)
-        fundamental_agent.load_quarterly_data(quarterly_data)
-        fundamental_agent.load_annual_data(annual_data)
+    async def limited(call):
+        async with semaphore:
+            return await call()
     
-    # HOME PAGE
-    if page == "🏠 Home":
-        st.header("Welcome to AI Stock Analysis System")
+    async with aiohttp.ClientSession() as session:
+        # The macro view does not depend on the stock, so it is fetched once
+        calls = [lambda: macro_agent.analyze_async(session=session)]
+        for stock in stocks:
+            calls += [
+                lambda stock=stock: sentiment_agent.analyze_async(NSE_50_SHORT[stock], use_finbert=False,
+                                                                  session=session),
+                lambda stock=stock: geo_agent.analyze_async(stock_name=stock, session=session),
+                lambda stock=stock: valuation_agent.analyze_async(stock, session=session),
+                lambda stock=stock: fundamental_agent.analyze_async(stock, session=session)
+            ]
+        results = await asyncio.gather(*(limited(call) for call in calls), return_exceptions=True)
+    
+    macro_result = results[0]
+    score_matrix = np.empty((len(stocks), len(SCORE_AGENTS)))
+    for i in range(len(stocks)):
+        sent_result, geo_result, val_result, fund_result = results[1 + 4 * i:5 + 4 * i]
+        score_matrix[i] = agent_scores(*portfolio_score_inputs(sent_result, macro_result, geo_result,
+                                                               val_result, fund_result))
+    
+    scores = pd.DataFrame(score_matrix, columns=SCORE_AGENTS)
+    scores.insert(0, 'Stock', list(stocks))
+    scores['Combined'] = compute_combined_score(score_matrix)
+    failed_calls = sum(is_failed(result) for result in results)
+    return scores.sort_values('Combined', ascending=False, ignore_index=True), failed_calls, len(results)
+
+# Agent results are reused for 15 minutes per stock and options, so going back
+# to a page or re-running a stock skips the LLM round-trip; agents are part of
+# the cache key by identity rather than by hashing their contents
+AGENT_HASH_FUNCS = {
+    "agents.sentiment_agent.SentimentAgent": id,
+    "agents.macro_agent.MacroEconomicAgent": id,
+    "agents.valuation_agent.ValuationAgent": id,
+    "agents.geopolitical_agent.GeopoliticalAgent": id,
+    "agents.fundamental_agent.FundamentalAgent": id
+}
+
+# A failed agent call (an exception or an "Error: ..." LLM insight) is shown
+# once and retried on the next run rather than served from the cache
+class UncacheableResult(Exception):
+    """Carries a result out of an st.cache_data function; raising it keeps the result out of the cache"""
+    
+    def __init__(self, result):
+        super().__init__("result contains a failed agent call")
+        self.result = result
+
+def is_failed(result):
+    """True for an exception or a result whose LLM insight is an "Error: ..." string"""
+    if isinstance(result, Exception):
+        return True
+    return isinstance(result, dict) and any(
+        isinstance(result.get(key), str) and result[key].startswith("Error:")
+        for key in ("llm_insight", "ai_insight")
+    )
+
+def cacheable(result):
+    """Return result, or raise UncacheableResult when it is a failed agent call"""
+    if is_failed(result):
+        raise UncacheableResult(result)
+    return result
+
+def uncached_on_failure(func):
+    """Wrap an st.cache_data function so failed results are returned to the caller but never cached"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except UncacheableResult as e:
+            return e.result
+    return wrapper
+
+@uncached_on_failure
+@st.cache_data(ttl=900, max_entries=200, show_spinner=False, hash_funcs=AGENT_HASH_FUNCS)
+def cached_quick_scan(sentiment_agent, macro_agent, geo_agent, valuation_agent, fundamental_agent,
+                      stock_name, short_name):
+    """Quick Scan results for a stock (cached unless an agent failed)"""
+    results = asyncio.run(quick_scan(sentiment_agent, macro_agent, geo_agent, valuation_agent,
+                                     fundamental_agent, stock_name, short_name))
+    if any(is_failed(result) for result in results):
+        raise UncacheableResult(results)
+    return results
+
+@uncached_on_failure
+@st.cache_data(ttl=1800, show_spinner=False, hash_funcs=AGENT_HASH_FUNCS)
+def cached_portfolio_scan(sentiment_agent, macro_agent, geo_agent, valuation_agent, fundamental_agent,
+                          stocks):
+    """Portfolio Scan ranking and call counts (cached for 30 minutes unless a call failed)"""
+    scan = asyncio.run(portfolio_scan(sentiment_agent, macro_agent, geo_agent, valuation_agent,
+                                      fundamental_agent, stocks))
+    if scan[1]:
+        raise UncacheableResult(scan)
+    return scan
+
+@uncached_on_failure
+@st.cache_data(ttl=900, max_entries=200, show_spinner=False, hash_funcs=AGENT_HASH_FUNCS)
+def cached_sentiment(agent, stock_name, timeframe="7d"):
+    """Sentiment analysis (cached unless the LLM call failed)"""
+    return cacheable(agent.analyze(stock_name, timeframe, use_finbert=False))
+
+@uncached_on_failure
+@st.cache_data(ttl=900, max_entries=200, show_spinner=False, hash_funcs=AGENT_HASH_FUNCS)
+def cached_macro(agent, stock_name=None):
+    """Macro economic analysis (cached unless the LLM call failed)"""
+    return cacheable(agent.analyze(stock_name=stock_name))
+
+@uncached_on_failure
+@st.cache_data(ttl=900, max_entries=200, show_spinner=False, hash_funcs=AGENT_HASH_FUNCS)
+def cached_valuation(agent, stock_name):
+    """Valuation and technical analysis (cached unless the LLM call failed)"""
+    return cacheable(agent.analyze(stock_name))
+
+@uncached_on_failure
+@st.cache_data(ttl=900, max_entries=200, show_spinner=False, hash_funcs=AGENT_HASH_FUNCS)
+def cached_geopolitical(agent, stock_name=None, timeframe="30d"):
+    """Geopolitical analysis (cached unless the LLM call failed)"""
+    return cacheable(agent.analyze(stock_name=stock_name, timeframe=timeframe))
+
+@uncached_on_failure
+@st.cache_data(ttl=900, max_entries=200, show_spinner=False, hash_funcs=AGENT_HASH_FUNCS)
+def cached_fundamental(agent, stock_name, period="quarterly"):
+    """Fundamental analysis (cached unless the LLM call failed)"""
+    return cacheable(agent.analyze(stock_name, period=period))
+
+# Page bodies are fragments: using a page's widgets reruns just that page,
+# not the rest of the script around it
+@st.fragment
+def quick_scan_fragment():
+    """Quick Analysis cards on the Home page"""
+    # Quick Analysis Cards - ALL 5 AGENTS
+    st.subheader("🎯 Quick Analysis")
+    quick_stock = st.selectbox("Select stock for quick analysis", NSE_50_STOCKS)
+    
+    if st.button("⚡ Quick Scan", type="primary"):
         
-        col1, col2 = st.columns(2)
+        # The five agents mostly wait on the LLM, so their requests are
+        # awaited together and the scan takes as long as the slowest one
+        with st.spinner("Initializing agents..."):
+            sentiment_agent = get_sentiment_agent()
+            macro_agent = get_macro_agent()
+            valuation_agent = get_valuation_agent()
+            geo_agent = get_geo_agent()
+            fundamental_agent = get_fundamental_agent()
+        
+        with st.spinner("Running all agents..."):
+            short_name = NSE_50_SHORT[quick_stock]
+            sent_result, macro_result, geo_result, val_result, fund_result = cached_quick_scan(
+                sentiment_agent, macro_agent, geo_agent, valuation_agent,
+                fundamental_agent, quick_stock, short_name
+            )
+        
+        # Row 1: Sentiment, Economic Health, Geo Risk
+        col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.subheader("📊 System Overview")
-            st.info("""
-            This system uses 5 AI agents to analyze NSE India stocks:
-            
-            **1. Sentiment Analysis Agent**
-            - Analyzes news sentiment using FinBERT/VADER
-            - Provides buy/hold/sell recommendations
-            
-            **2. Macro Economic Agent**
-            - Analyzes 8 key economic indicators
-            - Assesses market conditions
-            
-            **3. Valuation & Technical Agent**
-            - Technical indicators (RSI, MACD, Bollinger)
-            - Valuation metrics (P/E, P/B, PEG)
-            
-            **4. Geopolitical Agent**
-            - Tracks tariffs, G20, conflicts
-            - Analyzes policy changes impact
-            
-            **5. Fundamental Agent**
-            - Quarterly/Annual report analysis
-            - Financial ratios & growth trends
-            """)
+            if isinstance(sent_result, Exception):
+                raise sent_result
+            st.metric("😊 Sentiment", sent_result['outlook'], 
+                     f"{sent_result['sentiment_scores']['compound']:.2f}")
         
         with col2:
-            st.subheader("📈 Quick Stats")
-            
-            # Agent stats
-            col_a, col_b = st.columns(2)
-            with col_a:
-                st.metric("News Articles", sentiment_agent.get_stats()['documents_count'])
-                st.metric("Geo Events", len(geo_events))
-            with col_b:
-                st.metric("Economic Indicators", len(economic_data))
-                st.metric("Stocks Tracked", len(valuation_data))
-            
-            st.metric("LLM Model", sentiment_agent.get_stats()['model'])
+            if isinstance(macro_result, Exception):
+                raise macro_result
+            st.metric("📊 Economic Health", f"{macro_result['economic_health_score']:.0f}/100",
+                     macro_result['outlook'])
         
-        st.subheader("🚀 Getting Started")
-        st.write("1. Select an agent from the sidebar")
-        st.write("2. Choose a stock to analyze")
-        st.write("3. View AI-powered insights and recommendations")
+        with col3:
+            if isinstance(geo_result, Exception):
+                raise geo_result
+            risk = geo_result.get('risk_assessment', {})
+            st.metric("🌍 Geo Risk", f"{risk.get('overall_risk_score', 0):.0f}/100",
+                     risk.get('risk_level', 'N/A'))
         
-        # Quick Analysis Cards - ALL 5 AGENTS
-        st.subheader("🎯 Quick Analysis")
-        quick_stock = st.selectbox("Select stock for quick analysis", NSE_50_STOCKS)
+        # Row 2: Valuation and Fundamental
+        col4, col5 = st.columns(2)
         
-        if st.button("⚡ Quick Scan", type="primary"):
-            
-            # Row 1: Sentiment, Economic Health, Geo Risk
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                with st.spinner("Analyzing sentiment..."):
-                    short_name = quick_stock.split()[0]
-                    sent_result = sentiment_agent.analyze(short_name, use_finbert=False)
-                    st.metric("😊 Sentiment", sent_result['outlook'], 
-                             f"{sent_result['sentiment_scores']['compound']:.2f}")
-            
-            with col2:
-                with st.spinner("Analyzing macro..."):
-                    macro_result = macro_agent.analyze()
-                    st.metric("📊 Economic Health", f"{macro_result['economic_health_score']:.0f}/100",
-                             macro_result['outlook'])
-            
-            with col3:
-                with st.spinner("Analyzing geo risk..."):
-                    geo_result = geo_agent.analyze(stock_name=quick_stock)
-                    risk = geo_result.get('risk_assessment', {})
-                    st.metric("🌍 Geo Risk", f"{risk.get('overall_risk_score', 0):.0f}/100",
-                             risk.get('risk_level', 'N/A'))
-            
-            # Row 2: Valuation and Fundamental
-            col4, col5 = st.columns(2)
-            
-            with col4:
-                with st.spinner("Analyzing valuation..."):
-                    try:
-                        val_result = valuation_agent.analyze(quick_stock)
-                        if 'upside_potential' in val_result:
-                            upside = val_result['upside_potential']
-                            rating = val_result.get('valuation_rating', 'N/A')
-                            st.metric("💰 Valuation", rating, f"{upside:.1f}% upside")
-                        else:
-                            st.metric("💰 Valuation", "N/A", "No data")
-                    except Exception as e:
-                        st.metric("💰 Valuation", "Error", str(e)[:20])
+        with col4:
+            try:
+                if isinstance(val_result, Exception):
+                    raise val_result
+                if 'upside_potential' in val_result:
+                    upside = val_result['upside_potential']
+                    rating = val_result.get('valuation_rating', 'N/A')
+                    st.metric("💰 Valuation", rating, f"{upside:.1f}% upside")
+                else:
+                    st.metric("💰 Valuation", "N/A", "No data")
+            except Exception as e:
+                st.metric("💰 Valuation", "Error", str(e)[:20])
+        
+        with col5:
+            try:
+                if isinstance(fund_result, Exception):
+                    raise fund_result
+                score = fund_result.get('fundamental_score', {})
+                overall = score.get('overall_score', 0)
+                rating = score.get('rating', 'N/A')
+                st.metric("📈 Fundamental", f"{overall:.0f}/100", rating)
+            except Exception as e:
+                st.metric("📈 Fundamental", "Error", str(e)[:20])
+        
+        # Technical Indicators Summary
+        st.subheader("📊 Technical Indicators")
+        try:
+            if 'technical_analysis' in val_result and isinstance(val_result['technical_analysis'], dict):
+                tech = val_result['technical_analysis']
+                tech_col1, tech_col2, tech_col3, tech_col4 = st.columns(4)
+                
+                indicators = tech.get('indicators', {})
+                
+                with tech_col1:
+                    rsi = indicators.get('rsi')
+                    if rsi:
+                        rsi_status = RSI_STATES[rsi_state(rsi)]
+                        st.metric("RSI", f"{rsi:.1f}", rsi_status)
+                    else:
+                        st.metric("RSI", "N/A", "")
+                
+                with tech_col2:
+                    macd = indicators.get('macd')
+                    if macd:
+                        macd_status = "Bullish" if macd > 0 else "Bearish"
+                        st.metric("MACD", f"{macd:.2f}", macd_status)
+                    else:
+                        st.metric("MACD", "N/A", "")
+                
+                with tech_col3:
+                    st.metric("Tech Rating", tech.get('technical_rating', 'N/A'), 
+                             f"{tech.get('buy_signals', 0)} buy / {tech.get('sell_signals', 0)} sell")
+                
+                with tech_col4:
+                    if 'recommendation' in val_result:
+                        rec = val_result['recommendation']
+                        st.metric("Recommendation", rec.get('action', 'N/A'),
+                                 f"{rec.get('confidence', 0):.0%} confidence")
+        except:
+            st.write("Technical analysis data not available")
+        
+        # Combined Score
+        st.subheader("🎯 Combined Analysis Score")
+        
+        try:
+            compound = sent_result.get('sentiment_scores', {}).get('compound', 0)
+            macro_score = macro_result.get('economic_health_score', 50)
+            geo_risk = risk.get('overall_risk_score', 50)
+            # Valuation is left out of the score without an upside estimate
+            upside = val_result['upside_potential'] if 'upside_potential' in val_result else np.nan
+            fund_score = fund_result.get('fundamental_score', {}).get('overall_score', 50)
+            inputs = (float(compound), float(macro_score), float(geo_risk), float(upside), float(fund_score))
             
-            with col5:
-                with st.spinner("Analyzing fundamentals..."):
-                    try:
-                        fund_result = fundamental_agent.analyze(quick_stock)
-                        score = fund_result.get('fundamental_score', {})
-                        overall = score.get('overall_score', 0)
-                        rating = score.get('rating', 'N/A')
-                        st.metric("📈 Fundamental", f"{overall:.0f}/100", rating)
-                    except Exception as e:
-                        st.metric("📈 Fundamental", "Error", str(e)[:20])
+            # Per-agent 0-100 scores and their mean
+            score_arr = agent_scores(*inputs)
+            available = ~np.isnan(score_arr)
+            combined_score = float(compute_combined_score(score_arr))
             
-            # Technical Indicators Summary
-            st.subheader("📊 Technical Indicators")
-            try:
-                if 'technical_analysis' in val_result and isinstance(val_result['technical_analysis'], dict):
-                    tech = val_result['technical_analysis']
-                    tech_col1, tech_col2, tech_col3, tech_col4 = st.columns(4)
-                    
-                    indicators = tech.get('indicators', {})
-                    
-                    with tech_col1:
-                        rsi = indicators.get('rsi')
-                        if rsi:
-                            rsi_status = "Oversold" if rsi < 30 else "Overbought" if rsi > 70 else "Neutral"
-                            st.metric("RSI", f"{rsi:.1f}", rsi_status)
-                        else:
-                            st.metric("RSI", "N/A", "")
-                    
-                    with tech_col2:
-                        macd = indicators.get('macd')
-                        if macd:
-                            macd_status = "Bullish" if macd > 0 else "Bearish"
-                            st.metric("MACD", f"{macd:.2f}", macd_status)
-                        else:
-                            st.metric("MACD", "N/A", "")
-                    
-                    with tech_col3:
-                        st.metric("Tech Rating", tech.get('technical_rating', 'N/A'), 
-                                 f"{tech.get('buy_signals', 0)} buy / {tech.get('sell_signals', 0)} sell")
-                    
-                    with tech_col4:
-                        if 'recommendation' in val_result:
-                            rec = val_result['recommendation']
-                            st.metric("Recommendation", rec.get('action', 'N/A'),
-                                     f"{rec.get('confidence', 0):.0%} confidence")
-            except:
-                st.write("Technical analysis data not available")
+            # Display combined score
+            score_col1, score_col2 = st.columns([1, 2])
             
-            # Combined Score
-            st.subheader("🎯 Combined Analysis Score")
+            with score_col1:
+                action, color, _ = combined_action(combined_score)
+                
+                st.markdown(f"### Combined Score: {combined_score:.0f}/100")
+                st.markdown(f"### {action}")
             
-            try:
-                scores = []
+            with score_col2:
+                # Create bar chart for score breakdown
+                score_df = pd.DataFrame({'Agent': SCORE_AGENT_LABELS[available], 'Score': score_arr[available]})
+                fig = px.bar(score_df, x='Agent', y='Score', 
+                            color='Score',
+                            color_continuous_scale=['red', 'yellow', 'green'],
+                            range_color=[0, 100])
+                fig.update_layout(height=250, showlegend=False)
+                fig.add_hline(y=combined_score, line_dash="dash", 
+                             annotation_text=f"Combined: {combined_score:.0f}")
+                st.plotly_chart(fig, use_container_width=True)
                 
-                # Sentiment score (convert -1 to 1 -> 0 to 100)
-                compound = sent_result.get('sentiment_scores', {}).get('compound', 0)
-                sent_score = (compound + 1) * 50
-                scores.append(('Sentiment', sent_score))
+        except Exception as e:
+            st.error(f"Error calculating combined score: {e}")
+
+@st.fragment
+def sentiment_page(sentiment_agent):
+    """Sentiment Analysis page"""
+    st.header("😊 Sentiment Analysis Agent")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        stock = st.selectbox("Select Stock", NSE_50_STOCKS)
+    
+    with col2:
+        timeframe = st.selectbox("Timeframe", ["7d", "30d", "90d"])
+    
+    if st.button("🔍 Analyze Sentiment", type="primary"):
+        with st.spinner(f"Analyzing {stock}..."):
+            short_name = NSE_50_SHORT[stock]
+            result = cached_sentiment(sentiment_agent, short_name, timeframe)
+            
+            if "error" in result:
+                st.error(result["error"])
+            else:
+                st.success(f"Analysis complete for {result['stock']}")
                 
-                # Macro score
-                macro_score = macro_result.get('economic_health_score', 50)
-                scores.append(('Macro', macro_score))
+                # Metrics row
+                col1, col2, col3, col4 = st.columns(4)
                 
-                # Geo score (inverse - lower risk is better)
-                geo_risk = risk.get('overall_risk_score', 50)
-                geo_score = 100 - geo_risk
-                scores.append(('Geopolitical', geo_score))
+                with col1:
+                    outlook_color = ("positive" if result['outlook'] == "Bullish" 
+                                   else "negative" if result['outlook'] == "Bearish" 
+                                   else "neutral")
+                    st.markdown(f"### Outlook\n### <span class='{outlook_color}'>{result['outlook']}</span>", 
+                               unsafe_allow_html=True)
                 
-                # Valuation score
-                if 'upside_potential' in val_result:
-                    upside = val_result['upside_potential']
-                    val_score = min(max(50 + upside, 0), 100)
-                    scores.append(('Valuation', val_score))
+                with col2:
+                    st.metric("Recommendation", result['recommendation'])
                 
-                # Fundamental score
-                fund_score = fund_result.get('fundamental_score', {}).get('overall_score', 50)
-                scores.append(('Fundamental', fund_score))
+                with col3:
+                    st.metric("Confidence", f"{result['confidence']:.1%}")
                 
-                # Calculate combined score
-                combined_score = np.mean([s[1] for s in scores])
+                with col4:
+                    st.metric("News Analyzed", result['total_news_analyzed'])
                 
-                # Display combined score
-                score_col1, score_col2 = st.columns([1, 2])
+                # Sentiment gauge
+                st.plotly_chart(
+                    create_sentiment_gauge(result['sentiment_scores']['compound']),
+                    use_container_width=True
+                )
                 
-                with score_col1:
-                    if combined_score >= 70:
-                        action = "🟢 STRONG BUY"
-                        color = "green"
-                    elif combined_score >= 55:
-                        action = "🟢 BUY"
-                        color = "lightgreen"
-                    elif combined_score >= 45:
-                        action = "🟡 HOLD"
-                        color = "orange"
-                    elif combined_score >= 30:
-                        action = "🔴 SELL"
-                        color = "red"
-                    else:
-                        action = "🔴 STRONG SELL"
-                        color = "darkred"
-                    
-                    st.markdown(f"### Combined Score: {combined_score:.0f}/100")
-                    st.markdown(f"### {action}")
+                # Sentiment breakdown
+                col1, col2 = st.columns(2)
                 
-                with score_col2:
-                    # Create bar chart for score breakdown
-                    score_df = pd.DataFrame(scores, columns=['Agent', 'Score'])
-                    fig = px.bar(score_df, x='Agent', y='Score', 
-                                color='Score',
-                                color_continuous_scale=['red', 'yellow', 'green'],
-                                range_color=[0, 100])
-                    fig.update_layout(height=250, showlegend=False)
-                    fig.add_hline(y=combined_score, line_dash="dash", 
-                                 annotation_text=f"Combined: {combined_score:.0f}")
+                with col1:
+                    st.subheader("📊 Sentiment Breakdown")
+                    scores = result['sentiment_scores']
+                    df = pd.DataFrame({
+                        'Sentiment': ['Positive', 'Negative', 'Neutral'],
+                        'Score': [scores['positive'], scores['negative'], scores['neutral']]
+                    })
+                    fig = px.bar(df, x='Sentiment', y='Score', color='Sentiment',
+                                color_discrete_map={
+                                    'Positive': 'green',
+                                    'Negative': 'red',
+                                    'Neutral': 'gray'
+                                })
                     st.plotly_chart(fig, use_container_width=True)
-                    
-            except Exception as e:
-                st.error(f"Error calculating combined score: {e}")
+                
+                with col2:
+                    st.subheader("💡 AI Insight")
+                    st.info(result['llm_insight'])
+
+@st.fragment
+def macro_page(macro_agent, economic_data):
+    """Macro Economic page"""
+    st.header("📊 Macro Economic Agent")
     
-    # SENTIMENT ANALYSIS PAGE
-    elif page == "😊 Sentiment Analysis":
-        st.header("😊 Sentiment Analysis Agent")
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        analysis_type = st.radio("Analysis Type", ["General Market", "Stock-Specific"])
+    
+    with col2:
+        if analysis_type == "Stock-Specific":
             stock = st.selectbox("Select Stock", NSE_50_STOCKS)
-        
-        with col2:
-            timeframe = st.selectbox("Timeframe", ["7d", "30d", "90d"])
-        
-        if st.button("🔍 Analyze Sentiment", type="primary"):
-            with st.spinner(f"Analyzing {stock}..."):
-                short_name = stock.split()[0]
-                result = sentiment_agent.analyze(short_name, timeframe, use_finbert=False)
-                
-                if "error" in result:
-                    st.error(result["error"])
-                else:
-                    st.success(f"Analysis complete for {result['stock']}")
-                    
-                    # Metrics row
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        outlook_color = ("positive" if result['outlook'] == "Bullish" 
-                                       else "negative" if result['outlook'] == "Bearish" 
-                                       else "neutral")
-                        st.markdown(f"### Outlook\n### <span class='{outlook_color}'>{result['outlook']}</span>", 
-                                   unsafe_allow_html=True)
-                    
-                    with col2:
-                        st.metric("Recommendation", result['recommendation'])
-                    
-                    with col3:
-                        st.metric("Confidence", f"{result['confidence']:.1%}")
-                    
-                    with col4:
-                        st.metric("News Analyzed", result['total_news_analyzed'])
-                    
-                    # Sentiment gauge
-                    st.plotly_chart(
-                        create_sentiment_gauge(result['sentiment_scores']['compound']),
-                        use_container_width=True
-                    )
-                    
-                    # Sentiment breakdown
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.subheader("📊 Sentiment Breakdown")
-                        scores = result['sentiment_scores']
-                        df = pd.DataFrame({
-                            'Sentiment': ['Positive', 'Negative', 'Neutral'],
-                            'Score': [scores['positive'], scores['negative'], scores['neutral']]
-                        })
-                        fig = px.bar(df, x='Sentiment', y='Score', color='Sentiment',
-                                    color_discrete_map={
-                                        'Positive': 'green',
-                                        'Negative': 'red',
-                                        'Neutral': 'gray'
-                                    })
-                        st.plotly_chart(fig, use_container_width=True)
-                    
-                    with col2:
-                        st.subheader("💡 AI Insight")
-                        st.info(result['llm_insight'])
+        else:
+            stock = None
     
-    # MACRO ECONOMIC PAGE
-    elif page == "📊 Macro Economic":
-        st.header("📊 Macro Economic Agent")
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            analysis_type = st.radio("Analysis Type", ["General Market", "Stock-Specific"])
-        
-        with col2:
-            if analysis_type == "Stock-Specific":
-                stock = st.selectbox("Select Stock", NSE_50_STOCKS)
+    if st.button("🔍 Analyze Economy", type="primary"):
+        with st.spinner("Analyzing economic indicators..."):
+            result = cached_macro(macro_agent, stock)
+            
+            if "error" in result:
+                st.error(result["error"])
             else:
-                stock = None
-        
-        if st.button("🔍 Analyze Economy", type="primary"):
-            with st.spinner("Analyzing economic indicators..."):
-                result = macro_agent.analyze(stock_name=stock)
+                st.success("Economic analysis complete")
                 
-                if "error" in result:
-                    st.error(result["error"])
-                else:
-                    st.success("Economic analysis complete")
-                    
-                    # Metrics row
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        health_score = result['economic_health_score']
-                        st.plotly_chart(create_score_gauge(health_score, "Economic Health"), 
-                                       use_container_width=True)
-                    
-                    with col2:
-                        st.metric("Outlook", result['outlook'])
-                        st.metric("Market Impact", result['market_impact'])
-                    
-                    with col3:
-                        st.subheader("🔑 Key Factors")
-                        for factor in result['key_factors']:
-                            st.write(f"• {factor}")
-                    
-                    # Indicator charts
+                # Metrics row
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    health_score = result['economic_health_score']
+                    st.plotly_chart(create_score_gauge(health_score, "Economic Health"), 
+                                   use_container_width=True)
+                
+                with col2:
+                    st.metric("Outlook", result['outlook'])
+                    st.metric("Market Impact", result['market_impact'])
+                
+                with col3:
+                    st.subheader("🔑 Key Factors")
+                    for factor in result['key_factors']:
+                        st.write(f"• {factor}")
+                
+                # Indicator charts
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    if 'gdp_growth' in economic_data:
+                        fig = create_indicator_chart(economic_data, 'gdp_growth')
+                        st.plotly_chart(fig, use_container_width=True)
+                
+                with col2:
+                    if 'inflation_cpi' in economic_data:
+                        fig = create_indicator_chart(economic_data, 'inflation_cpi')
+                        st.plotly_chart(fig, use_container_width=True)
+                
+                # AI Insight
+                st.subheader("💡 AI Economic Insight")
+                st.info(result['llm_insight'])
+
+@st.fragment
+def valuation_page(valuation_agent):
+    """Valuation & Technical page"""
+    st.header("💰 Valuation & Technical Analysis Agent")
+    
+    stock = st.selectbox("Select Stock", NSE_50_STOCKS)
+    
+    if st.button("🔍 Analyze Valuation", type="primary"):
+        with st.spinner(f"Analyzing {stock}..."):
+            result = cached_valuation(valuation_agent, stock)
+            
+            if "error" in result:
+                st.error(result.get("error", "Analysis failed"))
+            else:
+                st.success(f"Analysis complete for {result['stock']}")
+                
+                # Key metrics
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    if 'current_price' in result:
+                        st.metric("Current Price", f"₹{result['current_price']:.2f}")
+                
+                with col2:
+                    if 'fair_value' in result:
+                        st.metric("Fair Value", f"₹{result['fair_value']:.2f}")
+                
+                with col3:
+                    if 'upside_potential' in result:
+                        upside = result['upside_potential']
+                        st.metric("Upside Potential", f"{upside:.1f}%",
+                                 delta=f"{upside:.1f}%")
+                
+                with col4:
+                    if 'valuation_rating' in result:
+                        st.metric("Rating", result['valuation_rating'])
+                
+                # Technical Analysis
+                st.subheader("📊 Technical Analysis")
+                
+                if 'technical_analysis' in result and isinstance(result['technical_analysis'], dict):
+                    tech = result['technical_analysis']
+                    
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        if 'gdp_growth' in economic_data:
-                            fig = create_indicator_chart(economic_data, 'gdp_growth')
-                            st.plotly_chart(fig, use_container_width=True)
+                        st.write(f"**Technical Rating:** {tech.get('technical_rating', 'N/A')}")
+                        st.write(f"**Buy Signals:** {tech.get('buy_signals', 0)}")
+                        st.write(f"**Sell Signals:** {tech.get('sell_signals', 0)}")
+                        
+                        # Signals table
+                        if 'signals' in tech:
+                            st.write("**Signal Details:**")
+                            for signal in tech['signals']:
+                                emoji = "🟢" if signal['action'] == 'Buy' else "🔴" if signal['action'] == 'Sell' else "🟡"
+                                st.write(f"{emoji} {signal['indicator']}: {signal['signal']} ({signal['action']})")
                     
                     with col2:
-                        if 'inflation_cpi' in economic_data:
-                            fig = create_indicator_chart(economic_data, 'inflation_cpi')
-                            st.plotly_chart(fig, use_container_width=True)
-                    
-                    # AI Insight
-                    st.subheader("💡 AI Economic Insight")
-                    st.info(result['llm_insight'])
-    
-    # VALUATION & TECHNICAL PAGE
-    elif page == "💰 Valuation & Technical":
-        st.header("💰 Valuation & Technical Analysis Agent")
-        
-        stock = st.selectbox("Select Stock", NSE_50_STOCKS)
-        
-        if st.button("🔍 Analyze Valuation", type="primary"):
-            with st.spinner(f"Analyzing {stock}..."):
-                result = valuation_agent.analyze(stock)
+                        indicators = tech.get('indicators', {})
+                        if indicators:
+                            st.write("**Key Indicators:**")
+                            for ind, val in indicators.items():
+                                if val is not None:
+                                    st.write(f"• {ind.upper()}: {val:.2f}")
                 
-                if "error" in result:
-                    st.error(result.get("error", "Analysis failed"))
-                else:
-                    st.success(f"Analysis complete for {result['stock']}")
-                    
-                    # Key metrics
-                    col1, col2, col3, col4 = st.columns(4)
-                    
+                # Support/Resistance
+                if 'technical_analysis' in result and 'support_resistance' in result['technical_analysis']:
+                    st.subheader("📍 Support & Resistance")
+                    sr = result['technical_analysis']['support_resistance']
+                    col1, col2 = st.columns(2)
                     with col1:
-                        if 'current_price' in result:
-                            st.metric("Current Price", f"₹{result['current_price']:.2f}")
-                    
+                        st.write(f"**Support 1:** ₹{sr.get('support_1', 0):.2f}")
+                        st.write(f"**Support 2:** ₹{sr.get('support_2', 0):.2f}")
                     with col2:
-                        if 'fair_value' in result:
-                            st.metric("Fair Value", f"₹{result['fair_value']:.2f}")
-                    
-                    with col3:
-                        if 'upside_potential' in result:
-                            upside = result['upside_potential']
-                            st.metric("Upside Potential", f"{upside:.1f}%",
-                                     delta=f"{upside:.1f}%")
-                    
-                    with col4:
-                        if 'valuation_rating' in result:
-                            st.metric("Rating", result['valuation_rating'])
-                    
-                    # Technical Analysis
-                    st.subheader("📊 Technical Analysis")
-                    
-                    if 'technical_analysis' in result and isinstance(result['technical_analysis'], dict):
-                        tech = result['technical_analysis']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.write(f"**Technical Rating:** {tech.get('technical_rating', 'N/A')}")
-                            st.write(f"**Buy Signals:** {tech.get('buy_signals', 0)}")
-                            st.write(f"**Sell Signals:** {tech.get('sell_signals', 0)}")
-                            
-                            # Signals table
-                            if 'signals' in tech:
-                                st.write("**Signal Details:**")
-                                for signal in tech['signals']:
-                                    emoji = "🟢" if signal['action'] == 'Buy' else "🔴" if signal['action'] == 'Sell' else "🟡"
-                                    st.write(f"{emoji} {signal['indicator']}: {signal['signal']} ({signal['action']})")
-                        
-                        with col2:
-                            indicators = tech.get('indicators', {})
-                            if indicators:
-                                st.write("**Key Indicators:**")
-                                for ind, val in indicators.items():
-                                    if val is not None:
-                                        st.write(f"• {ind.upper()}: {val:.2f}")
-                    
-                    # Support/Resistance
-                    if 'technical_analysis' in result and 'support_resistance' in result['technical_analysis']:
-                        st.subheader("📍 Support & Resistance")
-                        sr = result['technical_analysis']['support_resistance']
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.write(f"**Support 1:** ₹{sr.get('support_1', 0):.2f}")
-                            st.write(f"**Support 2:** ₹{sr.get('support_2', 0):.2f}")
-                        with col2:
-                            st.write(f"**Resistance 1:** ₹{sr.get('resistance_1', 0):.2f}")
-                            st.write(f"**Resistance 2:** ₹{sr.get('resistance_2', 0):.2f}")
-                    
-                    # Recommendation
-                    if 'recommendation' in result:
-                        rec = result['recommendation']
-                        st.subheader("📝 Recommendation")
-                        st.write(f"**Action:** {rec.get('action', 'N/A')}")
-                        st.write(f"**Confidence:** {rec.get('confidence', 0):.1%}")
-                    
-                    # AI Insight
-                    st.subheader("💡 AI Insight")
-                    st.info(result.get('ai_insight', 'No insight available'))
+                        st.write(f"**Resistance 1:** ₹{sr.get('resistance_1', 0):.2f}")
+                        st.write(f"**Resistance 2:** ₹{sr.get('resistance_2', 0):.2f}")
+                
+                # Recommendation
+                if 'recommendation' in result:
+                    rec = result['recommendation']
+                    st.subheader("📝 Recommendation")
+                    st.write(f"**Action:** {rec.get('action', 'N/A')}")
+                    st.write(f"**Confidence:** {rec.get('confidence', 0):.1%}")
+                
+                # AI Insight
+                st.subheader("💡 AI Insight")
+                st.info(result.get('ai_insight', 'No insight available'))
+
+@st.fragment
+def geopolitical_page(geo_agent):
+    """Geopolitical Analysis page"""
+    st.header("🌍 Geopolitical Analysis Agent")
     
-    # GEOPOLITICAL PAGE
-    elif page == "🌍 Geopolitical Analysis":
-        st.header("🌍 Geopolitical Analysis Agent")
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            stock = st.selectbox("Select Stock", NSE_50_STOCKS)
-        
-        with col2:
-            timeframe = st.selectbox("Analysis Period", ["30d", "90d", "180d"])
-        
-        if st.button("🔍 Analyze Geopolitical Factors", type="primary"):
-            with st.spinner(f"Analyzing geopolitical factors for {stock}..."):
-                result = geo_agent.analyze(stock_name=stock, timeframe=timeframe)
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        stock = st.selectbox("Select Stock", NSE_50_STOCKS)
+    
+    with col2:
+        timeframe = st.selectbox("Analysis Period", ["30d", "90d", "180d"])
+    
+    if st.button("🔍 Analyze Geopolitical Factors", type="primary"):
+        with st.spinner(f"Analyzing geopolitical factors for {stock}..."):
+            result = cached_geopolitical(geo_agent, stock, timeframe)
+            
+            st.success(f"Analysis complete for {result['stock']}")
+            
+            # Risk Assessment
+            risk = result.get('risk_assessment', {})
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.plotly_chart(
+                    create_score_gauge(risk.get('overall_risk_score', 0), "Risk Score"),
+                    use_container_width=True
+                )
+            
+            with col2:
+                st.metric("Risk Level", risk.get('risk_level', 'N/A'))
+                st.metric("Market Outlook", risk.get('market_outlook', 'N/A'))
+                st.metric("Sector", result.get('sector', 'N/A'))
+            
+            with col3:
+                st.subheader("🔑 Key Risk Factors")
+                for factor in risk.get('key_risk_factors', [])[:5]:
+                    st.write(f"⚠️ {factor}")
+            
+            # Event Summary
+            event_summary = result.get('event_summary', {})
+            if event_summary:
+                st.subheader("📰 Event Summary")
+                
+                col1, col2 = st.columns(2)
                 
+                with col1:
+                    st.write(f"**Total Events:** {event_summary.get('total_events', 0)}")
+                    impact = event_summary.get('impact_distribution', {})
+                    st.write(f"**High Impact:** {impact.get('high', 0)}")
+                    st.write(f"**Medium Impact:** {impact.get('medium', 0)}")
+                    st.write(f"**Low Impact:** {impact.get('low', 0)}")
+                
+                with col2:
+                    concerns = event_summary.get('top_concerns', [])
+                    if concerns:
+                        st.write("**Top Concerns:**")
+                        for concern in concerns[:3]:
+                            st.write(f"• {concern['category']}: {concern['severity']}")
+            
+            # Recommendation
+            rec = result.get('recommendation', {})
+            st.subheader("📝 Recommendation")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"**Action:** {rec.get('action', 'N/A')}")
+                st.write(f"**Strategy:** {rec.get('strategy', 'N/A')}")
+            with col2:
+                st.write(f"**Portfolio Suggestion:** {rec.get('portfolio_suggestion', 'N/A')}")
+            
+            # AI Insight
+            st.subheader("💡 AI Insight")
+            st.info(result.get('ai_insight', 'No insight available'))
+
+@st.fragment
+def fundamental_page(fundamental_agent):
+    """Fundamental Analysis page"""
+    st.header("📈 Fundamental Analysis Agent")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        stock = st.selectbox("Select Stock", NSE_50_STOCKS)
+    
+    with col2:
+        period = st.selectbox("Analysis Period", ["quarterly", "annual"])
+    
+    if st.button("🔍 Analyze Fundamentals", type="primary"):
+        with st.spinner(f"Analyzing fundamentals for {stock}..."):
+            result = cached_fundamental(fundamental_agent, stock, period)
+            
+            if "error" in result:
+                st.error(result["error"])
+            else:
                 st.success(f"Analysis complete for {result['stock']}")
                 
-                # Risk Assessment
-                risk = result.get('risk_assessment', {})
+                # Fundamental Score
+                score = result.get('fundamental_score', {})
                 
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
                     st.plotly_chart(
-                        create_score_gauge(risk.get('overall_risk_score', 0), "Risk Score"),
+                        create_score_gauge(score.get('overall_score', 0), "Fundamental Score"),
                         use_container_width=True
                     )
                 
                 with col2:
-                    st.metric("Risk Level", risk.get('risk_level', 'N/A'))
-                    st.metric("Market Outlook", risk.get('market_outlook', 'N/A'))
-                    st.metric("Sector", result.get('sector', 'N/A'))
+                    st.metric("Rating", score.get('rating', 'N/A'))
+                    
+                    # Component scores
+                    st.write("**Component Scores:**")
+                    for comp, comp_score in score.get('component_scores', {}).items():
+                        st.write(f"• {comp.title()}: {comp_score:.0f}")
                 
                 with col3:
-                    st.subheader("🔑 Key Risk Factors")
-                    for factor in risk.get('key_risk_factors', [])[:5]:
-                        st.write(f"⚠️ {factor}")
+                    rec = result.get('recommendation', {})
+                    st.metric("Recommendation", rec.get('action', 'N/A'))
+                    st.metric("Confidence", f"{rec.get('confidence', 0):.0%}")
                 
-                # Event Summary
-                event_summary = result.get('event_summary', {})
-                if event_summary:
-                    st.subheader("📰 Event Summary")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write(f"**Total Events:** {event_summary.get('total_events', 0)}")
-                        impact = event_summary.get('impact_distribution', {})
-                        st.write(f"**High Impact:** {impact.get('high', 0)}")
-                        st.write(f"**Medium Impact:** {impact.get('medium', 0)}")
-                        st.write(f"**Low Impact:** {impact.get('low', 0)}")
-                    
-                    with col2:
-                        concerns = event_summary.get('top_concerns', [])
-                        if concerns:
-                            st.write("**Top Concerns:**")
-                            for concern in concerns[:3]:
-                                st.write(f"• {concern['category']}: {concern['severity']}")
+                # Financial Performance
+                st.subheader("📊 Financial Performance")
+                
+                perf = result.get('financial_performance', {})
+                latest = perf.get('latest_period', {})
+                
+                if latest:
+                    cols = st.columns(4)
+                    metrics = list(latest.items())[:4]
+                    for i, (metric, data) in enumerate(metrics):
+                        with cols[i]:
+                            st.metric(data.get('label', metric)[:20], 
+                                     f"{data.get('value', 0):.2f}")
+                
+                # Growth Analysis
+                growth = result.get('growth_analysis', {})
                 
-                # Recommendation
-                rec = result.get('recommendation', {})
-                st.subheader("📝 Recommendation")
                 col1, col2 = st.columns(2)
+                
                 with col1:
-                    st.write(f"**Action:** {rec.get('action', 'N/A')}")
-                    st.write(f"**Strategy:** {rec.get('strategy', 'N/A')}")
+                    st.subheader("📈 Growth Metrics")
+                    if growth.get('revenue_cagr'):
+                        st.write(f"**Revenue CAGR:** {growth['revenue_cagr']:.1f}%")
+                    if growth.get('profit_cagr'):
+                        st.write(f"**Profit CAGR:** {growth['profit_cagr']:.1f}%")
+                    if growth.get('eps_cagr'):
+                        st.write(f"**EPS CAGR:** {growth['eps_cagr']:.1f}%")
+                    st.write(f"**Growth Consistency:** {growth.get('growth_consistency', 'N/A')}")
+                
                 with col2:
-                    st.write(f"**Portfolio Suggestion:** {rec.get('portfolio_suggestion', 'N/A')}")
+                    st.subheader("✅ Quality Assessment")
+                    quality = result.get('quality_assessment', {})
+                    st.write(f"**Quality Score:** {quality.get('quality_score', 0):.0f}/100")
+                    if quality.get('cash_conversion'):
+                        st.write(f"**Cash Conversion:** {quality['cash_conversion']:.0f}%")
+                    st.write(f"**Earnings Persistence:** {quality.get('earnings_persistence', 'N/A')}")
+                    
+                    flags = quality.get('flags', [])
+                    if flags:
+                        st.write("**Flags:**")
+                        for flag in flags:
+                            st.write(f"⚠️ {flag}")
                 
                 # AI Insight
                 st.subheader("💡 AI Insight")
                 st.info(result.get('ai_insight', 'No insight available'))
+
+@st.fragment
+def comprehensive_page(sentiment_agent, macro_agent, valuation_agent, geo_agent, fundamental_agent):
+    """Comprehensive Analysis page"""
+    st.header("🔍 Comprehensive Analysis - All Agents")
     
-    # FUNDAMENTAL ANALYSIS PAGE
-    elif page == "📈 Fundamental Analysis":
-        st.header("📈 Fundamental Analysis Agent")
+    stock = st.selectbox("Select Stock for Full Analysis", NSE_50_STOCKS)
+    
+    if st.button("🚀 Run Full Analysis", type="primary"):
+        progress = st.progress(0)
+        status = st.empty()
+        
+        results = {}
+        
+        # Sentiment
+        status.text("Analyzing sentiment...")
+        progress.progress(10)
+        short_name = NSE_50_SHORT[stock]
+        results['sentiment'] = cached_sentiment(sentiment_agent, short_name)
+        
+        # Macro
+        status.text("Analyzing macro economics...")
+        progress.progress(30)
+        results['macro'] = cached_macro(macro_agent, stock)
         
-        col1, col2 = st.columns([2, 1])
+        # Valuation
+        status.text("Analyzing valuation...")
+        progress.progress(50)
+        results['valuation'] = cached_valuation(valuation_agent, stock)
+        
+        # Geopolitical
+        status.text("Analyzing geopolitical factors...")
+        progress.progress(70)
+        results['geopolitical'] = cached_geopolitical(geo_agent, stock)
+        
+        # Fundamental
+        status.text("Analyzing fundamentals...")
+        progress.progress(90)
+        results['fundamental'] = cached_fundamental(fundamental_agent, stock)
+        
+        progress.progress(100)
+        status.text("Analysis complete!")
+        
+        st.success(f"Comprehensive Analysis Complete for {stock}")
+        
+        # Summary Cards
+        st.subheader("📊 Analysis Summary")
+        
+        col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
-            stock = st.selectbox("Select Stock", NSE_50_STOCKS)
+            st.markdown("**😊 Sentiment**")
+            sent = results['sentiment']
+            st.metric("Outlook", sent.get('outlook', 'N/A'))
+            st.write(f"Score: {sent.get('sentiment_scores', {}).get('compound', 0):.2f}")
         
         with col2:
-            period = st.selectbox("Analysis Period", ["quarterly", "annual"])
+            st.markdown("**📊 Macro**")
+            macro = results['macro']
+            st.metric("Health", f"{macro.get('economic_health_score', 0):.0f}")
+            st.write(f"Impact: {macro.get('market_impact', 'N/A')}")
         
-        if st.button("🔍 Analyze Fundamentals", type="primary"):
-            with st.spinner(f"Analyzing fundamentals for {stock}..."):
-                result = fundamental_agent.analyze(stock, period=period)
-                
-                if "error" in result:
-                    st.error(result["error"])
-                else:
-                    st.success(f"Analysis complete for {result['stock']}")
-                    
-                    # Fundamental Score
-                    score = result.get('fundamental_score', {})
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.plotly_chart(
-                            create_score_gauge(score.get('overall_score', 0), "Fundamental Score"),
-                            use_container_width=True
-                        )
-                    
-                    with col2:
-                        st.metric("Rating", score.get('rating', 'N/A'))
-                        
-                        # Component scores
-                        st.write("**Component Scores:**")
-                        for comp, comp_score in score.get('component_scores', {}).items():
-                            st.write(f"• {comp.title()}: {comp_score:.0f}")
-                    
-                    with col3:
-                        rec = result.get('recommendation', {})
-                        st.metric("Recommendation", rec.get('action', 'N/A'))
-                        st.metric("Confidence", f"{rec.get('confidence', 0):.0%}")
-                    
-                    # Financial Performance
-                    st.subheader("📊 Financial Performance")
-                    
-                    perf = result.get('financial_performance', {})
-                    latest = perf.get('latest_period', {})
-                    
-                    if latest:
-                        cols = st.columns(4)
-                        metrics = list(latest.items())[:4]
-                        for i, (metric, data) in enumerate(metrics):
-                            with cols[i]:
-                                st.metric(data.get('label', metric)[:20], 
-                                         f"{data.get('value', 0):.2f}")
-                    
-                    # Growth Analysis
-                    growth = result.get('growth_analysis', {})
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.subheader("📈 Growth Metrics")
-                        if growth.get('revenue_cagr'):
-                            st.write(f"**Revenue CAGR:** {growth['revenue_cagr']:.1f}%")
-                        if growth.get('profit_cagr'):
-                            st.write(f"**Profit CAGR:** {growth['profit_cagr']:.1f}%")
-                        if growth.get('eps_cagr'):
-                            st.write(f"**EPS CAGR:** {growth['eps_cagr']:.1f}%")
-                        st.write(f"**Growth Consistency:** {growth.get('growth_consistency', 'N/A')}")
-                    
-                    with col2:
-                        st.subheader("✅ Quality Assessment")
-                        quality = result.get('quality_assessment', {})
-                        st.write(f"**Quality Score:** {quality.get('quality_score', 0):.0f}/100")
-                        if quality.get('cash_conversion'):
-                            st.write(f"**Cash Conversion:** {quality['cash_conversion']:.0f}%")
-                        st.write(f"**Earnings Persistence:** {quality.get('earnings_persistence', 'N/A')}")
-                        
-                        flags = quality.get('flags', [])
-                        if flags:
-                            st.write("**Flags:**")
-                            for flag in flags:
-                                st.write(f"⚠️ {flag}")
-                    
-                    # AI Insight
-                    st.subheader("💡 AI Insight")
-                    st.info(result.get('ai_insight', 'No insight available'))
-    
-    # COMPREHENSIVE ANALYSIS PAGE
-    elif page == "🔍 Comprehensive Analysis":
-        st.header("🔍 Comprehensive Analysis - All Agents")
+        with col3:
+            st.markdown("**💰 Valuation**")
+            val = results['valuation']
+            st.metric("Rating", val.get('valuation_rating', 'N/A'))
+            if 'upside_potential' in val:
+                st.write(f"Upside: {val['upside_potential']:.1f}%")
         
-        stock = st.selectbox("Select Stock for Full Analysis", NSE_50_STOCKS)
+        with col4:
+            st.markdown("**🌍 Geopolitical**")
+            geo = results['geopolitical']
+            risk = geo.get('risk_assessment', {})
+            st.metric("Risk", risk.get('risk_level', 'N/A'))
+            st.write(f"Score: {risk.get('overall_risk_score', 0):.0f}")
         
-        if st.button("🚀 Run Full Analysis", type="primary"):
-            progress = st.progress(0)
-            status = st.empty()
-            
-            results = {}
-            
-            # Sentiment
-            status.text("Analyzing sentiment...")
-            progress.progress(10)
-            short_name = stock.split()[0]
-            results['sentiment'] = sentiment_agent.analyze(short_name, use_finbert=False)
-            
-            # Macro
-            status.text("Analyzing macro economics...")
-            progress.progress(30)
-            results['macro'] = macro_agent.analyze(stock_name=stock)
-            
-            # Valuation
-            status.text("Analyzing valuation...")
-            progress.progress(50)
-            results['valuation'] = valuation_agent.analyze(stock)
-            
-            # Geopolitical
-            status.text("Analyzing geopolitical factors...")
-            progress.progress(70)
-            results['geopolitical'] = geo_agent.analyze(stock_name=stock)
-            
-            # Fundamental
-            status.text("Analyzing fundamentals...")
-            progress.progress(90)
-            results['fundamental'] = fundamental_agent.analyze(stock)
-            
-            progress.progress(100)
-            status.text("Analysis complete!")
-            
-            st.success(f"Comprehensive Analysis Complete for {stock}")
-            
-            # Summary Cards
-            st.subheader("📊 Analysis Summary")
-            
-            col1, col2, col3, col4, col5 = st.columns(5)
-            
-            with col1:
-                st.markdown("**😊 Sentiment**")
-                sent = results['sentiment']
-                st.metric("Outlook", sent.get('outlook', 'N/A'))
-                st.write(f"Score: {sent.get('sentiment_scores', {}).get('compound', 0):.2f}")
-            
-            with col2:
-                st.markdown("**📊 Macro**")
-                macro = results['macro']
-                st.metric("Health", f"{macro.get('economic_health_score', 0):.0f}")
-                st.write(f"Impact: {macro.get('market_impact', 'N/A')}")
-            
-            with col3:
-                st.markdown("**💰 Valuation**")
-                val = results['valuation']
-                st.metric("Rating", val.get('valuation_rating', 'N/A'))
-                if 'upside_potential' in val:
-                    st.write(f"Upside: {val['upside_potential']:.1f}%")
-            
-            with col4:
-                st.markdown("**🌍 Geopolitical**")
-                geo = results['geopolitical']
-                risk = geo.get('risk_assessment', {})
-                st.metric("Risk", risk.get('risk_level', 'N/A'))
-                st.write(f"Score: {risk.get('overall_risk_score', 0):.0f}")
-            
-            with col5:
-                st.markdown("**📈 Fundamental**")
-                fund = results['fundamental']
-                score = fund.get('fundamental_score', {})
-                st.metric("Score", f"{score.get('overall_score', 0):.0f}")
-                st.write(f"Rating: {score.get('rating', 'N/A')}")
-            
-            # Combined Recommendation
-            st.subheader("🎯 Combined Recommendation")
-            
-            # Calculate combined score
-            scores = []
-            
-            # Sentiment score
-            compound = results['sentiment'].get('sentiment_scores', {}).get('compound', 0)
-            scores.append(('Sentiment', (compound + 1) * 50))  # Convert -1 to 1 -> 0 to 100
-            
-            # Macro score
-            scores.append(('Macro', results['macro'].get('economic_health_score', 50)))
-            
-            # Valuation score (based on upside)
-            upside = results['valuation'].get('upside_potential', 0)
-            val_score = min(max(50 + upside, 0), 100)
-            scores.append(('Valuation', val_score))
-            
-            # Geopolitical (inverse - lower risk is better)
-            geo_risk = results['geopolitical'].get('risk_assessment', {}).get('overall_risk_score', 50)
-            scores.append(('Geopolitical', 100 - geo_risk))
-            
-            # Fundamental
-            scores.append(('Fundamental', results['fundamental'].get('fundamental_score', {}).get('overall_score', 50)))
-            
-            # Calculate weighted average
-            combined_score = np.mean([s[1] for s in scores])
+        with col5:
+            st.markdown("**📈 Fundamental**")
+            fund = results['fundamental']
+            score = fund.get('fundamental_score', {})
+            st.metric("Score", f"{score.get('overall_score', 0):.0f}")
+            st.write(f"Rating: {score.get('rating', 'N/A')}")
+        
+        # Combined Recommendation
+        st.subheader("🎯 Combined Recommendation")
+        
+        # Calculate combined score
+        compound = results['sentiment'].get('sentiment_scores', {}).get('compound', 0)
+        macro_score = results['macro'].get('economic_health_score', 50)
+        geo_risk = results['geopolitical'].get('risk_assessment', {}).get('overall_risk_score', 50)
+        upside = results['valuation'].get('upside_potential', 0)  # no estimate counts as fairly valued
+        fund_score = results['fundamental'].get('fundamental_score', {}).get('overall_score', 50)
+        inputs = (float(compound), float(macro_score), float(geo_risk), float(upside), float(fund_score))
+        
+        # Per-agent 0-100 scores, listed in the breakdown order, and their mean
+        score_arr = agent_scores(*inputs)
+        by_agent = dict(zip(SCORE_AGENTS, score_arr.tolist()))
+        scores = [(name, by_agent[name]) for name in ("Sentiment", "Macro", "Valuation", "Geopolitical", "Fundamental")]
+        combined_score = float(compute_combined_score(score_arr))
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.plotly_chart(create_score_gauge(combined_score, "Combined Score"), 
+                           use_container_width=True)
+        
+        with col2:
+            action, _, rationale = combined_action(combined_score)
             
-            col1, col2 = st.columns(2)
+            st.markdown(f"### {action}")
+            st.write(rationale)
             
-            with col1:
-                st.plotly_chart(create_score_gauge(combined_score, "Combined Score"), 
-                               use_container_width=True)
+            st.write("**Score Breakdown:**")
+            for name, score in scores:
+                st.write(f"• {name}: {score:.0f}/100")
+        
+        # Detailed Insights
+        st.subheader("💡 Detailed AI Insights")
+        
+        with st.expander("Sentiment Insight"):
+            st.write(results['sentiment'].get('llm_insight', 'No insight available'))
+        
+        with st.expander("Macro Economic Insight"):
+            st.write(results['macro'].get('llm_insight', 'No insight available'))
+        
+        with st.expander("Valuation Insight"):
+            st.write(results['valuation'].get('ai_insight', 'No insight available'))
+        
+        with st.expander("Geopolitical Insight"):
+            st.write(results['geopolitical'].get('ai_insight', 'No insight available'))
+        
+        with st.expander("Fundamental Insight"):
+            st.write(results['fundamental'].get('ai_insight', 'No insight available'))
+
+@st.fragment
+def portfolio_page():
+    """Portfolio Scan page"""
+    st.header("🔎 Portfolio Scan - All NSE 50 Stocks")
+    st.write("Runs all five agents on every stock and ranks them by combined score")
+    
+    if st.button("🔎 Scan All Stocks", type="primary"):
+        with st.spinner("Initializing agents..."):
+            sentiment_agent = get_sentiment_agent()
+            macro_agent = get_macro_agent()
+            valuation_agent = get_valuation_agent()
+            geo_agent = get_geo_agent()
+            fundamental_agent = get_fundamental_agent()
+        
+        with st.spinner(f"Scanning {len(NSE_50_STOCKS)} stocks..."):
+            scores, failed_calls, total_calls = cached_portfolio_scan(sentiment_agent, macro_agent, geo_agent,
+                                                         valuation_agent, fundamental_agent, NSE_50_STOCKS)
+        
+        if failed_calls:
+            st.warning(f"{failed_calls} of {total_calls} agent calls failed, so this scan is not cached; "
+                       "agents that raised are left out of their stock's combined score")
+        else:
+            st.success(f"Scan complete for {len(scores)} stocks")
+        
+        # Top 10 by combined score
+        st.subheader("🏆 Top 10 Stocks")
+        top = scores.head(10)
+        fig = px.bar(top, x='Stock', y='Combined',
+                     color='Combined',
+                     color_continuous_scale=['red', 'yellow', 'green'],
+                     range_color=[0, 100])
+        fig.update_layout(height=400, showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        st.subheader("📋 All Stocks")
+        st.dataframe(scores.round(1), use_container_width=True, hide_index=True)
+
+def main():
+    # Header
+    st.markdown('<div class="main-header">📈 AI Stock Analysis Agents - NSE India</div>', 
+                unsafe_allow_html=True)
+    st.markdown('<p style="text-align:center">Complete Multi-Agent System with 5 Specialized AI Agents</p>',
+                unsafe_allow_html=True)
+    
+    # Sidebar
+    st.sidebar.title("🎯 Control Panel")
+    page = st.sidebar.radio("Select Agent", 
+                            ["🏠 Home", 
+                             "😊 Sentiment Analysis", 
+                             "📊 Macro Economic",
+                             "💰 Valuation & Technical",
+                             "🌍 Geopolitical Analysis",
+                             "📈 Fundamental Analysis",
+                             "🔍 Comprehensive Analysis",
+                             "🔎 Portfolio Scan"])
+    
+    # HOME PAGE
+    if page == "🏠 Home":
+        with st.spinner("Initializing agents..."):
+            sentiment_agent = get_sentiment_agent()
+        
+        st.header("Welcome to AI Stock Analysis System")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("📊 System Overview")
+            st.info("""
+            This system uses 5 AI agents to analyze NSE India stocks:
             
-            with col2:
-                if combined_score >= 70:
-                    action = "🟢 STRONG BUY"
-                    rationale = "All indicators point to a favorable investment opportunity"
-                elif combined_score >= 55:
-                    action = "🟢 BUY"
-                    rationale = "Most indicators are positive, consider accumulating"
-                elif combined_score >= 45:
-                    action = "🟡 HOLD"
-                    rationale = "Mixed signals, maintain current position"
-                elif combined_score >= 30:
-                    action = "🔴 SELL"
-                    rationale = "Multiple concerns identified, consider reducing exposure"
-                else:
-                    action = "🔴 STRONG SELL"
-                    rationale = "Significant risks identified across multiple factors"
-                
-                st.markdown(f"### {action}")
-                st.write(rationale)
-                
-                st.write("**Score Breakdown:**")
-                for name, score in scores:
-                    st.write(f"• {name}: {score:.0f}/100")
+            **1. Sentiment Analysis Agent**
+            - Analyzes news sentiment using FinBERT/VADER
+            - Provides buy/hold/sell recommendations
             
-            # Detailed Insights
-            st.subheader("💡 Detailed AI Insights")
+            **2. Macro Economic Agent**
+            - Analyzes 8 key economic indicators
+            - Assesses market conditions
             
-            with st.expander("Sentiment Insight"):
-                st.write(results['sentiment'].get('llm_insight', 'No insight available'))
+            **3. Valuation & Technical Agent**
+            - Technical indicators (RSI, MACD, Bollinger)
+            - Valuation metrics (P/E, P/B, PEG)
             
-            with st.expander("Macro Economic Insight"):
-                st.write(results['macro'].get('llm_insight', 'No insight available'))
+            **4. Geopolitical Agent**
+            - Tracks tariffs, G20, conflicts
+            - Analyzes policy changes impact
             
-            with st.expander("Valuation Insight"):
-                st.write(results['valuation'].get('ai_insight', 'No insight available'))
+            **5. Fundamental Agent**
+            - Quarterly/Annual report analysis
+            - Financial ratios & growth trends
+            """)
+        
+        with col2:
+            st.subheader("📈 Quick Stats")
             
-            with st.expander("Geopolitical Insight"):
-                st.write(results['geopolitical'].get('ai_insight', 'No insight available'))
+            # Agent stats
+            col_a, col_b = st.columns(2)
+            with col_a:
+                st.metric("News Articles", sentiment_agent.get_stats()['documents_count'])
+                st.metric("Geo Events", len(load_geo_events()))
+            with col_b:
+                st.metric("Economic Indicators", len(load_economic_data()))
+                st.metric("Stocks Tracked", len(load_valuation_data(NSE_50_STOCKS)[0]))
             
-            with st.expander("Fundamental Insight"):
-                st.write(results['fundamental'].get('ai_insight', 'No insight available'))
+            st.metric("LLM Model", sentiment_agent.get_stats()['model'])
+        
+        st.subheader("🚀 Getting Started")
+        st.write("1. Select an agent from the sidebar")
+        st.write("2. Choose a stock to analyze")
+        st.write("3. View AI-powered insights and recommendations")
+        
+        quick_scan_fragment()
+    
+    # SENTIMENT ANALYSIS PAGE
+    elif page == "😊 Sentiment Analysis":
+        with st.spinner("Initializing agents..."):
+            sentiment_agent = get_sentiment_agent()
+        sentiment_page(sentiment_agent)
+    
+    # MACRO ECONOMIC PAGE
+    elif page == "📊 Macro Economic":
+        with st.spinner("Initializing agents..."):
+            macro_agent = get_macro_agent()
+        macro_page(macro_agent, load_economic_data())
+    
+    # VALUATION & TECHNICAL PAGE
+    elif page == "💰 Valuation & Technical":
+        with st.spinner("Initializing agents..."):
+            valuation_agent = get_valuation_agent()
+        valuation_page(valuation_agent)
+    
+    # GEOPOLITICAL PAGE
+    elif page == "🌍 Geopolitical Analysis":
+        with st.spinner("Initializing agents..."):
+            geo_agent = get_geo_agent()
+        geopolitical_page(geo_agent)
+    
+    # FUNDAMENTAL ANALYSIS PAGE
+    elif page == "📈 Fundamental Analysis":
+        with st.spinner("Initializing agents..."):
+            fundamental_agent = get_fundamental_agent()
+        fundamental_page(fundamental_agent)
+    
+    # COMPREHENSIVE ANALYSIS PAGE
+    elif page == "🔍 Comprehensive Analysis":
+        with st.spinner("Initializing agents..."):
+            sentiment_agent = get_sentiment_agent()
+            macro_agent = get_macro_agent()
+            valuation_agent = get_valuation_agent()
+            geo_agent = get_geo_agent()
+            fundamental_agent = get_fundamental_agent()
+        comprehensive_page(sentiment_agent, macro_agent, valuation_agent, geo_agent, fundamental_agent)
+    
+    # PORTFOLIO SCAN PAGE
+    elif page == "🔎 Portfolio Scan":
+        portfolio_page()
     
     # Footer
     st.sidebar.markdown("---")
@@ -6,21 +6,27 @@ sentence-transformers==2.3.1
 
 # Local LLM
 ollama==0.1.6
+aiohttp==3.9.1
 
 # Sentiment Analysis
 transformers==4.36.2
 torch==2.1.2
 vaderSentiment==3.3.2
+optimum[onnxruntime]==1.16.1
 
 # Data Processing
 pandas==2.1.4
 numpy==1.26.3
+numba==0.58.1
+scipy==1.11.4
+pyarrow==14.0.2
+orjson==3.9.10
 requests==2.31.0
 beautifulsoup4==4.12.3
 lxml==5.1.0
 
 # Web Interface
-streamlit==1.29.0
+streamlit==1.37.0
 plotly==5.18.0
 
 # Utilities
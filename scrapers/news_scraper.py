@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 import time
 from typing import List, Dict
 import json
+from utils._json import read_json
 
 class NewsScraper:
     """Simple news scraper for Indian stock market news"""
@@ -150,5 +151,4 @@ class NewsScraper:
     
     def load_from_json(self, filename: str) -> List[Dict]:
         """Load news from JSON file"""
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
\ No newline at end of file
+        return read_json(filename)
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""
+Fast JSON file reading
+Uses orjson when installed and falls back to the stdlib json module
+"""
+
+import json
+import mmap
+import os
+from functools import lru_cache
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Files larger than this are parsed straight from a read-only memory map
+MMAP_THRESHOLD = 50 * 1024 * 1024
+
+
+@lru_cache(maxsize=4)
+def _read_json(path: str, mtime_ns: int, size: int):
+    """Parse a JSON file; mtime and size are part of the cache key so edits are picked up"""
+    if not ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return json.loads(f.read())
+
+    if size <= MMAP_THRESHOLD:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def read_json(path: str):
+    """
+    Parsed contents of a JSON file, reused until the file changes
+    The returned object is shared between callers and must not be mutated
+    """
+    stat = os.stat(path)
+    return _read_json(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import json
 import os
+from utils._json import read_json
 
 class ValuationDataLoader:
     """Generate sample valuation and price data for testing"""
@@ -66,77 +67,76 @@ class ValuationDataLoader:
         "Oil & Natural Gas Corporation Ltd. (ONGC)": 245,
     }
     
+    # Ranges of P/E, P/B, ROE and D/E by sector
+    SECTOR_CHARACTERISTICS = {
+        "IT": {"pe": (25, 35), "pb": (5, 10), "roe": (20, 35), "de": (0, 0.2)},
+        "Banking": {"pe": (12, 20), "pb": (1.5, 3), "roe": (12, 18), "de": (6, 10)},
+        "FMCG": {"pe": (50, 80), "pb": (10, 20), "roe": (30, 50), "de": (0, 0.3)},
+        "Pharma": {"pe": (20, 40), "pb": (3, 8), "roe": (15, 25), "de": (0.1, 0.5)},
+        "Auto": {"pe": (15, 30), "pb": (2, 5), "roe": (12, 20), "de": (0.3, 0.8)},
+        "Infrastructure": {"pe": (15, 25), "pb": (2, 4), "roe": (10, 18), "de": (0.5, 1.5)},
+        "Metals": {"pe": (8, 15), "pb": (1, 2.5), "roe": (10, 20), "de": (0.5, 1.2)},
+        "Oil & Gas": {"pe": (10, 18), "pb": (1.5, 3), "roe": (12, 20), "de": (0.3, 0.8)},
+        "Telecom": {"pe": (30, 60), "pb": (2, 5), "roe": (8, 15), "de": (0.8, 1.5)},
+    }
+    DEFAULT_CHARACTERISTICS = {"pe": (15, 25), "pb": (2, 4), "roe": (12, 18), "de": (0.3, 0.8)}
+    
+    VALUATION_METRICS = [
+        "current_price", "pe_ratio", "pb_ratio", "ps_ratio", "peg_ratio", "ev_ebitda", "dividend_yield",
+        "market_cap", "eps", "book_value", "roe", "roce", "debt_to_equity", "current_ratio"
+    ]
+    
     @staticmethod
     def generate_valuation_data(stocks: List[str] = None) -> Dict[str, pd.DataFrame]:
         """Generate sample valuation metrics for stocks"""
         if stocks is None:
             stocks = list(ValuationDataLoader.NSE_50_STOCKS.keys())
         
-        data = {}
-        
-        for stock in stocks:
-            sector = ValuationDataLoader.NSE_50_STOCKS.get(stock, "General")
-            base_price = ValuationDataLoader.BASE_PRICES.get(stock, 1000)
-            
-            # Generate metrics based on sector
-            metrics = ValuationDataLoader._generate_sector_metrics(sector, base_price)
-            
-            rows = []
-            date = datetime.now().strftime("%Y-%m-%d")
-            
-            for metric, value in metrics.items():
-                rows.append({
-                    "date": date,
-                    "metric": metric,
-                    "value": value
-                })
-            
-            data[stock] = pd.DataFrame(rows)
+        metrics = ValuationDataLoader._generate_sector_metrics(stocks)
+        date = datetime.now().strftime("%Y-%m-%d")
         
-        return data
+        return {
+            stock: pd.DataFrame({"date": date, "metric": ValuationDataLoader.VALUATION_METRICS, "value": values})
+            for stock, values in zip(stocks, metrics)
+        }
     
     @staticmethod
-    def _generate_sector_metrics(sector: str, base_price: float) -> Dict[str, float]:
-        """Generate metrics based on sector characteristics"""
-        
-        sector_characteristics = {
-            "IT": {"pe": (25, 35), "pb": (5, 10), "roe": (20, 35), "de": (0, 0.2)},
-            "Banking": {"pe": (12, 20), "pb": (1.5, 3), "roe": (12, 18), "de": (6, 10)},
-            "FMCG": {"pe": (50, 80), "pb": (10, 20), "roe": (30, 50), "de": (0, 0.3)},
-            "Pharma": {"pe": (20, 40), "pb": (3, 8), "roe": (15, 25), "de": (0.1, 0.5)},
-            "Auto": {"pe": (15, 30), "pb": (2, 5), "roe": (12, 20), "de": (0.3, 0.8)},
-            "Infrastructure": {"pe": (15, 25), "pb": (2, 4), "roe": (10, 18), "de": (0.5, 1.5)},
-            "Metals": {"pe": (8, 15), "pb": (1, 2.5), "roe": (10, 20), "de": (0.5, 1.2)},
-            "Oil & Gas": {"pe": (10, 18), "pb": (1.5, 3), "roe": (12, 20), "de": (0.3, 0.8)},
-            "Telecom": {"pe": (30, 60), "pb": (2, 5), "roe": (8, 15), "de": (0.8, 1.5)},
-        }
-        
-        char = sector_characteristics.get(sector, {"pe": (15, 25), "pb": (2, 4), "roe": (12, 18), "de": (0.3, 0.8)})
-        
-        pe = np.random.uniform(*char["pe"])
-        pb = np.random.uniform(*char["pb"])
-        roe = np.random.uniform(*char["roe"])
-        de = np.random.uniform(*char["de"])
-        
-        eps = base_price / pe
-        book_value = base_price / pb
+    def _generate_sector_metrics(stocks: List[str]) -> np.ndarray:
+        """Metrics of all stocks based on sector characteristics, one row per stock in VALUATION_METRICS order"""
+        n = len(stocks)
+        base_price = np.array([ValuationDataLoader.BASE_PRICES.get(stock, 1000) for stock in stocks], dtype=float)
+        chars = [
+            ValuationDataLoader.SECTOR_CHARACTERISTICS.get(
+                ValuationDataLoader.NSE_50_STOCKS.get(stock, "General"), ValuationDataLoader.DEFAULT_CHARACTERISTICS
+            )
+            for stock in stocks
+        ]
         
-        return {
-            "current_price": base_price + np.random.uniform(-base_price*0.05, base_price*0.05),
-            "pe_ratio": pe,
-            "pb_ratio": pb,
-            "ps_ratio": np.random.uniform(2, 8),
-            "peg_ratio": np.random.uniform(0.8, 2.5),
-            "ev_ebitda": np.random.uniform(10, 25),
-            "dividend_yield": np.random.uniform(0.5, 3),
-            "market_cap": base_price * np.random.uniform(10000, 500000),
-            "eps": eps,
-            "book_value": book_value,
-            "roe": roe,
-            "roce": roe + np.random.uniform(-3, 5),
-            "debt_to_equity": de,
-            "current_ratio": np.random.uniform(1, 3),
-        }
+        def sector_uniform(key):
+            bounds = np.array([char[key] for char in chars], dtype=float).reshape(n, 2)
+            return np.random.uniform(bounds[:, 0], bounds[:, 1])
+        
+        pe = sector_uniform("pe")
+        pb = sector_uniform("pb")
+        roe = sector_uniform("roe")
+        de = sector_uniform("de")
+        
+        return np.column_stack([
+            base_price + base_price * np.random.uniform(-0.05, 0.05, n),
+            pe,
+            pb,
+            np.random.uniform(2, 8, n),
+            np.random.uniform(0.8, 2.5, n),
+            np.random.uniform(10, 25, n),
+            np.random.uniform(0.5, 3, n),
+            base_price * np.random.uniform(10000, 500000, n),
+            base_price / pe,
+            base_price / pb,
+            roe,
+            roe + np.random.uniform(-3, 5, n),
+            de,
+            np.random.uniform(1, 3, n),
+        ])
     
     @staticmethod
     def generate_price_data(stocks: List[str] = None, days: int = 252) -> Dict[str, pd.DataFrame]:
@@ -144,29 +144,30 @@ class ValuationDataLoader:
         if stocks is None:
             stocks = list(ValuationDataLoader.NSE_50_STOCKS.keys())[:10]
         
-        data = {}
+        # All stocks are drawn together, one row per stock
+        shape = (len(stocks), days)
+        base_price = np.array([ValuationDataLoader.BASE_PRICES.get(stock, 1000) for stock in stocks], dtype=float)
+        dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
         
-        for stock in stocks:
-            base_price = ValuationDataLoader.BASE_PRICES.get(stock, 1000)
-            
-            dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-            
-            # Generate price series with trend and volatility
-            returns = np.random.normal(0.0005, 0.02, days)  # Daily returns
-            price_series = base_price * np.cumprod(1 + returns)
-            
-            df = pd.DataFrame({
+        # Generate price series with trend and volatility
+        returns = np.random.normal(0.0005, 0.02, shape)  # Daily returns
+        price_series = base_price[:, None] * np.cumprod(1 + returns, axis=1)
+        opens = price_series * np.random.uniform(0.99, 1.01, shape)
+        highs = price_series * np.random.uniform(1.01, 1.03, shape)
+        lows = price_series * np.random.uniform(0.97, 0.99, shape)
+        volumes = np.random.randint(100000, 10000000, shape)
+        
+        return {
+            stock: pd.DataFrame({
                 'date': dates,
-                'open': price_series * np.random.uniform(0.99, 1.01, days),
-                'high': price_series * np.random.uniform(1.01, 1.03, days),
-                'low': price_series * np.random.uniform(0.97, 0.99, days),
-                'close': price_series,
-                'volume': np.random.randint(100000, 10000000, days)
+                'open': opens[i],
+                'high': highs[i],
+                'low': lows[i],
+                'close': price_series[i],
+                'volume': volumes[i]
             })
-            
-            data[stock] = df
-        
-        return data
+            for i, stock in enumerate(stocks)
+        }
     
     @staticmethod
     def save_to_csv(data: Dict[str, pd.DataFrame], directory: str = "./data/valuation"):
@@ -366,8 +367,7 @@ class GeopoliticalDataLoader:
     @staticmethod
     def load_from_json(filepath: str = "./data/geopolitical/events.json") -> List[Dict]:
         """Load events from JSON file"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(filepath)
 
 
 class FundamentalDataLoader:
@@ -379,55 +379,49 @@ class FundamentalDataLoader:
         if stocks is None:
             stocks = list(ValuationDataLoader.NSE_50_STOCKS.keys())[:15]
         
-        data = {}
-        
-        for stock in stocks:
-            sector = ValuationDataLoader.NSE_50_STOCKS.get(stock, "General")
-            rows = []
-            
-            # Base values
-            base_revenue = np.random.uniform(5000, 50000)
-            base_profit = base_revenue * np.random.uniform(0.08, 0.20)
-            
-            for i in range(quarters):
-                year = 2024 - (i // 4)
-                quarter = 4 - (i % 4)
-                
-                # Add growth trend with some variation
-                growth_factor = 1 + (quarters - i) * 0.02 + np.random.uniform(-0.05, 0.05)
-                
-                revenue = base_revenue * growth_factor
-                operating_profit = revenue * np.random.uniform(0.12, 0.22)
-                net_profit = operating_profit * np.random.uniform(0.6, 0.85)
-                
-                rows.append({
-                    'quarter': quarter,
-                    'year': year,
-                    'revenue': revenue,
-                    'revenue_growth': np.random.uniform(-5, 20),
-                    'operating_profit': operating_profit,
-                    'operating_margin': (operating_profit / revenue) * 100,
-                    'net_profit': net_profit,
-                    'net_margin': (net_profit / revenue) * 100,
-                    'ebitda': operating_profit * np.random.uniform(1.1, 1.3),
-                    'ebitda_margin': np.random.uniform(15, 30),
-                    'eps': net_profit / np.random.uniform(100, 500),
-                    'eps_growth': np.random.uniform(-10, 25),
-                    'roe': np.random.uniform(10, 30),
-                    'roce': np.random.uniform(12, 35),
-                    'roa': np.random.uniform(5, 15),
-                    'current_ratio': np.random.uniform(1, 3),
-                    'quick_ratio': np.random.uniform(0.8, 2.5),
-                    'debt_to_equity': np.random.uniform(0.1, 1.5),
-                    'interest_coverage': np.random.uniform(3, 20),
-                    'asset_turnover': np.random.uniform(0.5, 2),
-                    'operating_cash_flow': net_profit * np.random.uniform(0.8, 1.5),
-                    'free_cash_flow': net_profit * np.random.uniform(0.5, 1.2),
-                })
-            
-            data[stock] = pd.DataFrame(rows)
+        # All stocks are drawn together: one row per stock, one column per quarter
+        shape = (len(stocks), quarters)
+        i = np.arange(quarters)
+        
+        # Base values
+        base_revenue = np.random.uniform(5000, 50000, (len(stocks), 1))
+        
+        # Add growth trend with some variation
+        growth_factor = 1 + (quarters - i) * 0.02 + np.random.uniform(-0.05, 0.05, shape)
+        
+        revenue = base_revenue * growth_factor
+        operating_profit = revenue * np.random.uniform(0.12, 0.22, shape)
+        net_profit = operating_profit * np.random.uniform(0.6, 0.85, shape)
+        
+        columns = {
+            'quarter': np.broadcast_to(4 - (i % 4), shape),
+            'year': np.broadcast_to(2024 - (i // 4), shape),
+            'revenue': revenue,
+            'revenue_growth': np.random.uniform(-5, 20, shape),
+            'operating_profit': operating_profit,
+            'operating_margin': (operating_profit / revenue) * 100,
+            'net_profit': net_profit,
+            'net_margin': (net_profit / revenue) * 100,
+            'ebitda': operating_profit * np.random.uniform(1.1, 1.3, shape),
+            'ebitda_margin': np.random.uniform(15, 30, shape),
+            'eps': net_profit / np.random.uniform(100, 500, shape),
+            'eps_growth': np.random.uniform(-10, 25, shape),
+            'roe': np.random.uniform(10, 30, shape),
+            'roce': np.random.uniform(12, 35, shape),
+            'roa': np.random.uniform(5, 15, shape),
+            'current_ratio': np.random.uniform(1, 3, shape),
+            'quick_ratio': np.random.uniform(0.8, 2.5, shape),
+            'debt_to_equity': np.random.uniform(0.1, 1.5, shape),
+            'interest_coverage': np.random.uniform(3, 20, shape),
+            'asset_turnover': np.random.uniform(0.5, 2, shape),
+            'operating_cash_flow': net_profit * np.random.uniform(0.8, 1.5, shape),
+            'free_cash_flow': net_profit * np.random.uniform(0.5, 1.2, shape),
+        }
         
-        return data
+        return {
+            stock: pd.DataFrame({name: values[row] for name, values in columns.items()})
+            for row, stock in enumerate(stocks)
+        }
     
     @staticmethod
     def generate_annual_data(stocks: List[str] = None, years: int = 5) -> Dict[str, pd.DataFrame]:
@@ -435,59 +429,55 @@ class FundamentalDataLoader:
         if stocks is None:
             stocks = list(ValuationDataLoader.NSE_50_STOCKS.keys())[:15]
         
-        data = {}
-        
-        for stock in stocks:
-            rows = []
-            
-            base_revenue = np.random.uniform(20000, 200000)
-            base_profit = base_revenue * np.random.uniform(0.08, 0.18)
-            
-            for i in range(years):
-                year = 2024 - i
-                growth_factor = 1 + (years - i) * 0.08 + np.random.uniform(-0.1, 0.1)
-                
-                revenue = base_revenue * growth_factor
-                operating_profit = revenue * np.random.uniform(0.12, 0.20)
-                net_profit = operating_profit * np.random.uniform(0.65, 0.85)
-                
-                total_assets = revenue * np.random.uniform(1.5, 3)
-                total_equity = total_assets * np.random.uniform(0.4, 0.7)
-                total_debt = total_assets - total_equity
-                
-                rows.append({
-                    'year': year,
-                    'revenue': revenue,
-                    'revenue_growth': np.random.uniform(5, 20),
-                    'operating_profit': operating_profit,
-                    'operating_margin': (operating_profit / revenue) * 100,
-                    'net_profit': net_profit,
-                    'net_margin': (net_profit / revenue) * 100,
-                    'ebitda': operating_profit * np.random.uniform(1.15, 1.35),
-                    'ebitda_margin': np.random.uniform(15, 28),
-                    'eps': net_profit / np.random.uniform(100, 500),
-                    'roe': (net_profit / total_equity) * 100,
-                    'roce': np.random.uniform(12, 30),
-                    'roa': (net_profit / total_assets) * 100,
-                    'total_assets': total_assets,
-                    'total_liabilities': total_assets - total_equity,
-                    'shareholders_equity': total_equity,
-                    'total_debt': total_debt,
-                    'debt_to_equity': total_debt / total_equity,
-                    'current_ratio': np.random.uniform(1.2, 2.8),
-                    'book_value_per_share': total_equity / np.random.uniform(100, 500),
-                    'dividend_per_share': np.random.uniform(5, 50),
-                    'dividend_payout': np.random.uniform(20, 50),
-                    'operating_cash_flow': net_profit * np.random.uniform(0.9, 1.4),
-                    'investing_cash_flow': -net_profit * np.random.uniform(0.3, 0.8),
-                    'financing_cash_flow': net_profit * np.random.uniform(-0.5, 0.3),
-                    'free_cash_flow': net_profit * np.random.uniform(0.5, 1.1),
-                    'capex': net_profit * np.random.uniform(0.2, 0.6),
-                })
-            
-            data[stock] = pd.DataFrame(rows)
+        # All stocks are drawn together: one row per stock, one column per year
+        shape = (len(stocks), years)
+        i = np.arange(years)
+        
+        base_revenue = np.random.uniform(20000, 200000, (len(stocks), 1))
+        growth_factor = 1 + (years - i) * 0.08 + np.random.uniform(-0.1, 0.1, shape)
+        
+        revenue = base_revenue * growth_factor
+        operating_profit = revenue * np.random.uniform(0.12, 0.20, shape)
+        net_profit = operating_profit * np.random.uniform(0.65, 0.85, shape)
+        
+        total_assets = revenue * np.random.uniform(1.5, 3, shape)
+        total_equity = total_assets * np.random.uniform(0.4, 0.7, shape)
+        total_debt = total_assets - total_equity
+        
+        columns = {
+            'year': np.broadcast_to(2024 - i, shape),
+            'revenue': revenue,
+            'revenue_growth': np.random.uniform(5, 20, shape),
+            'operating_profit': operating_profit,
+            'operating_margin': (operating_profit / revenue) * 100,
+            'net_profit': net_profit,
+            'net_margin': (net_profit / revenue) * 100,
+            'ebitda': operating_profit * np.random.uniform(1.15, 1.35, shape),
+            'ebitda_margin': np.random.uniform(15, 28, shape),
+            'eps': net_profit / np.random.uniform(100, 500, shape),
+            'roe': (net_profit / total_equity) * 100,
+            'roce': np.random.uniform(12, 30, shape),
+            'roa': (net_profit / total_assets) * 100,
+            'total_assets': total_assets,
+            'total_liabilities': total_assets - total_equity,
+            'shareholders_equity': total_equity,
+            'total_debt': total_debt,
+            'debt_to_equity': total_debt / total_equity,
+            'current_ratio': np.random.uniform(1.2, 2.8, shape),
+            'book_value_per_share': total_equity / np.random.uniform(100, 500, shape),
+            'dividend_per_share': np.random.uniform(5, 50, shape),
+            'dividend_payout': np.random.uniform(20, 50, shape),
+            'operating_cash_flow': net_profit * np.random.uniform(0.9, 1.4, shape),
+            'investing_cash_flow': -net_profit * np.random.uniform(0.3, 0.8, shape),
+            'financing_cash_flow': net_profit * np.random.uniform(-0.5, 0.3, shape),
+            'free_cash_flow': net_profit * np.random.uniform(0.5, 1.1, shape),
+            'capex': net_profit * np.random.uniform(0.2, 0.6, shape),
+        }
         
-        return data
+        return {
+            stock: pd.DataFrame({name: values[row] for name, values in columns.items()})
+            for row, stock in enumerate(stocks)
+        }
     
     @staticmethod
     def save_to_csv(quarterly_data: Dict, annual_data: Dict, 
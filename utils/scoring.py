@@ -0,0 +1,43 @@
+"""
+Combined-score math for the Quick Scan and Comprehensive Analysis pages
+Compiled with Numba when available so it stays cheap when scoring many stocks
+"""
+
+import numpy as np
+from utils._njit import njit
+
+# Order of the per-agent scores returned by agent_scores
+SCORE_AGENTS = ("Sentiment", "Macro", "Geopolitical", "Valuation", "Fundamental")
+
+# Labels indexed by rsi_state
+RSI_STATES = ("Oversold", "Neutral", "Overbought")
+
+
+@njit(cache=True)
+def agent_scores(compound, macro, geo_risk, upside, fund):
+    """0-100 score per agent in SCORE_AGENTS order; the valuation score is NaN when upside is NaN"""
+    out = np.empty(5)
+    out[0] = (compound + 1) * 50  # sentiment compound -1..1
+    out[1] = macro
+    out[2] = 100 - geo_risk  # lower risk is better
+    if np.isnan(upside):
+        out[3] = np.nan
+    else:
+        out[3] = min(max(50 + upside, 0.0), 100.0)
+    out[4] = fund
+    return out
+
+
+def compute_combined_score(scores):
+    """Mean of the available (non-NaN) agent scores; also takes an (n_stocks, 5) stack of agent_scores rows"""
+    return np.nanmean(scores, axis=-1)
+
+
+@njit(cache=True)
+def rsi_state(rsi):
+    """0 = oversold (< 30), 1 = neutral, 2 = overbought (> 70)"""
+    if rsi < 30:
+        return 0
+    if rsi > 70:
+        return 2
+    return 1